@@ -0,0 +1,45 @@
+"""
+Compare exporting a catalogue with one `export_to_json` call per config against `export_many`, and time a re-export
+where nothing changed (every file skipped by its content hash).
+
+Run from the repository root:
+    python -m benchmarks.bench_bulk_export
+"""
+import tempfile
+import time
+
+from src.bulk_export import export_many
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+
+RECORDS = 5000
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main():
+    configs = []
+    for i in range(RECORDS):
+        cfg = MetadataConfig(r"data/Schema/CombinedSchema.json", COMBINED_DEFAULT)
+        cfg.set("Dataset.id", f"dataset-{i}")
+        configs.append(cfg)
+
+    with tempfile.TemporaryDirectory() as loop_dir, tempfile.TemporaryDirectory() as bulk_dir:
+        cases = {
+            "export_to_json loop": lambda: [cfg.export_to_json(cfg.get("Dataset.id"), loop_dir) for cfg in configs],
+            "export_many, 1 thread": lambda: export_many(configs, bulk_dir, workers=1, skip_unchanged=False),
+            "export_many": lambda: export_many(configs, bulk_dir, skip_unchanged=False),
+            "export_many, unchanged": lambda: export_many(configs, bulk_dir),
+            "export_many, ndjson": lambda: export_many(configs, bulk_dir, bundle="ndjson"),
+            "export_many, tar": lambda: export_many(configs, bulk_dir, bundle="tar"),
+        }
+        print(f"{RECORDS:,} configs")
+        for name, run in cases.items():
+            print(f"{name:<26}{timed(run):>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
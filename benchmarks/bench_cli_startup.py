@@ -0,0 +1,70 @@
+"""
+Time the start-up of the command line interface (`src.main`) and check it stays within a budget.
+
+Each command runs in a fresh interpreter, so the time includes starting Python and importing the modules the
+command needs: `--help` only needs the standard library, `validate` imports the package to validate one sample.
+The median of --runs runs is compared with the budget; the exit status is 1 if a command is over it.
+
+Run from the repository root:
+    python -m benchmarks.bench_cli_startup
+    python -m benchmarks.bench_cli_startup --runs 20 --budget-scale 1.5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+SAMPLE_PATH = r"data/Metadata Samples/cpi_metadata.json"
+#command -> budget of its median wall time in seconds, with some headroom over a laptop's
+STARTUP = {
+    "--help": 0.15,
+    "validate": 0.6,
+}
+COMMANDS = {
+    "--help": ["--help"],
+    "validate": ["validate", SAMPLE_PATH],
+}
+
+
+def time_command(arguments: list, runs: int) -> list:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "src.main", *arguments], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def time_command_python(runs: int) -> list:
+    """Start-up of a bare interpreter, for reference."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="runs of each command (default: 10)")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply the budgets, e.g. on a slow CI machine")
+    args = parser.parse_args(argv)
+
+    baseline = statistics.median(time_command_python(args.runs))
+    print(f"{'command':<12}{'median':>10}{'min':>10}{'budget':>10}")
+    print(f"{'(python)':<12}{baseline:>9.3f}s")
+    over = False
+    for name, arguments in COMMANDS.items():
+        times = time_command(arguments, args.runs)
+        median = statistics.median(times)
+        budget = STARTUP[name] * args.budget_scale
+        over = over or median > budget
+        print(f"{name:<12}{median:>9.3f}s{min(times):>9.3f}s{budget:>9.3f}s{'  over budget' if median > budget else ''}")
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Compare column-wise validation of a catalogue against validating each record with `MetadataConfig.validate()`.
+
+Run from the repository root (requires pandas):
+    python -m benchmarks.bench_columnar_validation
+"""
+import glob
+import json
+import time
+
+from src.columnar_validation import ColumnarValidator
+from src.config_objects import MetadataConfig
+
+SCHEMA_PATH = r"data/Schema/CombinedSchema.json"
+RECORDS = 100000
+
+
+def main():
+    samples = []
+    for file_path in sorted(glob.glob(r"data/Metadata Samples/*.json")):
+        with open(file_path) as f:
+            samples.append(json.load(f))
+    records = (samples * (RECORDS // len(samples) + 1))[:RECORDS]
+    validator = ColumnarValidator(SCHEMA_PATH)
+
+    start = time.perf_counter()
+    values, present = validator.flatten(records)
+    flattened = time.perf_counter()
+    columnar_errors = validator.validate_frame(values, present)
+    columnar_end = time.perf_counter()
+    record_errors = [MetadataConfig(SCHEMA_PATH, record).validate() for record in records]
+    record_end = time.perf_counter()
+
+    assert columnar_errors == record_errors
+    print(f"{RECORDS:,} records")
+    print(f"{'flatten':<24}{flattened - start:>8.2f}s")
+    print(f"{'column checks':<24}{columnar_end - flattened:>8.2f}s")
+    print(f"{'columnar total':<24}{columnar_end - start:>8.2f}s")
+    print(f"{'per-record validate()':<24}{record_end - columnar_end:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
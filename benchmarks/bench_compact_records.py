@@ -0,0 +1,48 @@
+"""
+Measure the memory of holding many metadata records as nested dictionaries vs compact records.
+
+Run from the repository root:
+    python -m benchmarks.bench_compact_records
+"""
+import json
+import tracemalloc
+
+from src.schema_cache import SCHEMA_REGISTRY
+
+SCHEMA_PATH = r"data/Schema/CombinedSchema.json"
+EXAMPLE_PATH = r"data/Metadata Samples/cpi_metadata.json"
+RECORDS = 50000
+
+
+def measure(build) -> int:
+    """Return the memory (in bytes) still allocated by the objects build() returns."""
+    tracemalloc.start()
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def copy_containers(metadata: dict) -> dict:
+    """Copy the nested dictionaries of the metadata, sharing the leaf values."""
+    return {key: copy_containers(value) if isinstance(value, dict) else value for key, value in metadata.items()}
+
+
+def main():
+    record_type = SCHEMA_REGISTRY.get(SCHEMA_PATH).record_type()
+    with open(EXAMPLE_PATH) as f:
+        example = json.load(f)
+    #the leaf values (strings, lists) are shared, so only the containers are measured
+    dict_size = measure(lambda: [copy_containers(example) for _ in range(RECORDS)])
+    record_size = measure(lambda: [record_type.from_dict(example) for _ in range(RECORDS)])
+    #same keys, values and key order
+    assert json.dumps(record_type.from_dict(example).to_dict()) == json.dumps(example)
+    print(f"{RECORDS:,} records")
+    print(f"{'nested dicts':<16}{dict_size / RECORDS:>10,.0f} bytes/record")
+    print(f"{'compact records':<16}{record_size / RECORDS:>10,.0f} bytes/record")
+    print(f"reduction: {1 - record_size / dict_size:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compare the compiled schema validators against the original recursive schema walk.
+
+The recursive path is still used by `MetadataConfig` for schemas it didn't compile,
+so passing a copy of the schema to `validate()` measures it. `check_type()` always takes the recursive
+path: for a single leaf, looking up its compiled validator costs more than checking the schema dict.
+
+Run from the repository root:
+    python -m benchmarks.bench_compiled_schema
+"""
+import copy
+import timeit
+
+from src.config_objects import MetadataConfig, COMBINED_DEFAULT
+
+SCHEMA_PATH = r"data/Schema/CombinedSchema.json"
+EXAMPLE_PATH = r"data/Metadata Samples/cpi_metadata.json"
+NUMBER = 20000
+REPEAT = 5
+
+
+def main():
+    cfg = MetadataConfig(SCHEMA_PATH, copy.deepcopy(COMBINED_DEFAULT))
+    cfg.load_metadata_from_file(EXAMPLE_PATH)
+    #an identical schema that wasn't compiled, so it takes the recursive path
+    uncompiled_schema = copy.deepcopy(cfg._schema)
+
+    cases = {
+        "validate()": (
+            lambda: cfg.validate(),
+            lambda: cfg.validate(schema=uncompiled_schema),
+        ),
+        "initial_validate_and_build()": (
+            lambda: cfg.initial_validate_and_build("Edition", cfg.get("Edition"), cfg._schema["properties"]),
+            lambda: cfg.initial_validate_and_build("Edition", cfg.get("Edition"), uncompiled_schema["properties"]),
+        ),
+    }
+    print(f"{'call':<32}{'compiled/s':>14}{'recursive/s':>14}{'speed-up':>10}")
+    for name, (compiled, recursive) in cases.items():
+        #best of REPEAT runs, as single calls are short enough for other processes to skew a run
+        compiled_rate = NUMBER / min(timeit.repeat(compiled, number=NUMBER, repeat=REPEAT))
+        recursive_rate = NUMBER / min(timeit.repeat(recursive, number=NUMBER, repeat=REPEAT))
+        print(f"{name:<32}{compiled_rate:>14,.0f}{recursive_rate:>14,.0f}{compiled_rate / recursive_rate:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare validating a CSV file against its CSVW tableSchema chunk by chunk (`csv_validation.validate_csv`)
+with checking each row in Python, on a generated file. The schema is built with `csv_profiler.profile_csv`.
+
+Run from the repository root (requires pandas):
+    python -m benchmarks.bench_csv_validation
+"""
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.CSVW.CSVW_metadata import CSVW
+from src.CSVW.csv_profiler import profile_csv
+from src.CSVW.csv_validation import validate_csv
+
+ROWS = 1000000
+
+
+def write_csv(file_path: str):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        "Geography": rng.choice(["E92000001", "W92000004", "S92000003", "N92000002"], ROWS),
+        "Year": rng.integers(1990, 2024, ROWS),
+        "Value": rng.random(ROWS) * 100,
+        "Count": pd.Series(rng.integers(0, 50, ROWS)).mask(rng.random(ROWS) < 0.01).astype("Int64"),
+        "Date": pd.Series(pd.date_range("2000-01-01", periods=ROWS, freq="min")).dt.strftime("%d/%m/%Y"),
+    }).to_csv(file_path, index=False)
+
+
+def validate_rows(csvw: CSVW, file_path: str) -> int:
+    """Check each value of each row in Python: the baseline."""
+    columns = csvw.csvw["tableSchema"]["columns"]
+    errors = 0
+    with open(file_path, newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            for column in columns:
+                value = row[column["titles"]]
+                datatype = column["datatype"]
+                if value == "":
+                    errors += column["required"]
+                elif datatype == "integer":
+                    errors += not value.lstrip("+-").isdigit()
+                elif datatype == "decimal":
+                    try:
+                        float(value)
+                    except ValueError:
+                        errors += 1
+                elif isinstance(datatype, dict):
+                    try:
+                        datetime.strptime(value, "%d/%m/%Y")
+                    except ValueError:
+                        errors += 1
+    return errors
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "data.csv")
+        write_csv(file_path)
+        size = os.path.getsize(file_path) / 2 ** 20
+
+        start = time.perf_counter()
+        csvw = CSVW("data.csv", "Benchmark", "Generated data", "Weekly")
+        csvw.add_columns(profile_csv(file_path).csvw_columns())
+        profiled = time.perf_counter()
+        report = validate_csv(csvw, file_path)
+        validated = time.perf_counter()
+        row_errors = validate_rows(csvw, file_path)
+        rows_end = time.perf_counter()
+
+    assert report["valid"] and row_errors == 0
+    print(f"{ROWS:,} rows, {size:.0f} MB")
+    print(f"{'profile_csv':<24}{profiled - start:>8.2f}s")
+    print(f"{'validate_csv':<24}{validated - profiled:>8.2f}s")
+    print(f"{'per-row checks':<24}{rows_end - validated:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Compare `DateValidator` (precompiled pattern, with and without its cache) against `datetime.datetime.strptime`.
+
+Run from the repository root:
+    python -m benchmarks.bench_date_validation
+"""
+import datetime
+import random
+import timeit
+
+from src.date_validation import DATE_FORMAT, DateValidator
+
+NUMBER = 200000
+
+
+def strptime_check(value):
+    try:
+        datetime.datetime.strptime(value, DATE_FORMAT)
+        return True
+    except ValueError:
+        return False
+
+
+def main():
+    random.seed(0)
+    #release dates repeat a lot in a catalogue: a few hundred distinct dates
+    dates = [f"{random.randint(1, 31):02d}/{random.randint(1, 12):02d}/{random.randint(2000, 2030)}" for _ in range(300)]
+    samples = [random.choice(dates) for _ in range(NUMBER)]
+    validator = DateValidator()
+
+    cases = {
+        "strptime": lambda: [strptime_check(value) for value in samples],
+        "DateValidator, uncached": lambda: [validator._is_valid(value) for value in samples],
+        "DateValidator.check_many": lambda: validator.check_many(samples),
+    }
+    print(f"{'check':<28}{'dates/s':>14}")
+    for name, run in cases.items():
+        rate = NUMBER / timeit.timeit(run, number=1)
+        print(f"{name:<28}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Micro-benchmarks of reading and writing metadata fields by dotted path.
+
+Compares `MetadataConfig.get()`/`set()` (cached path resolution), bound accessors from
+`MetadataConfig.accessor()`, and resolving the path against the schema on every call.
+
+Run from the repository root:
+    python -m benchmarks.bench_path_access
+
+A short version runs with the tests (`test_path_access_benchmark` in tests/test_config_objects.py).
+"""
+import timeit
+
+from src.config_objects import MetadataConfig, COMBINED_DEFAULT
+
+SCHEMA_PATH = r"data/Schema/CombinedSchema.json"
+PATH = "Dataset.publisher.name"
+NUMBER = 200000
+
+
+def main():
+    cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+    accessor = cfg.accessor(PATH)
+    compiled = cfg._compiled
+
+    def set_uncached():
+        #what set() did before: resolve the path against the schema every call
+        resolved = compiled._resolve(PATH)
+        cfg._write_value(resolved.keys, resolved.build("ONS"))
+
+    cases = {
+        "get(path)": lambda: cfg.get(PATH),
+        "accessor.get()": accessor.get,
+        "set(path, value)": lambda: cfg.set(PATH, "ONS"),
+        "accessor.set(value)": lambda: accessor.set("ONS"),
+        "set, path resolved every call": set_uncached,
+    }
+    print(f"{'call':<34}{'calls/s':>14}")
+    for name, call in cases.items():
+        rate = NUMBER / timeit.timeit(call, number=NUMBER)
+        print(f"{name:<34}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
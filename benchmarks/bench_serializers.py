@@ -0,0 +1,53 @@
+"""
+Compare the JSON and YAML backends of `src.serializers` on the metadata samples scaled up to a catalogue.
+
+Run from the repository root:
+    python -m benchmarks.bench_serializers
+"""
+import glob
+import json
+import time
+
+import yaml
+
+from src import serializers
+
+RECORDS = 2000
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main():
+    samples = []
+    for file_path in sorted(glob.glob(r"data/Metadata Samples/*.json")):
+        with open(file_path) as f:
+            samples.append(json.load(f))
+    json_text = json.dumps((samples * (RECORDS // len(samples) + 1))[:RECORDS])
+    #distinct objects, otherwise the YAML dumpers write anchors and aliases for the repeats
+    catalogue = json.loads(json_text)
+    yaml_text = yaml.dump(catalogue, Dumper=yaml.SafeDumper)
+
+    print(f"{RECORDS:,} records, {len(json_text) / 1e6:.1f} MB of JSON, {len(yaml_text) / 1e6:.1f} MB of YAML")
+    print(f"{'backend':<22}{'load':>10}{'dump':>10}")
+    for backend in serializers.JSON_BACKENDS:
+        serializers.set_json_backend(backend)
+        load = timed(lambda: serializers.loads_json(json_text))
+        dump = timed(lambda: serializers.dumps_json(catalogue))
+        print(f"{'json: ' + backend:<22}{load:>9.3f}s{dump:>9.3f}s")
+    serializers.set_json_backend(serializers.JSON_BACKENDS[0])
+
+    yaml_backends = {"yaml: SafeLoader": (yaml.SafeLoader, yaml.SafeDumper)}
+    if serializers.YAML_LOADER is not yaml.SafeLoader:
+        yaml_backends["yaml: CSafeLoader"] = (serializers.YAML_LOADER, serializers.YAML_DUMPER)
+    for name, (loader, dumper) in yaml_backends.items():
+        load = timed(lambda: yaml.load(yaml_text, Loader=loader))
+        dump = timed(lambda: yaml.dump(catalogue, Dumper=dumper))
+        print(f"{name:<22}{load:>9.3f}s{dump:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
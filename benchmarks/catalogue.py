@@ -0,0 +1,147 @@
+"""
+Generate synthetic metadata catalogues from a JSON schema, for the benchmarks.
+
+Every field of the schema gets a value of its type (a choice of its enum, a date in the format of the field for
+"datetime" fields, a list of strings for arrays, ...), with string lengths close to the sample metadata. A fraction of the records is
+made invalid with one error each: a wrong type, a value outside an enum, a wrong array item or a missing
+required field.
+
+    >>> from benchmarks.catalogue import generate_catalogue
+    >>> records = list(generate_catalogue(1000, invalid_fraction=0.1))
+
+Each record is generated from its own position and the seed, so part of a catalogue (`start`) can be generated
+without the records before it.
+"""
+import datetime
+import random
+from typing import Iterator
+
+from src.date_validation import date_validator_for
+from src.schema_cache import SCHEMA_REGISTRY
+
+SCHEMA_PATH = r"data/Schema/CombinedSchema.json"
+#kinds of error put in invalid records
+CORRUPTIONS = ["type", "enum", "item_type", "required"]
+
+WORDS = ["consumer", "price", "inflation", "index", "population", "estimates", "labour", "market", "births", "deaths",
+         "regional", "gross", "value", "added", "retail", "sales", "household", "income", "trade", "annual",
+         "monthly", "quarterly", "survey", "earnings", "housing", "health", "mortality", "england", "wales", "tables"]
+
+
+def _words(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def _string(key: str, rng: random.Random) -> str:
+    """A string shaped after the field name, e.g. an url for "href" or a sentence for "description"."""
+    if key == "href":
+        return "https://www.ons.gov.uk/" + "/".join(rng.choices(WORDS, k=3))
+    if key == "email":
+        return f"{rng.choice(WORDS)}.{rng.choice(WORDS)}@ons.gov.uk"
+    if key == "telephone":
+        return f"+44 1633 {rng.randint(100000, 999999)}"
+    if key in ("id", "edition"):
+        return "-".join(rng.choices(WORDS, k=rng.randint(2, 5)))
+    if key in ("description", "note"):
+        return _words(rng, 15, 60).capitalize() + "."
+    return _words(rng, 2, 10).capitalize()
+
+
+def _value(key: str, schema: dict, rng: random.Random):
+    """A valid value for a schema node."""
+    if "properties" in schema:
+        return {child: _value(child, child_schema, rng) for child, child_schema in schema["properties"].items()}
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    field_type = schema.get("type")
+    if field_type == "array":
+        return [_value(key, schema.get("items", {}), rng) for _ in range(rng.randint(1, 5))]
+    if field_type == "datetime":
+        #e.g. dd/mm/yyyy, the default format
+        date = datetime.date(rng.randint(2000, 2030), rng.randint(1, 12), rng.randint(1, 28))
+        return date_validator_for(schema).format(date)
+    if field_type in ("integer", "number"):
+        return rng.randint(0, 10000)
+    if field_type == "boolean":
+        return rng.random() < 0.5
+    return _string(key, rng)
+
+
+def _leaves(schema: dict, keys: tuple = ()) -> list:
+    """(path keys, schema) of every field which isn't an object."""
+    leaves = []
+    for key, child in schema.get("properties", {}).items():
+        if "properties" in child:
+            leaves.extend(_leaves(child, keys + (key,)))
+        else:
+            leaves.append((keys + (key,), child))
+    return leaves
+
+
+def _required(schema: dict, keys: tuple = ()) -> list:
+    """Path keys of every required field."""
+    required = [keys + (key,) for key in schema.get("required", [])]
+    for key, child in schema.get("properties", {}).items():
+        if "properties" in child:
+            required.extend(_required(child, keys + (key,)))
+    return required
+
+
+def corrupt_record(record: dict, schema: dict, rng: random.Random, corruption: str) -> dict:
+    """Put one error of the given kind (see CORRUPTIONS) in a record, in place, and return it."""
+    if corruption == "required":
+        keys = rng.choice(_required(schema))
+    else:
+        candidates = {
+            "type": [leaf for leaf in _leaves(schema) if "enum" not in leaf[1] and leaf[1].get("type") != "array"],
+            "enum": [leaf for leaf in _leaves(schema) if "enum" in leaf[1]],
+            "item_type": [leaf for leaf in _leaves(schema) if leaf[1].get("type") == "array"],
+        }[corruption]
+        keys, leaf = rng.choice(candidates)
+    parent = record
+    for key in keys[:-1]:
+        parent = parent[key]
+    if corruption == "required":
+        del parent[keys[-1]]
+    elif corruption == "type":
+        parent[keys[-1]] = 12345 if leaf.get("type") != "integer" else "12345"
+    elif corruption == "enum":
+        parent[keys[-1]] = "not-" + str(leaf["enum"][-1])
+    else:
+        parent[keys[-1]] = parent[keys[-1]][:-1] + [404]
+    return record
+
+
+def generate_catalogue(records: int, schema_path: str = SCHEMA_PATH, invalid_fraction: float = 0.0,
+                       seed: int = 0, start: int = 0) -> Iterator[dict]:
+    """
+    Yield synthetic metadata records for a schema. The same arguments always give the same records.
+
+    Parameters
+    ----------
+    records : int
+        Number of records.
+    schema_path : str, optional
+        Path to the JSON schema (default: the combined schema).
+    invalid_fraction : float, optional
+        Fraction of records with one error (default: 0). The kinds of error cycle through CORRUPTIONS.
+    seed : int, optional
+        Seed of the random generator (default: 0).
+    start : int, optional
+        Position of the first record in the catalogue (default: 0): generate_catalogue(n, start=k) yields the
+        records k to k + n - 1 of a larger catalogue with the same seed.
+
+    Yields
+    ------
+    dict
+        The records, generated one at a time so large catalogues can be streamed.
+    """
+    schema = SCHEMA_REGISTRY.get(schema_path).schema
+    for position in range(start, start + records):
+        rng = random.Random(f"{seed}:{position}")
+        record = _value("", schema, rng)
+        #spread the invalid records evenly: invalid is the number of invalid records before this one
+        invalid = int(position * invalid_fraction)
+        if int((position + 1) * invalid_fraction) > invalid:
+            record = corrupt_record(record, schema, rng, CORRUPTIONS[invalid % len(CORRUPTIONS)])
+        yield record
@@ -0,0 +1,291 @@
+"""
+Time the hot paths of `MetadataConfig` (loading, set(), validate(), export) and CSVW serialisation on a synthetic
+catalogue (see `benchmarks.catalogue`), and save the results as JSON so runs can be compared across commits.
+
+Each case is timed --repeat times (the fastest run is kept), then run again under tracemalloc for its memory
+peak (tracing slows Python code down, so the two are measured separately). Files are written to a temporary folder,
+at most --max-files of them.
+
+The catalogue is processed in batches of --batch-size records: every case runs on a batch before the next one is
+generated, and the results add up the batches (memory peaks are those of the largest batch). The records and
+configs of one batch are kept in memory, about 5 KB per record, so --batch-size bounds the memory of the suite
+(about 50 MB with the default 10,000) whatever the size of the catalogue, e.g. --records 1000000.
+
+Run from the repository root:
+    python -m benchmarks.run_suite --records 10000 --invalid-fraction 0.1
+    python -m benchmarks.run_suite --records 10000 --compare benchmarks/results/<previous run>.json --max-slowdown 1.25
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Optional
+
+from benchmarks.catalogue import SCHEMA_PATH, generate_catalogue
+from src.CSVW.metadata_to_csvw import CSVWMapping, iter_csvw
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.serializers import dumps_json
+
+RESULTS_PATH = "benchmarks/results"
+#fields rewritten by the set() cases
+SET_VALUES = {
+    "Dataset.title": "Updated title",
+    "Edition.quality_designation": "official",
+    "Dataset.contacts.email": "updated@ons.gov.uk",
+}
+
+
+def case_generate(state: dict) -> dict:
+    state["records"] = list(generate_catalogue(state["size"], SCHEMA_PATH, state["invalid_fraction"], state["seed"],
+                                               state["start"]))
+    return {"records": len(state["records"])}
+
+
+def case_import_from_dict(state: dict) -> dict:
+    configs = []
+    rejected = 0
+    for record in state["records"]:
+        cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+        try:
+            cfg.import_from_dict(record)
+        except (ValueError, KeyError):
+            rejected += 1
+        else:
+            configs.append(cfg)
+    state["configs"] = configs
+    return {"records": len(state["records"]), "rejected": rejected}
+
+
+def setup_files(state: dict):
+    state["files"] = []
+    for position, record in enumerate(state["records"][:state["max_files"]], state["start"]):
+        file_path = os.path.join(state["workdir"], f"record_{position}.json")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(dumps_json(record))
+        state["files"].append(file_path)
+
+
+def case_load_metadata_from_file(state: dict) -> dict:
+    rejected = 0
+    for file_path in state["files"]:
+        try:
+            MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT).load_metadata_from_file(file_path)
+        except (ValueError, KeyError):
+            rejected += 1
+    return {"records": len(state["files"]), "rejected": rejected}
+
+
+def case_set(state: dict) -> dict:
+    for cfg in state["configs"]:
+        for path, value in SET_VALUES.items():
+            cfg.set(path, value)
+    return {"records": len(state["configs"]), "calls": len(state["configs"]) * len(SET_VALUES)}
+
+
+def case_validate(state: dict) -> dict:
+    errors = sum(len(cfg.validate()) for cfg in state["configs"])
+    return {"records": len(state["configs"]), "errors": errors}
+
+
+def case_validate_incremental(state: dict) -> dict:
+    for cfg in state["configs"]:
+        cfg.set("Dataset.title", "Revalidated title")
+        cfg.validate(incremental=True)
+    return {"records": len(state["configs"])}
+
+
+def case_validate_documents(state: dict) -> dict:
+    #valid and invalid records alike, validated as documents without building configs
+    cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+    errors = sum(len(cfg.validate(metadata=record, structured=True)) for record in state["records"])
+    return {"records": len(state["records"]), "errors": errors}
+
+
+def case_export_to_json(state: dict) -> dict:
+    configs = state["configs"][:state["max_files"]]
+    for position, cfg in enumerate(configs, state["start"]):
+        cfg.export_to_json(f"export_{position}", state["workdir"])
+    return {"records": len(configs)}
+
+
+def case_csvw_to_json(state: dict) -> dict:
+    size = sum(len(csvw.toJSON()) for csvw in iter_csvw(state["configs"], CSVWMapping(SCHEMA_PATH)))
+    return {"records": len(state["configs"]), "bytes": size}
+
+
+#name -> (setup run untimed before the case or None, case); cases run in this order and use the state of earlier ones
+CASES = {
+    "generate": (None, case_generate),
+    "import_from_dict": (None, case_import_from_dict),
+    "load_metadata_from_file": (setup_files, case_load_metadata_from_file),
+    "set": (None, case_set),
+    "validate": (None, case_validate),
+    "validate_incremental": (None, case_validate_incremental),
+    "validate_documents": (None, case_validate_documents),
+    "export_to_json": (None, case_export_to_json),
+    "csvw_to_json": (None, case_csvw_to_json),
+}
+#cases the others depend on, always run
+REQUIRED_CASES = ["generate", "import_from_dict"]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_case(name: str, state: dict, memory: bool, repeat: int = 1) -> dict:
+    setup, case = CASES[name]
+    if setup is not None:
+        setup(state)
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = case(state)
+        runs.append(time.perf_counter() - start)
+    result = {"runs": runs, **result}
+    if memory:
+        tracemalloc.start()
+        case(state)
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def add_batch(total: Optional[dict], batch: dict) -> dict:
+    """Add the result of a case on one batch to its result on the previous batches."""
+    if total is None:
+        return batch
+    for key, value in batch.items():
+        if key == "runs":
+            total["runs"] = [before + run for before, run in zip(total["runs"], value)]
+        elif key == "peak_memory_bytes":
+            total[key] = max(total[key], value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def finish_case(result: dict) -> dict:
+    """Round the times of a case and add its fastest run and time per record."""
+    seconds = min(result["runs"])
+    result = {"seconds": round(seconds, 6), **result, "runs": [round(run, 6) for run in result["runs"]]}
+    if result.get("records"):
+        result["us_per_record"] = round(seconds / result["records"] * 1e6, 3)
+    return result
+
+
+def run_suite(records: int, invalid_fraction: float = 0.1, seed: int = 0, max_files: int = 10000,
+              cases=None, memory: bool = True, repeat: int = 3, batch_size: int = 10000) -> dict:
+    """
+    Run the benchmark cases and return the results (the JSON document saved by main()).
+
+    Parameters
+    ----------
+    records : int
+        Size of the synthetic catalogue.
+    invalid_fraction : float, optional
+        Fraction of invalid records (default: 0.1).
+    seed : int, optional
+        Seed of the catalogue (default: 0).
+    max_files : int, optional
+        Maximum number of files written by the file cases (default: 10000).
+    cases : list of str, optional
+        Names of the cases to run (default: all of CASES). "generate" and "import_from_dict" always run.
+    memory : bool, optional
+        Whether to measure the memory peak of each case (default: True).
+    repeat : int, optional
+        Number of timed runs of each case, the fastest being kept (default: 3).
+    batch_size : int, optional
+        Number of records generated and held in memory at once (default: 10000), see the module docstring.
+
+    Raises
+    ------
+    ValueError
+        If batch_size is lower than 1.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size should be at least 1.")
+    names = [name for name in CASES if cases is None or name in cases or name in REQUIRED_CASES]
+    results = dict.fromkeys(names)
+    with tempfile.TemporaryDirectory() as workdir:
+        for start in range(0, records, batch_size):
+            #files left to write, as the file cases write at most max_files over all batches
+            files = max(0, max_files - start)
+            state = {"size": min(batch_size, records - start), "start": start, "invalid_fraction": invalid_fraction,
+                     "seed": seed, "max_files": files, "workdir": workdir}
+            for name in names:
+                results[name] = add_batch(results[name], run_case(name, state, memory, repeat))
+            #the batch is dropped before the next one is generated
+            del state
+    for name in names:
+        results[name] = finish_case(results[name])
+        print(f"{name:<26}{results[name]['seconds']:>10.3f}s", file=sys.stderr)
+    return {
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parameters": {"records": records, "invalid_fraction": invalid_fraction, "seed": seed, "max_files": max_files, "repeat": repeat,
+                       "batch_size": batch_size},
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "results": results,
+    }
+
+
+def compare(previous: dict, current: dict, max_slowdown=None) -> bool:
+    """Print the time of each case against a previous run. Return False if a case got slower than max_slowdown times."""
+    ok = True
+    print(f"{'case':<26}{'previous':>10}{'current':>10}{'ratio':>8}")
+    for name, result in current["results"].items():
+        before = previous["results"].get(name)
+        if before is None or not before["seconds"]:
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        slower = max_slowdown is not None and ratio > max_slowdown
+        ok = ok and not slower
+        print(f"{name:<26}{before['seconds']:>9.3f}s{result['seconds']:>9.3f}s{ratio:>8.2f}{'  slower' if slower else ''}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--records", type=int, default=1000, help="size of the synthetic catalogue")
+    parser.add_argument("--invalid-fraction", type=float, default=0.1, help="fraction of invalid records")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-files", type=int, default=10000, help="maximum number of files written by the file cases")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), help="cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, the fastest is kept")
+    parser.add_argument("--batch-size", type=int, default=10000, help="records held in memory at once (default: 10000)")
+    parser.add_argument("--no-memory", action="store_true", help="don't measure memory peaks")
+    parser.add_argument("--output", help=f"results file (default: {RESULTS_PATH}/<commit>-<records>.json)")
+    parser.add_argument("--compare", help="results file of a previous run to compare with")
+    parser.add_argument("--max-slowdown", type=float, help="with --compare, exit with status 1 if a case is this many times slower")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.records, args.invalid_fraction, args.seed, args.max_files, args.cases, not args.no_memory, args.repeat,
+                        args.batch_size)
+    output = args.output or os.path.join(RESULTS_PATH, f"{results['commit']}-{args.records}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        if not compare(previous, results, args.max_slowdown):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
-import json
 from datetime import datetime
+from typing import Iterable, Optional
+
+from src.CSVW.column_inference import NA_OPTIONS, _load_pandas, column_name, infer_datatypes
+from src.CSVW.csv_validation import validate_csv
+from src.serializers import dumps_json_default
 
 class CSVW:
     def __init__(self,url:str,title:str,description:str,accrualPeriodicity:str,publisher_id:str=""):
@@ -26,6 +30,9 @@ class CSVW:
             "tableSchema":{"columns": [],"aboutUrl":""},
             "dct:accrualPeriodicity":accrualPeriodicity 
             }
+        #column name -> column dict, the same dicts as in tableSchema.columns, for O(1) lookups and duplicate checks
+        #(columns should be added with the methods below, not by editing self.csvw directly)
+        self._columns={}
 
     def contactPoint(self,fn:str,tel:str="",email:str=""):
         """
@@ -58,6 +65,10 @@ class CSVW:
             valueURL (str): A URI template property that is used to map the values of cells into URLs (optional).
             aboutUrl (str): A URI template property that MAY be used to indicate what a cell contains information about (optional).
             required (bool): Whether the column is required (default: False).
+
+        Raises:
+            ValueError: If name or titles is missing, or a column with this name is already in the table schema
+                (a repeated name used to add a second column with that name).
         """
         #There are the requirements but we might add more variables if requested
         if not name or not titles:
@@ -71,23 +82,119 @@ class CSVW:
             "datatype": datatype,
             "valueURL": valueURL}
         
-        self.csvw["tableSchema"]["columns"].append(columns)
+        self.add_columns([columns])
         # Set the aboutUrl if provided (only once for the table)
         if aboutUrl:
             self.csvw["tableSchema"]["aboutUrl"] = aboutUrl
 
+    def add_columns(self, columns: Iterable[dict]):
+        """
+        Adds many columns to the table schema at once.
+
+        Args:
+            columns (iterable of dict): Column dicts with at least "name" and "titles" (same keys as built by tableSchema).
+
+        Raises:
+            ValueError: If a column has no name or titles, or its name is already in the table schema
+                (or repeated in columns). No column is added then.
+        """
+        new_columns={}
+        for column in columns:
+            name=column.get("name")
+            if not name or not column.get("titles"):
+                raise ValueError("'name' and 'titles' are required fields for a table schema column.")
+            if name in self._columns or name in new_columns:
+                raise ValueError(f"Column '{name}' is already in the table schema.")
+            new_columns[name]=column
+        self._columns.update(new_columns)
+        self.csvw["tableSchema"]["columns"].extend(new_columns.values())
+
+    def add_columns_from_dataframe(self, frame, descriptions: Optional[dict] = None, required: Iterable[str] = (),
+                                   valueURLs: Optional[dict] = None, aboutUrl: str = ""):
+        """
+        Adds a column to the table schema for every column of a pandas DataFrame, with datatypes inferred column-wise.
+
+        Args:
+            frame (pandas.DataFrame): The table (or a sample of its rows). Headers become the column titles,
+                and names are derived from them (see column_inference.column_name).
+            descriptions (dict): Header -> description of the column (optional).
+            required (iterable of str): Headers of the required columns (optional).
+            valueURLs (dict): Header -> valueURL of the column (optional).
+            aboutUrl (str): A URI template for the table (optional).
+
+        Raises:
+            ValueError: If two headers give the same column name, or a column is already in the table schema.
+        """
+        descriptions=descriptions or {}
+        valueURLs=valueURLs or {}
+        required=set(required)
+        headers=[str(header) for header in frame.columns]
+        self.add_columns(
+            {
+                "name": column_name(header),
+                "titles": header,
+                "description": descriptions.get(header, ""),
+                "required": header in required,
+                "datatype": datatype,
+                "valueURL": valueURLs.get(header, "")}
+            for header, datatype in zip(headers, infer_datatypes(frame)))
+        if aboutUrl:
+            self.csvw["tableSchema"]["aboutUrl"] = aboutUrl
+
+    def add_columns_from_csv(self, file_path: str, sample_rows: int = 1000, **kwargs):
+        """
+        Adds a column to the table schema for every column of a CSV file, with datatypes inferred from its first rows.
+
+        Args:
+            file_path (str): Path to the CSV file.
+            sample_rows (int): Number of rows read to infer datatypes (default: 1000). With 0 only the header is read
+                and every column is a "string". Only empty cells are missing values, as in validate_csv.
+            **kwargs: Passed to add_columns_from_dataframe (descriptions, required, valueURLs, aboutUrl).
+        """
+        pd=_load_pandas()
+        self.add_columns_from_dataframe(pd.read_csv(file_path, nrows=sample_rows, **NA_OPTIONS), **kwargs)
+
+    def column(self, name: str) -> dict:
+        """
+        Returns a column of the table schema by name.
+
+        Raises:
+            KeyError: If there is no column with that name.
+        """
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError(f"'{name}' is not a column of the table schema.")
+
+    def column_names(self) -> list:
+        """Returns the names of the columns of the table schema, in order."""
+        return list(self._columns)
+
+    def validate_csv(self, file_path: str, **kwargs) -> dict:
+        """
+        Checks that a CSV file conforms to the table schema (datatypes and required columns), streaming it in chunks.
+
+        Args:
+            file_path (str): Path to the CSV file.
+            **kwargs: Passed to csv_validation.validate_csv (chunksize, max_samples, encoding).
+
+        Returns:
+            dict: The report of csv_validation.validate_csv, with per-column error counts and sample row numbers.
+        """
+        return validate_csv(self, file_path, **kwargs)
+
     #not sure if this JSON output format is the same as the ONS sample
     #ONS CSVW sample placed all keys and values in ome line
-def toJSON(self):
-    """
-    Returns the CSVW metadata as a compact one-line JSON string.
-
-    Returns:
-        str: The single-line JSON representation of the metadata.
-    """
-    #The first element (",") is the separator between items (key-value pairs or elements in arrays).
-    #The second element (":") is the separator between keys and values.
-    #If we want pretty-printed (multi-line) JSON, we use indent=4 in dumps
-    return json.dumps(self.csvw, separators=(",", ":"))
+    def toJSON(self):
+        """
+        Returns the CSVW metadata as a compact one-line JSON string.
+
+        Returns:
+            str: The single-line JSON representation of the metadata.
+        """
+        #The first element (",") is the separator between items (key-value pairs or elements in arrays).
+        #The second element (":") is the separator between keys and values.
+        #If we want pretty-printed (multi-line) JSON, we use indent=4 in dumps
+        return dumps_json_default(self.csvw, separators=(",", ":"))
 
 
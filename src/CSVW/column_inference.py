@@ -0,0 +1,125 @@
+import re
+from typing import Union
+
+
+#Date formats recognised in text columns, tried in order, with the CSVW datatype they map to.
+#A column is a date column only if every non-empty value parses with the same format.
+DATE_FORMATS = [
+    ("%Y-%m-%d", "date"),
+    ("%d/%m/%Y", {"base": "date", "format": "dd/MM/yyyy"}),
+    ("%Y-%m-%dT%H:%M:%S", "dateTime"),
+    ("%Y-%m-%dT%H:%M:%SZ", "dateTime"),
+]
+
+#pandas.read_csv options of every CSV reader of the package: only empty cells are missing values, so "NA", "null"
+#or "None" are read as text (which may not match the datatype of the column), not as missing
+NA_OPTIONS = {"keep_default_na": False, "na_values": [""]}
+
+#pandas.api.types.infer_dtype results -> CSVW datatype, for columns holding python objects
+_INFERRED_DATATYPES = {
+    "boolean": "boolean",
+    "integer": "integer",
+    "floating": "decimal",
+    "mixed-integer-float": "decimal",
+    "decimal": "decimal",
+    "datetime64": "dateTime",
+    "datetime": "dateTime",
+    "date": "date",
+}
+
+
+def _load_pandas():
+    """Import pandas only when columns are inferred, it's slow to import."""
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("Inferring CSVW columns requires pandas: pip install -r requirements.txt")
+    return pd
+
+
+def column_name(title: str) -> str:
+    """
+    Turn a column header into a CSVW column name: lower case, with runs of other characters than
+    letters, digits and underscores replaced by a single underscore (e.g. "Time Period (Years)" -> "time_period_years").
+    """
+    name = re.sub(r"\W+", "_", str(title).strip().lower()).strip("_")
+    #names starting with "_" are reserved by CSVW
+    return name or "column"
+
+
+def infer_datatype(column) -> Union[str, dict]:
+    """
+    Infer the CSVW datatype of a pandas Series.
+
+    Parameters
+    ----------
+    column : pandas.Series
+        The values of the column (e.g. read with pandas.read_csv).
+
+    Returns
+    -------
+    str or dict
+        A CSVW datatype ("boolean", "integer", "decimal", "date", "dateTime" or "string"), or a derived datatype
+        such as {"base": "date", "format": "dd/MM/yyyy"}. Empty columns are "string".
+    """
+    pd = _load_pandas()
+    types = pd.api.types
+    if types.is_bool_dtype(column.dtype):
+        return "boolean"
+    if types.is_integer_dtype(column.dtype):
+        return "integer"
+    if types.is_datetime64_any_dtype(column.dtype):
+        return "dateTime"
+    values = column.dropna()
+    if len(values) == 0:
+        return "string"
+    if types.is_float_dtype(column.dtype):
+        #integer columns with missing values are read as floats
+        return "integer" if bool((values % 1 == 0).all()) else "decimal"
+    inferred = types.infer_dtype(values, skipna=True)
+    if inferred != "string":
+        return _INFERRED_DATATYPES.get(inferred, "string")
+    for date_format, datatype in DATE_FORMATS:
+        #parsed in one vectorised call, and only continued while every value matches
+        if pd.to_datetime(values, format=date_format, errors="coerce").notna().all():
+            return datatype
+    return "string"
+
+
+def infer_datatypes(frame) -> list:
+    """
+    Infer the CSVW datatype of every column of a DataFrame (see `infer_datatype`).
+
+    Columns with a bool, integer or datetime dtype are typed from their dtype alone, and all the float
+    columns are checked together in one NumPy array; only text/object columns are looked at one by one.
+
+    Returns
+    -------
+    list of str or dict
+        The datatype of each column, in column order (headers may repeat, so columns are taken by position).
+    """
+    pd = _load_pandas()
+    types = pd.api.types
+    datatypes = [None] * frame.shape[1]
+    float_positions = []
+    for position, dtype in enumerate(frame.dtypes):
+        if types.is_bool_dtype(dtype):
+            datatypes[position] = "boolean"
+        elif types.is_integer_dtype(dtype):
+            datatypes[position] = "integer"
+        elif types.is_datetime64_any_dtype(dtype):
+            datatypes[position] = "dateTime"
+        elif types.is_float_dtype(dtype):
+            float_positions.append(position)
+        else:
+            datatypes[position] = infer_datatype(frame.iloc[:, position])
+
+    if float_positions:
+        values = frame.iloc[:, float_positions].to_numpy(dtype="float64", na_value=float("nan"))
+        present = ~pd.isna(values)
+        has_values = present.any(axis=0)
+        #integer columns with missing values are read as floats
+        integral = ((values % 1 == 0) | ~present).all(axis=0)
+        for position, has_value, is_integral in zip(float_positions, has_values, integral):
+            datatypes[position] = ("integer" if is_integral else "decimal") if has_value else "string"
+    return datatypes
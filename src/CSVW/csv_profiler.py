@@ -0,0 +1,325 @@
+import codecs
+import csv
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from src.CSVW.column_inference import DATE_FORMATS, NA_OPTIONS, _load_pandas, column_name
+
+
+class ColumnProfile:
+    """
+    Statistics of one CSV column, updated chunk by chunk so the file never has to be loaded at once.
+
+    Each candidate datatype stays possible only while every non-empty value seen so far matches it.
+
+    Attributes
+    ----------
+    title : str
+        The column header.
+    count : int
+        Number of rows.
+    nulls : int
+        Number of empty values.
+    is_boolean, is_integer, is_decimal : bool
+        Whether every non-empty value is a boolean, an integer, a number.
+    date_formats : list
+        Indexes (in DATE_FORMATS) of the date formats every non-empty value matches.
+    minimum, maximum : float or None
+        Range of the values, while they are all numbers.
+    min_length, max_length : int or None
+        Range of the lengths of the values read as text (chunks the parser read as numbers are not counted).
+    """
+    __slots__ = ("title", "count", "nulls", "is_boolean", "is_integer", "is_decimal", "date_formats",
+                 "minimum", "maximum", "min_length", "max_length")
+
+    def __init__(self, title: str):
+        self.title = title
+        self.count = 0
+        self.nulls = 0
+        self.is_boolean = True
+        self.is_integer = True
+        self.is_decimal = True
+        self.date_formats = list(range(len(DATE_FORMATS)))
+        self.minimum = None
+        self.maximum = None
+        self.min_length = None
+        self.max_length = None
+
+    def update(self, column):
+        """
+        Add the values of a chunk of the column, a pandas Series read by pandas.read_csv with its own dtype
+        inference (the C parser types numbers and booleans much faster than checking each text value).
+        """
+        pd = _load_pandas()
+        types = pd.api.types
+        self.count += len(column)
+        values = column.dropna()
+        self.nulls += len(column) - len(values)
+        if len(values) == 0:
+            return
+        dtype = values.dtype
+        if types.is_bool_dtype(dtype):
+            self._rule_out(boolean=False)
+            return
+        if types.is_integer_dtype(dtype) or types.is_float_dtype(dtype):
+            #integer columns with missing values are read as floats
+            integral = types.is_integer_dtype(dtype) or bool((values % 1 == 0).all())
+            self._rule_out(numeric=False, integer=not integral)
+            if self.is_decimal:
+                self.minimum = _combine(min, self.minimum, float(values.min()))
+                self.maximum = _combine(max, self.maximum, float(values.max()))
+            return
+        inferred = types.infer_dtype(values, skipna=True)
+        if inferred == "boolean":
+            #booleans mixed with missing values are read as python objects
+            self._rule_out(boolean=False)
+        elif inferred == "string":
+            self._rule_out(text=False)
+            lengths = values.str.len()
+            self.min_length = _combine(min, self.min_length, int(lengths.min()))
+            self.max_length = _combine(max, self.max_length, int(lengths.max()))
+            #parsed in one vectorised call per format, and only while the format is still possible
+            self.date_formats = [index for index in self.date_formats
+                                 if pd.to_datetime(values, format=DATE_FORMATS[index][0], errors="coerce").notna().all()]
+        else:
+            self._rule_out()
+
+    def _rule_out(self, boolean: bool = True, numeric: bool = True, integer: bool = True, text: bool = True):
+        """Rule out the datatypes a chunk doesn't match (e.g. _rule_out(boolean=False) keeps only boolean)."""
+        if boolean:
+            self.is_boolean = False
+        if numeric:
+            self.is_integer = self.is_decimal = False
+            self.minimum = self.maximum = None
+        elif integer:
+            self.is_integer = False
+        if text:
+            self.date_formats = []
+
+    def merge(self, other: "ColumnProfile"):
+        """Add the statistics of another part of the same column (e.g. profiled by another process)."""
+        self.count += other.count
+        self.nulls += other.nulls
+        if other.count == other.nulls:
+            #nothing but empty values, which rule out no datatype
+            return
+        if self.count - other.count == self.nulls - other.nulls:
+            #this part had no values: take the other one's candidates as they are
+            self.is_boolean, self.is_integer, self.is_decimal = other.is_boolean, other.is_integer, other.is_decimal
+            self.date_formats = list(other.date_formats)
+        else:
+            self.is_boolean = self.is_boolean and other.is_boolean
+            self.is_integer = self.is_integer and other.is_integer
+            self.is_decimal = self.is_decimal and other.is_decimal
+            self.date_formats = [index for index in self.date_formats if index in other.date_formats]
+        if self.is_decimal:
+            self.minimum = _combine(min, self.minimum, other.minimum)
+            self.maximum = _combine(max, self.maximum, other.maximum)
+        else:
+            self.minimum = self.maximum = None
+        self.min_length = _combine(min, self.min_length, other.min_length)
+        self.max_length = _combine(max, self.max_length, other.max_length)
+
+    @property
+    def required(self) -> bool:
+        """True if the column has values and none is empty."""
+        return self.count > 0 and self.nulls == 0
+
+    @property
+    def datatype(self):
+        """The CSVW datatype of the column (see `column_inference.infer_datatype` for the possible values)."""
+        if self.count == self.nulls:
+            return "string"
+        if self.is_boolean:
+            return "boolean"
+        if self.is_integer:
+            return "integer"
+        if self.is_decimal:
+            return "decimal"
+        if self.date_formats:
+            return DATE_FORMATS[self.date_formats[0]][1]
+        return "string"
+
+    def csvw_column(self, description: str = "", valueURL: str = "", include_ranges: bool = False) -> dict:
+        """
+        Return the column as a CSVW column dict (the keys built by `CSVW.tableSchema`).
+
+        With include_ranges, the datatype of number and string columns becomes a derived datatype with the
+        minimum/maximum value or minLength/maxLength seen (e.g. {"base": "integer", "minimum": 1, "maximum": 9}).
+        """
+        datatype = self.datatype
+        if include_ranges and datatype in ("integer", "decimal") and self.minimum is not None:
+            cast = int if datatype == "integer" else float
+            datatype = {"base": datatype, "minimum": cast(self.minimum), "maximum": cast(self.maximum)}
+        elif include_ranges and datatype == "string" and self.min_length is not None:
+            datatype = {"base": "string", "minLength": self.min_length, "maxLength": self.max_length}
+        return {
+            "name": column_name(self.title),
+            "titles": self.title,
+            "description": description,
+            "required": self.required,
+            "datatype": datatype,
+            "valueURL": valueURL}
+
+
+def _combine(function, current, new):
+    """Combine two optional values (e.g. min of a running minimum), ignoring None."""
+    if current is None:
+        return new
+    if new is None:
+        return current
+    return function(current, new)
+
+
+class CSVProfile:
+    """
+    Result of `profile_csv`: the statistics of every column of a CSV file.
+
+    Attributes
+    ----------
+    file_path : str
+        The profiled file.
+    rows : int
+        Number of data rows.
+    columns : list of ColumnProfile
+        Statistics of each column, in file order.
+
+    Examples
+    --------
+    >>> profile = profile_csv("data.csv", workers=4)
+    >>> csvw.add_columns(profile.csvw_columns())
+    >>> cfg.set("Edition.distributions", profile.distribution())
+    """
+    def __init__(self, file_path: str, columns: list):
+        self.file_path = str(file_path)
+        self.columns = columns
+        self.rows = columns[0].count if columns else 0
+
+    def csvw_columns(self, descriptions: Optional[dict] = None, valueURLs: Optional[dict] = None, include_ranges: bool = False) -> list:
+        """
+        Return the CSVW column dicts of every column, ready for `CSVW.add_columns`.
+
+        Parameters
+        ----------
+        descriptions : dict, optional
+            Header -> description of the column.
+        valueURLs : dict, optional
+            Header -> valueURL of the column.
+        include_ranges : bool, optional
+            Add the value/length ranges seen to the datatypes (see `ColumnProfile.csvw_column`).
+        """
+        descriptions = descriptions or {}
+        valueURLs = valueURLs or {}
+        return [column.csvw_column(descriptions.get(column.title, ""), valueURLs.get(column.title, ""), include_ranges)
+                for column in self.columns]
+
+    def distribution(self, title: Optional[str] = None) -> dict:
+        """
+        Return the `Edition.distributions` fields of the file for `MetadataConfig.set`.
+
+        Parameters
+        ----------
+        title : str, optional
+            Title of the distribution (default: the file name without extension).
+        """
+        return {"title": title or Path(self.file_path).stem, "format": "csv"}
+
+
+def _read_header(file_path: str, encoding: str) -> list:
+    """Return the headers as they are in the file (pandas would rename repeated ones, e.g. "a" to "a.1")."""
+    #a UTF-8 file may start with a byte order mark, which csv.reader would leave in the first header
+    if codecs.lookup(encoding).name == "utf-8":
+        encoding = "utf-8-sig"
+    with open(file_path, newline="", encoding=encoding) as f:
+        return next(csv.reader(f), [])
+
+
+def _profile_range(file_path: str, start: int, end: int, header: list, chunk_bytes: int, encoding: str) -> list:
+    """Profile the rows between two byte offsets (at line starts), reading at most about chunk_bytes at a time."""
+    pd = _load_pandas()
+    profiles = [ColumnProfile(title) for title in header]
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = start
+        while position < end:
+            #chunks end at a line end, so no row is split between two chunks
+            cut = mapped.find(b"\n", min(position + chunk_bytes, end) - 1, end)
+            cut = end if cut == -1 else cut + 1
+            #named by position, as headers may repeat
+            chunk = pd.read_csv(io.BytesIO(mapped[position:cut]), header=None, names=range(len(header)), encoding=encoding,
+                                **NA_OPTIONS)
+            for position_in_header, profile in enumerate(profiles):
+                profile.update(chunk.iloc[:, position_in_header])
+            position = cut
+    return profiles
+
+
+def _byte_ranges(file_path: str, parts: int) -> list:
+    """Split the data rows of a file (after the header line) into about equal byte ranges starting at line starts."""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        start = mapped.find(b"\n") + 1 if size else 0
+        if start == 0:
+            return []
+        bounds = [start]
+        for part in range(1, parts):
+            line_end = mapped.find(b"\n", max(start + (size - start) * part // parts, bounds[-1]))
+            if line_end == -1 or line_end + 1 >= size:
+                break
+            bounds.append(line_end + 1)
+        bounds.append(size)
+    return [(begin, finish) for begin, finish in zip(bounds, bounds[1:]) if begin < finish]
+
+
+def profile_csv(file_path: str, chunksize: int = 100000, workers: int = 1, chunk_bytes: int = 64 * 1024 * 1024,
+                encoding: str = "utf-8") -> CSVProfile:
+    """
+    Scan a CSV file once, in bounded memory, and return the datatype, nullability and value ranges of each column.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the CSV file (with a header line).
+    chunksize : int, optional
+        Rows parsed at a time when profiling in a single process (default: 100000).
+    workers : int, optional
+        Number of processes (default: 1). With more, the file is split into byte ranges at line ends and
+        each process memory-maps the file and profiles its range, chunk_bytes at a time. Files with line
+        breaks inside quoted values must be profiled with a single worker.
+    chunk_bytes : int, optional
+        Bytes parsed at a time by each process when workers > 1 (default: 64 MB).
+    encoding : str, optional
+        Encoding of the file (default: "utf-8").
+
+    Returns
+    -------
+    CSVProfile
+        The statistics of every column.
+
+    Raises
+    ------
+    ValueError
+        If workers is lower than 1.
+    """
+    if workers < 1:
+        raise ValueError("workers should be at least 1.")
+    pd = _load_pandas()
+    header = _read_header(file_path, encoding)
+    if workers == 1:
+        profiles = [ColumnProfile(title) for title in header]
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, encoding=encoding, **NA_OPTIONS):
+            for position, profile in enumerate(profiles):
+                profile.update(chunk.iloc[:, position])
+        return CSVProfile(file_path, profiles)
+
+    profiles = [ColumnProfile(title) for title in header]
+    ranges = _byte_ranges(file_path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_profile_range, str(file_path), start, end, header, chunk_bytes, encoding) for start, end in ranges]
+        for future in futures:
+            for profile, part in zip(profiles, future.result()):
+                profile.merge(part)
+    return CSVProfile(file_path, profiles)
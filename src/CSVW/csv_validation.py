@@ -0,0 +1,207 @@
+import codecs
+import csv
+import re
+
+from src.CSVW.column_inference import DATE_FORMATS, NA_OPTIONS, _load_pandas
+
+
+#CSVW numeric datatypes, checked the same way
+NUMERIC_DATATYPES = ["integer", "int", "long", "short", "decimal", "double", "float", "number",
+                     "nonNegativeInteger", "positiveInteger"]
+INTEGER_DATATYPES = ["integer", "int", "long", "short", "nonNegativeInteger", "positiveInteger"]
+#lexical forms of CSVW booleans
+BOOLEAN_VALUES = ["true", "false", "1", "0"]
+
+#CSVW date format pattern fields -> strptime directives (the subset used by the catalogue)
+_PATTERN_FIELDS = {"yyyy": "%Y", "MM": "%m", "dd": "%d", "HH": "%H", "mm": "%M", "ss": "%S"}
+
+
+def _strptime_format(pattern: str) -> str:
+    """Translate a CSVW date format pattern (e.g. "dd/MM/yyyy") to a strptime format (e.g. "%d/%m/%Y")."""
+    return re.sub("|".join(_PATTERN_FIELDS), lambda match: _PATTERN_FIELDS[match.group(0)], pattern)
+
+
+class ColumnCheck:
+    """
+    The checks of one tableSchema column, compiled once from its datatype and run on every chunk of the file.
+
+    Attributes
+    ----------
+    name, title : str
+        The column name and the header it's read from.
+    required : bool
+        Whether empty values are errors.
+    base : str
+        The base datatype (e.g. "integer" for {"base": "integer", "minimum": 0}).
+    date_formats : list of str
+        strptime formats accepted for date/dateTime columns.
+    minimum, maximum, min_length, max_length : optional
+        Bounds of derived datatypes.
+    """
+    def __init__(self, column: dict):
+        self.name = column["name"]
+        titles = column.get("titles") or column["name"]
+        self.title = titles[0] if isinstance(titles, list) else titles
+        self.required = bool(column.get("required"))
+        datatype = column.get("datatype") or "string"
+        if isinstance(datatype, str):
+            datatype = {"base": datatype}
+        self.base = datatype.get("base", "string")
+        self.minimum = datatype.get("minimum")
+        self.maximum = datatype.get("maximum")
+        self.min_length = datatype.get("minLength")
+        self.max_length = datatype.get("maxLength")
+        if "format" in datatype and self.base in ("date", "dateTime"):
+            self.date_formats = [_strptime_format(datatype["format"])]
+        else:
+            self.date_formats = [date_format for date_format, inferred in DATE_FORMATS if inferred == self.base]
+
+    @property
+    def reads_text(self) -> bool:
+        """Whether the column should be read as text rather than typed by the CSV parser."""
+        return self.base not in NUMERIC_DATATYPES and self.base != "boolean"
+
+    def invalid_datatype(self, values):
+        """Return a boolean mask of the (non-empty) values which don't match the datatype or its bounds."""
+        pd = _load_pandas()
+        types = pd.api.types
+        if self.base in NUMERIC_DATATYPES:
+            if types.is_numeric_dtype(values.dtype) and not types.is_bool_dtype(values.dtype):
+                #typed by the C parser: every value is a number
+                numbers = values
+            else:
+                numbers = pd.to_numeric(values.astype(str), errors="coerce")
+            invalid = numbers.isna()
+            if self.base in INTEGER_DATATYPES:
+                invalid |= numbers % 1 != 0
+            if self.base == "nonNegativeInteger":
+                invalid |= numbers < 0
+            elif self.base == "positiveInteger":
+                invalid |= numbers <= 0
+            if self.minimum is not None:
+                invalid |= numbers < self.minimum
+            if self.maximum is not None:
+                invalid |= numbers > self.maximum
+            return invalid.to_numpy(dtype=bool, na_value=True)
+        if self.base == "boolean":
+            if types.is_bool_dtype(values.dtype):
+                return pd.Series(False, index=values.index).to_numpy()
+            return ~values.astype(str).str.lower().isin(BOOLEAN_VALUES).to_numpy()
+        values = values.astype(str)
+        if self.date_formats:
+            invalid = pd.Series(True, index=values.index)
+            for date_format in self.date_formats:
+                #only the values no format matched so far are parsed again
+                invalid[invalid] = pd.to_datetime(values[invalid], format=date_format, errors="coerce").isna()
+            return invalid.to_numpy()
+        if self.min_length is not None or self.max_length is not None:
+            lengths = values.str.len()
+            invalid = pd.Series(False, index=values.index)
+            if self.min_length is not None:
+                invalid |= lengths < self.min_length
+            if self.max_length is not None:
+                invalid |= lengths > self.max_length
+            return invalid.to_numpy()
+        #strings and datatypes without checks (e.g. anyURI)
+        return pd.Series(False, index=values.index).to_numpy()
+
+
+def _column_report() -> dict:
+    return {"errors": 0, "required": 0, "datatype": 0, "rows": []}
+
+
+def _add_errors(report: dict, kind: str, rows, max_samples: int):
+    """Count errors of a column and keep the first row numbers as samples."""
+    report[kind] += len(rows)
+    report["errors"] += len(rows)
+    missing_samples = max_samples - len(report["rows"])
+    if missing_samples > 0:
+        report["rows"] = sorted(report["rows"] + [int(row) for row in rows[:missing_samples]])[:max_samples]
+
+
+def validate_csv(csvw, file_path: str, chunksize: int = 100000, max_samples: int = 10, encoding: str = "utf-8") -> dict:
+    """
+    Check that a CSV file conforms to a CSVW tableSchema: every value of a column matches its datatype
+    (and the bounds of derived datatypes), and required columns have no empty values.
+
+    The file is read chunksize rows at a time, and each check runs on a whole column of a chunk at once.
+    Numeric and boolean columns are typed by the pandas C parser, so a column which parses entirely as numbers
+    costs no further check; values are only looked at one by one in chunks which fail to parse. Integer columns
+    with empty values are read as floats, so integral values written as decimals (e.g. "12.0") are accepted.
+
+    Parameters
+    ----------
+    csvw : CSVW or dict
+        The CSVW metadata (a `CSVW` object or its `csvw` dictionary). Columns are matched to the CSV header by title.
+    file_path : str
+        Path to the CSV file (with a header line).
+    chunksize : int, optional
+        Rows read at a time (default: 100000).
+    max_samples : int, optional
+        Number of row numbers kept per column (default: 10).
+    encoding : str, optional
+        Encoding of the file (default: "utf-8"). UTF-8 files may start with a byte order mark.
+
+    Returns
+    -------
+    dict
+        "file": the file path, "rows": number of data rows, "valid": whether there is no error,
+        "missing_columns": titles of the schema columns not in the header, "extra_columns": headers not in the schema,
+        "columns": column name -> {"errors", "required", "datatype": error counts, "rows": sample row numbers
+        (1 for the first data row)}.
+
+    Examples
+    --------
+    >>> report = validate_csv(csvw, "data.csv")
+    >>> {name: column["errors"] for name, column in report["columns"].items() if column["errors"]}
+    """
+    pd = _load_pandas()
+    #a UTF-8 file may start with a byte order mark, which csv.reader would leave in the first header
+    if codecs.lookup(encoding).name == "utf-8":
+        encoding = "utf-8-sig"
+    metadata = csvw if isinstance(csvw, dict) else csvw.csvw
+    checks = [ColumnCheck(column) for column in metadata["tableSchema"]["columns"]]
+
+    with open(file_path, newline="", encoding=encoding) as f:
+        header = next(csv.reader(f), [])
+    #the headers as pandas names them (repeated headers get a ".1" suffix)
+    labels = [str(label) for label in pd.read_csv(file_path, nrows=0, encoding=encoding).columns]
+    positions = {}
+    for position, title in enumerate(header):
+        positions.setdefault(title, position)
+    titles = {check.title for check in checks}
+    report = {
+        "file": str(file_path),
+        "rows": 0,
+        "valid": True,
+        "missing_columns": [check.title for check in checks if check.title not in positions],
+        "extra_columns": [title for title in header if title not in titles],
+        "columns": {check.name: _column_report() for check in checks},
+    }
+    checks = [check for check in checks if check.title in positions]
+    check_labels = [labels[positions[check.title]] for check in checks]
+    usecols = list(dict.fromkeys(check_labels))
+    dtypes = {labels[positions[check.title]]: str for check in checks if check.reads_text}
+
+    if checks:
+        chunks = pd.read_csv(file_path, usecols=usecols, dtype=dtypes, chunksize=chunksize, encoding=encoding, **NA_OPTIONS)
+        for chunk in chunks:
+            report["rows"] += len(chunk)
+            #row numbers count data rows from 1, as in CSVW
+            rows = chunk.index.to_numpy() + 1
+            for check, label in zip(checks, check_labels):
+                column_report = report["columns"][check.name]
+                values = chunk[label]
+                empty = values.isna().to_numpy()
+                if check.required and empty.any():
+                    _add_errors(column_report, "required", rows[empty], max_samples)
+                present = ~empty
+                if present.any():
+                    invalid = check.invalid_datatype(values[present])
+                    if invalid.any():
+                        _add_errors(column_report, "datatype", rows[present][invalid], max_samples)
+    else:
+        report["rows"] = sum(len(chunk) for chunk in pd.read_csv(file_path, usecols=[], chunksize=chunksize, encoding=encoding))
+
+    report["valid"] = not report["missing_columns"] and not any(column["errors"] for column in report["columns"].values())
+    return report
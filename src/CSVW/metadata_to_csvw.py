@@ -0,0 +1,205 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from src.CSVW.CSVW_metadata import CSVW
+from src.compact_records import MAPPING_TYPES
+from src.config_objects import MetadataConfig
+from src.schema_cache import SCHEMA_REGISTRY
+from src.schema_validators import CompiledSchema
+
+
+#CSVW constructor argument -> dotted metadata path it's taken from
+DEFAULT_FIELDS = {
+    "title": "Dataset.title",
+    "description": "Dataset.description",
+    "publisher_id": "Dataset.publisher.href",
+    "distribution_title": "Edition.distributions.title",
+    "distribution_format": "Edition.distributions.format",
+}
+#contactPoint argument -> key of the contact objects
+CONTACT_FIELDS = {"fn": "name", "tel": "telephone", "email": "email"}
+CONTACTS_PATH = "Dataset.contacts"
+
+_MISSING = object()
+
+
+def _lookup(metadata, keys: tuple):
+    """Follow already split keys through nested dictionaries/compact records, returning _MISSING if a key is absent."""
+    value = metadata
+    for key in keys:
+        if isinstance(value, MAPPING_TYPES) and key in value:
+            value = value[key]
+        else:
+            return _MISSING
+    return value
+
+
+class CSVWMapping:
+    """
+    Mapping from the metadata of a `MetadataConfig` to the fields of a `CSVW` document, compiled once for a batch.
+
+    Every path is checked against the schema and split when the mapping is built, so mapping a record only
+    follows keys through its nested dictionaries: no path is parsed or resolved again per record.
+
+    Attributes
+    ----------
+    fields : dict
+        CSVW field -> tuple of keys of the metadata path it's taken from.
+    contacts : tuple
+        Keys of the contacts object (or list of objects) mapped to `CSVW.contactPoint`.
+    accrualPeriodicity : str
+        Update frequency of every document (the metadata schema has no such field).
+
+    Examples
+    --------
+    >>> mapping = CSVWMapping(r"data/Schema/CombinedSchema.json", accrualPeriodicity="Monthly")
+    >>> csvw = mapping.to_csvw(cfg)
+    """
+    def __init__(self, schema: Union[str, dict, CompiledSchema] = r"data/Schema/CombinedSchema.json",
+                 fields: Optional[dict] = None, accrualPeriodicity: str = ""):
+        """
+        Parameters
+        ----------
+        schema : str, dict or CompiledSchema, optional
+            The metadata schema (default: the combined schema).
+        fields : dict, optional
+            CSVW field -> dotted metadata path, overriding DEFAULT_FIELDS. "url" can be mapped too;
+            by default it's the distribution file name, "{distribution_title}.{distribution_format}".
+        accrualPeriodicity : str, optional
+            Update frequency of every document (e.g. "Weekly").
+
+        Raises
+        ------
+        KeyError
+            If a path is not a field of the schema.
+        """
+        if isinstance(schema, CompiledSchema):
+            compiled = schema
+        elif isinstance(schema, dict):
+            compiled = CompiledSchema(schema)
+        else:
+            compiled = SCHEMA_REGISTRY.get(schema)
+        paths = dict(DEFAULT_FIELDS, **(fields or {}))
+        #resolve() raises KeyError for paths which are not in the schema
+        self.fields = {field: compiled.resolve(path).keys for field, path in paths.items()}
+        self.contacts = compiled.resolve(CONTACTS_PATH).keys
+        self.accrualPeriodicity = accrualPeriodicity
+
+    def values(self, metadata) -> dict:
+        """Return CSVW field -> value for the metadata of a record ("" for missing or empty values)."""
+        values = {}
+        for field, keys in self.fields.items():
+            value = _lookup(metadata, keys)
+            values[field] = "" if value is _MISSING or value is None else value
+        return values
+
+    def to_csvw(self, record: Union[MetadataConfig, dict], issued: Optional[str] = None) -> CSVW:
+        """
+        Build the CSVW document of a record.
+
+        Parameters
+        ----------
+        record : MetadataConfig or dict
+            The (validated) metadata.
+        issued : str, optional
+            The "dct:issued" timestamp (default: now).
+
+        Returns
+        -------
+        CSVW
+            The document, with a contact point per contact of the record and no table schema columns.
+        """
+        metadata = record._metadata if isinstance(record, MetadataConfig) else record
+        values = self.values(metadata)
+        url = values.get("url") or ".".join(part for part in (values["distribution_title"], values["distribution_format"]) if part)
+        csvw = CSVW(url, values["title"], values["description"], self.accrualPeriodicity, values["publisher_id"])
+        if issued is not None:
+            csvw.csvw["dct:issued"] = issued
+        contacts = _lookup(metadata, self.contacts)
+        if isinstance(contacts, MAPPING_TYPES):
+            contacts = [contacts]
+        for contact in contacts if isinstance(contacts, list) else []:
+            contact_point = {argument: contact[key] if key in contact and contact[key] is not None else ""
+                             for argument, key in CONTACT_FIELDS.items()}
+            #default metadata holds empty contacts, which contactPoint would reject
+            if any(contact_point.values()):
+                csvw.contactPoint(**contact_point)
+        return csvw
+
+
+def iter_csvw(records: Iterable[Union[MetadataConfig, dict]], mapping: Optional[CSVWMapping] = None) -> Iterator[CSVW]:
+    """
+    Convert a stream of metadata records to CSVW documents, one at a time.
+
+    Parameters
+    ----------
+    records : iterable of MetadataConfig or dict
+        The (validated) metadata records. They are consumed lazily, so a large catalogue can be streamed.
+    mapping : CSVWMapping, optional
+        The compiled mapping (default: `CSVWMapping()` with the combined schema).
+
+    Yields
+    ------
+    CSVW
+        The document of each record, in order. All documents of a batch share the same "dct:issued" timestamp.
+
+    Examples
+    --------
+    >>> for csvw in iter_csvw(configs, CSVWMapping(accrualPeriodicity="Monthly")):
+    ...     csvw.add_columns_from_csv(...)
+    """
+    mapping = mapping or CSVWMapping()
+    issued = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    for record in records:
+        yield mapping.to_csvw(record, issued)
+
+
+def export_csvw_many(records: Iterable[Union[MetadataConfig, dict]], file_path: str = "results",
+                     mapping: Optional[CSVWMapping] = None) -> list:
+    """
+    Convert metadata records to CSVW documents and write each to "<url>-metadata.json" (with the file name of the
+    url), the file name CSVW processors look for next to a CSV file. Files are written atomically (see
+    `bulk_export.write_atomic`), once every document is converted and their names are checked.
+
+    Parameters
+    ----------
+    records : iterable of MetadataConfig or dict
+        The (validated) metadata records.
+    file_path : str, optional
+        Folder the files are written to (default: "results"). It's created if needed.
+    mapping : CSVWMapping, optional
+        The compiled mapping (default: `CSVWMapping()` with the combined schema).
+
+    Returns
+    -------
+    list of str
+        The names of the files written, in order.
+
+    Raises
+    ------
+    ValueError
+        If a record has no url (no distribution title or mapped "url"), or a url with the same file name as another
+        record (e.g. "2023/data.csv" and "2024/data.csv"), as one file would overwrite the other. Nothing is written then.
+    """
+    #imported here, so converting documents doesn't import the export machinery
+    from src.bulk_export import write_atomic
+
+    documents = []
+    #file name -> url of the record written to it
+    urls = {}
+    for csvw in iter_csvw(records, mapping):
+        url = csvw.csvw["url"]
+        if not url:
+            raise ValueError(f"No url for the CSVW metadata of '{csvw.csvw['dct:title']}'.")
+        name = f"{Path(url).name}-metadata.json"
+        if name in urls:
+            raise ValueError(f"The records with the urls '{urls[name]}' and '{url}' are both exported to '{name}'.")
+        urls[name] = url
+        documents.append((name, csvw.toJSON().encode()))
+
+    output_path = Path(file_path)
+    output_path.mkdir(parents=True, exist_ok=True)
+    for name, data in documents:
+        write_atomic(output_path / name, data)
+    return [name for name, _ in documents]
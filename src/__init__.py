@@ -1 +1,7 @@
-from .config_objects import MetadataConfig, COMBINED_DEFAULT
+#MetadataConfig and COMBINED_DEFAULT are imported on first access, so running a submodule
+#(e.g. "python -m src.main --help") doesn't import the whole package first
+def __getattr__(name: str):
+    if name in ("MetadataConfig", "COMBINED_DEFAULT"):
+        from . import config_objects
+        return getattr(config_objects, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
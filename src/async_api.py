@@ -0,0 +1,131 @@
+import asyncio
+import collections
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
+
+from src.batch_validation import _init_worker, _validate_document
+from src.bulk_export import export_many
+from src.executors import cpu_executor, run_io
+from src.schema_cache import SCHEMA_REGISTRY
+from src.schema_validators import CompiledSchema, error_limit
+
+
+async def _aiter_documents(documents):
+    """Iterate over a sync or async iterable of documents."""
+    if hasattr(documents, "__aiter__"):
+        async for document in documents:
+            yield document
+    else:
+        for document in documents:
+            yield document
+
+
+async def aiter_validate(documents: Union[Iterable, AsyncIterable], schema: Union[str, dict, CompiledSchema] = r"data/Schema/CombinedSchema.json",
+                         workers: Optional[int] = None, max_pending: Optional[int] = None, mode: str = "full",
+                         max_errors: Optional[int] = None, structured: bool = False) -> AsyncIterator[dict]:
+    """
+    Validate many metadata documents off the event loop, yielding a report per document in input order.
+
+    At most `max_pending` documents are being validated (or waiting for a worker) at a time: the next document
+    is only taken from `documents` once the oldest one is done and its report consumed, so a large or endless
+    (async) source doesn't pile up in memory.
+
+    Parameters
+    ----------
+    documents : iterable or async iterable of str, pathlib.Path or dict
+        Paths to JSON/YAML metadata files, or metadata dictionaries.
+    schema : str, dict or CompiledSchema, optional
+        File path to a JSON schema, a dictionary representing the schema, or an already compiled schema
+        (default: the combined schema).
+    workers : int, optional
+        Number of worker processes (default: the number of CPUs). With 1 worker the documents are validated
+        in the shared CPU thread pool instead (see `src.executors`), which avoids starting processes.
+    max_pending : int, optional
+        Maximum number of documents in flight (default: twice the number of workers).
+    mode, max_errors, structured
+        As in `validate_many`.
+
+    Yields
+    ------
+    dict
+        The report of each document, as returned by `validate_many`.
+
+    Raises
+    ------
+    ValueError
+        If workers or max_pending is lower than 1, or the mode is unknown.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers should be at least 1.")
+    if max_pending is None:
+        max_pending = 2 * workers
+    if max_pending < 1:
+        raise ValueError("max_pending should be at least 1.")
+    limit = error_limit(mode, max_errors)
+    if isinstance(schema, (str, Path)):
+        compiled = await run_io(SCHEMA_REGISTRY.get, schema)
+    elif isinstance(schema, CompiledSchema):
+        compiled = schema
+    else:
+        compiled = CompiledSchema(schema)
+
+    loop = asyncio.get_running_loop()
+    if workers == 1:
+        pool = None
+        executor, validate = cpu_executor(), functools.partial(_validate_document, schema=compiled)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(compiled.schema,))
+        executor, validate = pool, _validate_document
+
+    pending = collections.deque()
+    try:
+        position = 0
+        async for document in _aiter_documents(documents):
+            if len(pending) >= max_pending:
+                yield await pending.popleft()
+            item = (str(document) if not isinstance(document, dict) else position, document, limit, structured)
+            pending.append(loop.run_in_executor(executor, validate, item))
+            position += 1
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+        if pool is not None:
+            #not waiting here, so closing the generator early doesn't block the event loop
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def avalidate_many(documents: Union[Iterable, AsyncIterable], schema: Union[str, dict, CompiledSchema] = r"data/Schema/CombinedSchema.json",
+                         workers: Optional[int] = None, max_pending: Optional[int] = None, mode: str = "full",
+                         max_errors: Optional[int] = None, structured: bool = False) -> list:
+    """
+    Awaitable `validate_many`: validate many metadata documents off the event loop (see `aiter_validate`).
+
+    Returns
+    -------
+    list of dict
+        One report per document, in input order, as returned by `validate_many`.
+
+    Examples
+    --------
+    >>> reports = await avalidate_many(glob.glob("data/Metadata Samples/*.json"), workers=4)
+    """
+    return [report async for report in aiter_validate(documents, schema, workers, max_pending, mode, max_errors, structured)]
+
+
+async def aexport(configs: Iterable, file_path: str = "results", **kwargs) -> dict:
+    """
+    Awaitable `export_many`: export many configs from the I/O pool. Keyword arguments are passed to `export_many`.
+
+    Returns
+    -------
+    dict
+        "written" and "skipped": lists of the file names written and skipped.
+    """
+    return await run_io(export_many, configs, file_path, **kwargs)
@@ -0,0 +1,224 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from src.config_objects import MetadataConfig, COMBINED_DEFAULT, read_metadata_file
+from src.schema_cache import SCHEMA_REGISTRY
+from src.schema_validators import CompiledSchema, error_limit
+from src.validation_cache import ValidationCache, document_key, schema_key
+from src.validation_errors import ValidationError
+
+
+#Compiled schema of the current worker process, set once by _init_worker
+_WORKER_SCHEMA = None
+
+
+def _init_worker(schema: dict):
+    """Compile the shared schema once per worker process."""
+    global _WORKER_SCHEMA
+    _WORKER_SCHEMA = CompiledSchema(schema)
+
+
+def _validate_document(item, schema: Optional[CompiledSchema] = None):
+    """
+    Load (if needed), import and validate a single metadata document in the current process.
+
+    Parameters
+    ----------
+    item : tuple
+        (source, document, max_errors, structured) where document is a file path or a metadata dictionary,
+        max_errors the error limit (None for every error) and structured whether to return `ValidationError` objects.
+    schema : CompiledSchema, optional
+        Schema to validate against (default: the schema of the worker process).
+
+    Returns
+    -------
+    dict
+        The report of the document (see `validate_many`).
+    """
+    source, document, max_errors, structured = item
+    cfg = MetadataConfig(schema or _WORKER_SCHEMA, COMBINED_DEFAULT)
+    report = _import_document(cfg, source, document, max_errors, structured)
+    if report is not None:
+        return report
+    errors = cfg.validate(max_errors=max_errors, structured=structured)
+    return {"source": source, "valid": not errors, "load_error": None, "errors": errors}
+
+
+def _import_document(cfg: MetadataConfig, source, document, max_errors: Optional[int], structured: bool) -> Optional[dict]:
+    """
+    Import a document (read first if it's a file path) into a config.
+
+    Documents which can't be imported are reported, not raised, so one bad file doesn't stop the batch: values
+    rejected by the import are reported as validation errors, like those of `validate()` (those of every top-level
+    section, up to max_errors), and "load_error" is only set for files which can't be read or parsed, and documents
+    which are not metadata (not an object, or with a section which is not in the schema).
+
+    Returns
+    -------
+    dict or None
+        The report of a document which couldn't be imported (see `validate_many`), None once it's imported.
+    """
+    try:
+        metadata = document if isinstance(document, dict) else read_metadata_file(str(document))
+    except (OSError, ValueError) as e:
+        return _load_error_report(source, e)
+    if not isinstance(metadata, dict):
+        return _load_error_report(source, TypeError(f"The document should be an object, got {type(metadata).__name__}."))
+    errors = []
+    #section by section, as import_from_dict stops at the first section with a rejected value
+    for section, value in metadata.items():
+        remaining = None if max_errors is None else max_errors - len(errors)
+        try:
+            cfg.import_from_dict({section: value}, max_errors=remaining)
+        except (KeyError, ValueError) as e:
+            if not hasattr(e, "validation_errors"):
+                return _load_error_report(source, e)
+            errors.extend(e.validation_errors()[:remaining])
+            if max_errors is not None and len(errors) >= max_errors:
+                break
+    if not errors:
+        return None
+    return {"source": source, "valid": False, "load_error": None,
+            "errors": errors if structured else [error.format() for error in errors]}
+
+
+def _load_error_report(source, error: Exception) -> dict:
+    return {"source": source, "valid": False, "load_error": f"{type(error).__name__}: {error}", "errors": []}
+
+
+def validate_many(paths_or_dicts: Iterable[Union[str, Path, dict]], schema: Union[str, dict, CompiledSchema] = r"data/Schema/CombinedSchema.json",
+                  workers: Optional[int] = None, chunksize: int = 16, cache: Optional[ValidationCache] = None,
+                  bypass_cache: bool = False, mode: str = "full", max_errors: Optional[int] = None, structured: bool = False) -> list:
+    """
+    Validate many metadata documents in parallel and return a report per document.
+
+    The schema is parsed once in the calling process and compiled once per worker,
+    and the documents (file paths are read inside the workers) are spread across a process pool.
+
+    Parameters
+    ----------
+    paths_or_dicts : iterable of str, pathlib.Path or dict
+        Paths to JSON/YAML metadata files, or metadata dictionaries.
+    schema : str, dict or CompiledSchema, optional
+        File path to a JSON schema, a dictionary representing the schema, or an already compiled schema
+        (default: the combined schema).
+    workers : int, optional
+        Number of worker processes (default: the number of CPUs). With 1 worker everything runs in the current process.
+    chunksize : int, optional
+        Number of documents sent to a worker at a time (default: 16).
+    cache : ValidationCache, optional
+        Cache of the results of earlier runs. Files are then read in the calling process, documents whose
+        content (with this schema) has a cached result are not validated again, and new results are stored.
+    bypass_cache : bool, optional
+        If True, cached results are ignored and every document is validated (the results are still stored in the cache).
+    mode : str, optional
+        "full" (default) reports every error, "fail_fast" stops each document at its first error
+        (enough to know which documents are valid, at a fraction of the cost for invalid ones).
+    max_errors : int, optional
+        Stop each document once this many errors were found.
+    structured : bool, optional
+        If True, the errors of the reports are `ValidationError` objects instead of messages
+        (e.g. to count them with `aggregate_errors` without formatting any message).
+
+    Returns
+    -------
+    list of dict
+        One report per document, in input order, with the keys:
+            - "source"     : the file path, or the position of the dictionary in the input.
+            - "valid"      : True if the document was imported and has no validation errors.
+            - "load_error" : message of the error raised while reading or parsing the document (or if it's not
+                             metadata: not an object, or with a section which is not in the schema), or None.
+            - "errors"     : list of validation error messages (or errors, as returned by `MetadataConfig.validate()`),
+                             including the values rejected while importing the document.
+
+    Raises
+    ------
+    ValueError
+        If workers is lower than 1, or the mode is unknown.
+
+    Examples
+    --------
+    >>> reports = validate_many(glob.glob("data/Metadata Samples/*.json"), workers=4)
+    >>> [r["source"] for r in reports if not r["valid"]]
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers should be at least 1.")
+    limit = error_limit(mode, max_errors)
+    if isinstance(schema, (str, Path)):
+        compiled = SCHEMA_REGISTRY.get(schema)
+    elif isinstance(schema, CompiledSchema):
+        compiled = schema
+    else:
+        compiled = CompiledSchema(schema)
+
+    items = [(str(doc) if not isinstance(doc, dict) else position, doc, limit, structured) for position, doc in enumerate(paths_or_dicts)]
+    if cache is None:
+        return _validate_items(items, compiled, workers, chunksize)
+
+    key = schema_key(compiled.schema, COMBINED_DEFAULT, limit, structured)
+    reports = [None] * len(items)
+    pending = []
+    for position, (source, document, _, _) in enumerate(items):
+        if not isinstance(document, dict):
+            try:
+                document = read_metadata_file(source)
+            except (OSError, ValueError) as e:
+                reports[position] = _load_error_report(source, e)
+                continue
+            if not isinstance(document, dict):
+                #left to the workers to report, like any other document which can't be imported
+                pending.append((position, None, (source, source, limit, structured)))
+                continue
+        content_key = document_key(document)
+        result = None if bypass_cache else cache.get(key, content_key)
+        if result is not None:
+            if structured:
+                result["errors"] = [ValidationError.from_dict(error) for error in result["errors"]]
+            reports[position] = {"source": source, **result}
+        else:
+            pending.append((position, content_key, (source, document, limit, structured)))
+
+    validated = _validate_items([item for _, _, item in pending], compiled, workers, chunksize)
+    for (position, content_key, _), report in zip(pending, validated):
+        reports[position] = report
+        if content_key is not None:
+            errors = [error.to_dict() for error in report["errors"]] if structured else report["errors"]
+            cache.put(key, content_key, {"valid": report["valid"], "load_error": report["load_error"], "errors": errors})
+    cache.commit()
+    return reports
+
+
+def _validate_items(items: list, compiled: CompiledSchema, workers: int, chunksize: int) -> list:
+    """Validate (source, document, max_errors, structured) items, serially or in a process pool (see `validate_many`)."""
+    if workers == 1 or len(items) <= 1:
+        return [_validate_document(item, compiled) for item in items]
+
+    #workers receive the parsed schema, compiling it is cheaper than pickling the validators
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(compiled.schema,)) as pool:
+        return list(pool.map(_validate_document, items, chunksize=chunksize))
+
+
+def summarise_reports(reports: list) -> dict:
+    """
+    Summarise the reports returned by `validate_many`.
+
+    Parameters
+    ----------
+    reports : list of dict
+        Reports returned by `validate_many`.
+
+    Returns
+    -------
+    dict
+        Number of documents, valid documents, documents which failed to load, and total validation errors.
+    """
+    return {
+        "documents": len(reports),
+        "valid": sum(1 for r in reports if r["valid"]),
+        "load_errors": sum(1 for r in reports if r["load_error"]),
+        "errors": sum(len(r["errors"]) for r in reports),
+    }
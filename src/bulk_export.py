@@ -0,0 +1,190 @@
+import hashlib
+import io
+import os
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+
+from src import instrumentation
+from src.config_objects import MetadataConfig, export_file_name
+from src.instrumentation import instrumented
+from src.serializers import dumps_json, dumps_json_default, loads_json
+
+
+BUNDLE_FORMATS = ["tar", "zip", "ndjson"]
+#file in the output folder recording the content hash of every file written by export_many
+MANIFEST_NAME = ".export_manifest.json"
+
+
+def write_atomic(file_path: Union[str, Path], data: bytes):
+    """
+    Write a file atomically: the data goes to a temporary file in the same folder which is then renamed,
+    so readers never see a partially written file.
+
+    Parameters
+    ----------
+    file_path : str or pathlib.Path
+        Path of the file to write.
+    data : bytes
+        Content of the file.
+    """
+    file_path = Path(file_path)
+    #unique per process and thread, cheaper than tempfile.mkstemp
+    temp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if temp_path.exists():
+            os.unlink(temp_path)
+        raise
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _is_unchanged(file_path: Path, manifest: dict, name: str, content_hash: str) -> bool:
+    """
+    Return True if the file was written with this content at the last export and still has it: the file is hashed
+    again, so a file changed or replaced since then is written again.
+    """
+    if manifest.get(name) != content_hash:
+        return False
+    try:
+        with open(file_path, 'rb') as f:
+            return _content_hash(f.read()) == content_hash
+    except OSError:
+        return False
+
+
+def _serialise(item: Tuple[str, Union[MetadataConfig, dict]]) -> Tuple[str, bytes, str]:
+    """Serialise a (file name, config) item to the JSON written by `export_to_json`, returning (file name, content, content hash)."""
+    name, config = item
+    metadata = config.to_dict() if isinstance(config, MetadataConfig) else config
+    data = dumps_json_default(metadata).encode()
+    return name, data, _content_hash(data)
+
+
+def _load_manifest(output_path: Path) -> dict:
+    manifest_path = output_path / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, 'rb') as f:
+        return loads_json(f.read())
+
+
+@instrumented("export")
+def export_many(configs: Iterable[Union[MetadataConfig, Tuple[str, Union[MetadataConfig, dict]]]], file_path: str = "results",
+                title_path: str = "Dataset.id", workers: Optional[int] = None, bundle: Optional[str] = None,
+                bundle_name: str = "metadata", skip_unchanged: bool = True) -> dict:
+    """
+    Export many metadata configs at once, as one `{title}_metadata.json` file each (like `export_to_json`) or as a single bundle.
+
+    Configs are serialised and written by a pool of threads (writing files is mostly waiting on the disk),
+    every file is written atomically (temporary file + rename), and files whose content is the same as
+    at the last export into the folder are not written again.
+
+    Parameters
+    ----------
+    configs : iterable of MetadataConfig or (title, MetadataConfig or dict) tuples
+        Configs to export. Titles of bare configs are read from `title_path`.
+    file_path : str, optional
+        The directory path where the files will be stored (default: 'results'). It is created if needed.
+    title_path : str, optional
+        Metadata field used as the title of configs given without one (default: "Dataset.id").
+    workers : int, optional
+        Number of threads serialising and writing files (default: chosen by ThreadPoolExecutor).
+    bundle : str, optional
+        Pack everything into a single "tar", "zip" or "ndjson" (one JSON record per line) file instead of one file per config.
+    bundle_name : str, optional
+        Name of the bundle file, without extension (default: "metadata").
+    skip_unchanged : bool, optional
+        If True (default), files whose content hash matches the last export (recorded in a manifest file
+        in the output folder) and the file on disk are skipped.
+
+    Returns
+    -------
+    dict
+        "written" and "skipped": lists of the file names written and skipped.
+
+    Raises
+    ------
+    ValueError
+        If the bundle format is not supported, or a title could name a file outside the folder (see
+        `export_file_name`) or is the title of another config. Nothing is written then.
+    """
+    if bundle is not None and bundle not in BUNDLE_FORMATS:
+        raise ValueError(f"Unsupported bundle format: {bundle}. Supported formats are: {BUNDLE_FORMATS}")
+    output_path = Path(file_path)
+    output_path.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(output_path)
+    items = []
+    for cfg in configs:
+        title, cfg = (cfg.get(title_path), cfg) if isinstance(cfg, MetadataConfig) else cfg
+        items.append((export_file_name(title), cfg))
+    #checked before anything is written, so a batch never overwrites its own files
+    names = set()
+    for name, _ in items:
+        if name in names:
+            raise ValueError(f"Two configs are exported to '{name}'.")
+        names.add(name)
+    written, skipped = [], []
+    recorder = instrumentation.active()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if bundle is None:
+            def export_one(item):
+                name, data, content_hash = _serialise(item)
+                if skip_unchanged and _is_unchanged(output_path / name, manifest, name, content_hash):
+                    return name, content_hash, False
+                write_atomic(output_path / name, data)
+                if recorder is not None:
+                    recorder.add_size("export", len(data))
+                return name, content_hash, True
+
+            for name, content_hash, was_written in pool.map(export_one, items):
+                (written if was_written else skipped).append(name)
+                manifest[name] = content_hash
+        else:
+            #members are serialised in parallel, but added to the bundle in input order
+            name, data = _pack(bundle, bundle_name, pool.map(_serialise, items))
+            content_hash = _content_hash(data)
+            if skip_unchanged and _is_unchanged(output_path / name, manifest, name, content_hash):
+                skipped.append(name)
+            else:
+                write_atomic(output_path / name, data)
+                written.append(name)
+                if recorder is not None:
+                    recorder.add_size("export", len(data))
+            manifest[name] = content_hash
+
+    write_atomic(output_path / MANIFEST_NAME, dumps_json(manifest).encode())
+    return {"written": written, "skipped": skipped}
+
+
+def _pack(bundle: str, bundle_name: str, members: Iterable[Tuple[str, bytes, str]]) -> Tuple[str, bytes]:
+    """Pack serialised members into a bundle, returning its file name and content."""
+    buffer = io.BytesIO()
+    if bundle == "ndjson":
+        for _, data, _ in members:
+            #JSON without indentation has no newlines, so each record is one line
+            buffer.write(data)
+            buffer.write(b"\n")
+        return f"{bundle_name}.jsonl", buffer.getvalue()
+    if bundle == "zip":
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, data, _ in members:
+                #a fixed timestamp, so the same content gives the same archive (and hash)
+                archive.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), data, compress_type=zipfile.ZIP_DEFLATED)
+        return f"{bundle_name}.zip", buffer.getvalue()
+    with tarfile.open(fileobj=buffer, mode='w') as archive:
+        for name, data, _ in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return f"{bundle_name}.tar", buffer.getvalue()
@@ -0,0 +1,227 @@
+from pathlib import Path
+from typing import Iterable, Union
+
+from src.compact_records import MAPPING_TYPES
+from src.schema_cache import SCHEMA_REGISTRY
+from src.schema_validators import CompiledSchema, ObjectValidator
+from src.validation_errors import ValidationError
+
+
+#Python types accepted by the type checks which can be done column-wise.
+#Values loaded from JSON/YAML only have builtin types, so the exact type is compared
+#(bool is listed for "integer" because isinstance(True, int) is True).
+_COLUMN_TYPES = {
+    "string": (str,),
+    "integer": (int, bool),
+    "pathlib.Path": (str, type(Path())),
+}
+
+
+def _load_pandas():
+    """Import pandas only when the columnar mode is used, it's slow to import."""
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("The columnar validation mode requires pandas: pip install -r requirements.txt")
+    return pd
+
+
+def _plan(node: ObjectValidator, prefix: str, parent: str, checks: list, objects: list, leaves: list):
+    """
+    List the checks of a compiled object in the order `ObjectValidator.collect_errors` runs them.
+
+    Each check is (kind, path, parent path, node), kind being "missing", "object" or "leaf".
+    """
+    for req_key in node.required:
+        checks.append(("missing", f"{prefix}{req_key}", parent, node.properties.get(req_key)))
+    for key, child in node.properties.items():
+        path = f"{prefix}{key}"
+        if isinstance(child, ObjectValidator):
+            objects.append(path)
+            checks.append(("object", path, parent, child))
+            _plan(child, f"{path}.", path, checks, objects, leaves)
+        else:
+            leaves.append(path)
+            if child.type_name is not None:
+                checks.append(("leaf", path, parent, child))
+
+
+#marks a key missing from a record, as None is a value
+_MISSING = object()
+
+
+def _fill_columns(node: ObjectValidator, prefix: str, objects: list, values: dict, present: dict):
+    """
+    Fill the columns of the fields of a (nested) object from its value in every record, one field at a time.
+
+    Parameters
+    ----------
+    objects : list
+        The object in each record, or None where the record has no such object (missing, or not an object).
+    """
+    for key, child in node.properties.items():
+        path = f"{prefix}{key}"
+        #a list comprehension per field, instead of a Python loop over fields per record
+        column = [_MISSING if parent is None else parent.get(key, _MISSING) for parent in objects]
+        present[path] = [value is not _MISSING for value in column]
+        if isinstance(child, ObjectValidator):
+            values[path] = [None if value is _MISSING else "" if isinstance(value, MAPPING_TYPES) else type(value).__name__
+                            for value in column]
+            nested = [value if isinstance(value, MAPPING_TYPES) else None for value in column]
+            _fill_columns(child, f"{path}.", nested, values, present)
+        else:
+            values[path] = [None if value is _MISSING else value for value in column]
+
+
+class ColumnarValidator:
+    """
+    Validates many metadata records at once by flattening them into pandas columns keyed by dotted path
+    (e.g. "Dataset.id", "Edition.quality_designation") and running each check on a whole column.
+
+    Type, enum (`isin`), required-field and date checks produce the same error messages,
+    in the same order, as `MetadataConfig.validate()` on each record.
+
+    Attributes
+    ----------
+    compiled : CompiledSchema
+        The schema the records are validated against.
+
+    Examples
+    --------
+    >>> validator = ColumnarValidator(r"data/Schema/CombinedSchema.json")
+    >>> errors = validator.validate(records)
+    """
+    def __init__(self, schema: Union[str, dict, CompiledSchema] = r"data/Schema/CombinedSchema.json"):
+        if isinstance(schema, str):
+            schema = SCHEMA_REGISTRY.get(schema)
+        elif not isinstance(schema, CompiledSchema):
+            schema = CompiledSchema(schema)
+        if not isinstance(schema.root, ObjectValidator):
+            raise TypeError("Only schemas with 'properties' can be validated column-wise.")
+        self.compiled = schema
+        self._checks = []
+        self._objects = []
+        self._leaves = []
+        _plan(schema.root, "", "", self._checks, self._objects, self._leaves)
+
+    def flatten(self, records: Iterable) -> tuple:
+        """
+        Flatten metadata records into columns keyed by dotted path.
+
+        The records are read once into a list, then each column is built from it in one pass (the columns of a
+        nested object from the list of its values), so the work per record is done in list comprehensions.
+
+        Parameters
+        ----------
+        records : iterable of dict, CompactRecord or MetadataConfig
+            The metadata records.
+
+        Returns
+        -------
+        tuple of pandas.DataFrame
+            (values, present): the value of each field (for objects, "" if it's an object, otherwise the
+            type name of the value), and whether the key is in the record.
+        """
+        pd = _load_pandas()
+        records = [record if isinstance(record, MAPPING_TYPES) else record.to_dict() for record in records]
+        values, present = {}, {}
+        _fill_columns(self.compiled.root, "", records, values, present)
+        #in schema order, objects before the fields below them
+        columns = self._objects + self._leaves
+        #object dtype keeps the python values (and their types) as they are
+        return (pd.DataFrame({path: values[path] for path in columns}, dtype=object),
+                pd.DataFrame({path: present[path] for path in columns}, dtype=bool))
+
+    def _valid_values(self, node, column):
+        """Return a boolean Series, True where the value passes the node's type and enum checks (`FieldValidator.check`)."""
+        pd = _load_pandas()
+        if node.type_name in _COLUMN_TYPES or node.type_name == "datetime":
+            if node.type_name in ("string", "datetime") and pd.api.types.infer_dtype(column, skipna=False) == "string":
+                #the whole column holds str (the common case), found in a single C loop
+                valid = pd.Series(True, index=column.index)
+            else:
+                valid = column.map(type).isin(_COLUMN_TYPES.get(node.type_name, (str,)))
+            if node.type_name == "datetime":
+                #dates repeat a lot across a catalogue, the validator's cache makes this cheap
+                valid[valid] = node.date_validator.check_many(column[valid])
+        elif node.type_name == "array" and node.items is not None and node.items.type_name in _COLUMN_TYPES:
+            valid = column.map(type) == list
+            lists = column[valid]
+            non_empty = lists[lists.map(len) > 0]
+            if len(non_empty):
+                items = non_empty.explode()
+                #one row per item, grouped back by record
+                items_valid = self._valid_values(node.items, items).groupby(level=0).all()
+                valid[items_valid.index] = items_valid
+        elif node.type_name == "array":
+            #other arrays are checked value by value
+            valid = column.map(node.check).astype(bool)
+        else:
+            #UNKNOWN TYPE: rejected, as in check_type
+            valid = pd.Series(False, index=column.index)
+        if node.enum is not None:
+            #only values of the right type are hashable enough for isin
+            valid[valid] = column[valid].isin(node.enum_values)
+        return valid
+
+    def validate(self, records: Iterable, structured: bool = False) -> list:
+        """
+        Validate metadata records column-wise.
+
+        Parameters
+        ----------
+        records : iterable of dict, CompactRecord or MetadataConfig
+            The metadata records.
+        structured : bool, optional
+            If True, return `ValidationError` objects instead of messages (see `MetadataConfig.validate`).
+
+        Returns
+        -------
+        list of list of str
+            For each record, in input order, the messages (or errors) `MetadataConfig.validate()` returns for it.
+        """
+        values, present = self.flatten(records)
+        return self.validate_frame(values, present, structured)
+
+    def validate_frame(self, values, present, structured: bool = False) -> list:
+        """
+        Validate records already flattened by `flatten()`.
+
+        Returns
+        -------
+        list of list of str
+            For each row, the validation error messages (or errors, if structured).
+        """
+        errors = [[] for _ in range(len(values))]
+        #rows where each object is reached by validate(): present and an object, as are its parents
+        reached = {"": None}
+        for path in self._objects:
+            parent = path.rpartition(".")[0]
+            is_object = present[path] & (values[path] == "")
+            reached[path] = is_object if reached[parent] is None else reached[parent] & is_object
+
+        for kind, path, parent, node in self._checks:
+            parent_reached = reached[parent]
+            if kind == "missing":
+                failed = ~present[path]
+                if parent_reached is not None:
+                    failed &= parent_reached
+                for row in failed.to_numpy().nonzero()[0]:
+                    errors[row].append(ValidationError(path, "required"))
+                continue
+
+            rows = present[path] if parent_reached is None else present[path] & parent_reached
+            if kind == "object":
+                failed = rows & (values[path] != "")
+                for row in failed.to_numpy().nonzero()[0]:
+                    errors[row].append(ValidationError(path, "object", "object", values[path].iat[row]))
+                continue
+
+            column = values[path][rows]
+            failed = ~self._valid_values(node, column).to_numpy()
+            prefix = path[:len(path) - len(node.key)]
+            for row, value in zip(column.index[failed], column.to_numpy()[failed]):
+                errors[row].append(node.error_for(value, prefix))
+        if not structured:
+            return [[error.format() for error in row_errors] for row_errors in errors]
+        return errors
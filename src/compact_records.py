@@ -0,0 +1,213 @@
+from collections.abc import MutableMapping
+
+
+#marks an unset slot, i.e. a key missing from the record
+_MISSING = object()
+
+#key orders of records, shared between records with the same order (records built from similar documents)
+_ORDERS = {}
+_ORDERS_SIZE = 4096
+
+
+def _shared_order(order: tuple) -> tuple:
+    if len(_ORDERS) >= _ORDERS_SIZE:
+        return _ORDERS.get(order, order)
+    return _ORDERS.setdefault(order, order)
+
+
+class CompactRecord(MutableMapping):
+    """
+    Base class of the compact metadata records generated from a schema by `build_record_type`.
+
+    Each generated class stores the properties of one schema object in `__slots__` instead of a per-instance
+    dictionary, so a record takes a fraction of the memory of the equivalent dict. Records behave like
+    dictionaries (they are mutable mappings) so they can be used as the metadata of a `MetadataConfig`,
+    and `to_dict()` converts them back to plain nested dictionaries.
+
+    A key is missing from the record while its slot is unset. Values of nested objects are records too:
+    dictionaries assigned to them are converted. Keys are iterated in insertion order, like a dict's: while they
+    are set in schema order nothing else is stored, the order is only kept in `_order` (a tuple shared by records
+    with the same order) once a key is set out of schema order.
+
+    Record classes are registered by their description (`_spec`), and records pickle as that description and
+    their items, so they can be sent to other processes.
+    """
+    __slots__ = ("_order",)
+    #description of the class, see `record_type`
+    _spec = None
+    #field names of the schema object, in schema order
+    _fields = ()
+    #field name -> slot name (slots are positional, so field names don't need to be valid identifiers)
+    _slot_names = {}
+    #field name -> record type of the fields which are nested objects
+    _nested = {}
+
+    def __getitem__(self, key):
+        slot = self._slot_names.get(key)
+        if slot is not None:
+            value = getattr(self, slot, _MISSING)
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        slot = self._slot_names.get(key)
+        if slot is None:
+            raise KeyError(f"'{key}' is not a field of {type(self).__name__}.")
+        nested = self._nested.get(key)
+        if nested is not None and isinstance(value, dict):
+            value = nested.from_dict(value)
+        if getattr(self, slot, _MISSING) is _MISSING:
+            self._add_key(key)
+        setattr(self, slot, value)
+
+    def _add_key(self, key):
+        """Record the position of a new key in the insertion order."""
+        order = getattr(self, "_order", None)
+        if order is not None:
+            self._order = _shared_order(order + (key,))
+            return
+        #keys set so far are in schema order: it only needs storing if a field after this one is already set
+        for field in self._fields[self._fields.index(key) + 1:]:
+            if getattr(self, self._slot_names[field], _MISSING) is not _MISSING:
+                self._order = _shared_order((*self, key))
+                return
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        delattr(self, self._slot_names[key])
+        order = getattr(self, "_order", None)
+        if order is not None:
+            self._order = _shared_order(tuple(field for field in order if field != key))
+
+    def __contains__(self, key):
+        slot = self._slot_names.get(key)
+        return slot is not None and getattr(self, slot, _MISSING) is not _MISSING
+
+    def __iter__(self):
+        order = getattr(self, "_order", None)
+        if order is not None:
+            yield from order
+            return
+        for field in self._fields:
+            if getattr(self, self._slot_names[field], _MISSING) is not _MISSING:
+                yield field
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return _record_from_items, (self._spec, list(self.items()))
+
+    def copy(self):
+        """Return a shallow copy of the record (nested records are shared), like `dict.copy()`."""
+        new = type(self).__new__(type(self))
+        for slot in self.__slots__:
+            value = getattr(self, slot, _MISSING)
+            if value is not _MISSING:
+                setattr(new, slot, value)
+        order = getattr(self, "_order", None)
+        if order is not None:
+            new._order = order
+        return new
+
+    def new_branch(self, key):
+        """Return a new, empty record for a nested object field."""
+        return self._nested[key]()
+
+    def to_dict(self) -> dict:
+        """
+        Convert the record (and nested records) to plain dictionaries, with keys in insertion order.
+
+        Returns
+        -------
+        dict
+            The metadata in the same shape as the dictionaries the record was built from.
+        """
+        return {key: value.to_dict() if isinstance(value, CompactRecord) else value for key, value in self.items()}
+
+    @classmethod
+    def from_dict(cls, metadata: dict) -> "CompactRecord":
+        """
+        Build a record from a metadata dictionary, converting nested objects to records.
+
+        Raises
+        ------
+        KeyError
+            If the dictionary has a key which is not a field of the record.
+        """
+        record = cls()
+        for key, value in metadata.items():
+            record[key] = value
+        return record
+
+
+#types the metadata of a MetadataConfig (or any of its nested objects) can have
+MAPPING_TYPES = (dict, CompactRecord)
+
+#description -> generated record class, so equal descriptions (e.g. a record unpickled in a worker) share a class
+_RECORD_TYPES = {}
+
+
+def record_type(spec: tuple) -> type:
+    """
+    Return the compact record class of a description, generating it (and the classes of its nested objects) once.
+
+    Parameters
+    ----------
+    spec : tuple
+        (class name, field names in schema order, ((field name, description of the nested object), ...)).
+
+    Returns
+    -------
+    type
+        A `CompactRecord` subclass with one slot per field.
+    """
+    cls = _RECORD_TYPES.get(spec)
+    if cls is None:
+        name, fields, nested = spec
+        slot_names = {field: f"_{position}" for position, field in enumerate(fields)}
+        cls = type(name, (CompactRecord,), {
+            "__slots__": tuple(slot_names.values()),
+            "_spec": spec,
+            "_fields": fields,
+            "_slot_names": slot_names,
+            "_nested": {key: record_type(child) for key, child in nested},
+        })
+        _RECORD_TYPES[spec] = cls
+    return cls
+
+
+def _record_spec(node) -> tuple:
+    """Return the description (see `record_type`) of the record class of a compiled schema object."""
+    nested = tuple((key, _record_spec(child)) for key, child in node.properties.items() if hasattr(child, "properties"))
+    return f"{node.key or 'Metadata'}Record", tuple(node.properties), nested
+
+
+def _record_from_items(spec: tuple, items: list) -> CompactRecord:
+    """Rebuild a pickled record."""
+    record = record_type(spec)()
+    for key, value in items:
+        record[key] = value
+    return record
+
+
+def build_record_type(node) -> type:
+    """
+    Return the compact record class (and the classes of its nested objects) of a compiled schema object.
+
+    Parameters
+    ----------
+    node : ObjectValidator
+        Compiled validator of a schema object (a node with "properties").
+
+    Returns
+    -------
+    type
+        A `CompactRecord` subclass with one slot per property.
+    """
+    return record_type(_record_spec(node))
@@ -1,9 +1,19 @@
 import datetime
+import functools
 import json
-import yaml 
 from pathlib import Path
 from typing import Union, Optional
 
+from src.compact_records import MAPPING_TYPES, CompactRecord
+from src.date_validation import date_validator_for
+from src import instrumentation
+from src.executors import run_cpu, run_io
+from src.instrumentation import instrumented
+from src.schema_cache import SCHEMA_REGISTRY
+from src.serializers import dumps_json_default, dumps_yaml_default, load_yaml, read_json, yaml_error
+from src.validation_errors import ValidationError
+from src.schema_validators import CompiledSchema, ObjectValidator, error_limit, flatten_error_index
+
 
 ##Important Notes:
 #We can change the schema (data) "type" into "dataType" because we have Edition.alert.type field in the schema so there might be potential issue in QA. I created a CombinedSchema2 but we can keep using CombinedSchem until we find a relevant bug
@@ -34,6 +44,125 @@ COMBINED_DEFAULT = {
 
 
 
+@functools.lru_cache(maxsize=1024)
+def _split_path(key: str) -> tuple:
+    """Split a dotted metadata path into its keys (cached, as the same paths are used over and over)."""
+    return tuple(key.split("."))
+
+
+def export_file_name(title) -> str:
+    """
+    Return the name of the file a config titled `title` is exported to: "{title}_metadata.json".
+
+    Raises
+    ------
+    ValueError
+        If the title contains a path separator or a NUL character, or is "." or "..", so it can't name a file
+        outside the export folder.
+    """
+    title = str(title)
+    if "/" in title or "\\" in title or "\0" in title or title in (".", ".."):
+        raise ValueError(f"Can't name the exported file: the title '{title}' contains a path separator or is '.' or '..'.")
+    return f"{title}_metadata.json"
+
+
+@instrumented("parse")
+def read_metadata_file(config_path: str) -> dict:
+    """
+    Read and parse a JSON or YAML metadata file (see `MetadataConfig.load_metadata_from_file`), without importing it.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the specified file does not exist.
+    ValueError
+        If the file format is unsupported or parsing fails.
+    """
+    #check file extension
+    format = config_path.split(".")[-1].lower()
+    verified_config_path = Path(config_path)
+    
+    if not verified_config_path.exists():
+        raise FileNotFoundError(f"Configuration file not found: {verified_config_path}")
+    recorder = instrumentation.active()
+    if recorder is not None:
+        recorder.add_size("parse", verified_config_path.stat().st_size)
+    
+    #load the file content based on format
+    #parsers come from src.serializers, which picks the fastest installed backend
+    try:
+        if format == 'json':
+            loaded_raw_metadata = read_json(verified_config_path)
+        elif format in ['yaml', 'yml']:
+            with open(verified_config_path, 'r', encoding='utf-8') as file:
+                loaded_raw_metadata = load_yaml(file)
+        else:
+            raise ValueError(f'Unsupported file format: {format}. Only "json" and "yaml" are supported.')
+    except json.JSONDecodeError as e:
+        raise ValueError(f'Error parsing JSON file: {e}')
+    #PyYAML is only imported if parsing failed (see src.serializers)
+    except yaml_error() as e:
+        raise ValueError(f'Error parsing YAML file: {e}')
+    return loaded_raw_metadata
+
+
+#metadata values which can be changed in place
+_CONTAINER_TYPES = (*MAPPING_TYPES, list)
+
+
+def _children(container):
+    """Return the (key or index, value) pairs of a dictionary, record or list."""
+    return container.items() if isinstance(container, MAPPING_TYPES) else enumerate(container)
+
+
+class _IdentitySet:
+    """
+    Set of objects compared by identity (so unhashable dictionaries can be added). It holds references to them, so the
+    identity of an object in the set can't be reused by a new object while it's there.
+    """
+    __slots__ = ("_objects",)
+
+    def __init__(self):
+        self._objects = {}
+
+    def __contains__(self, obj) -> bool:
+        return id(obj) in self._objects
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def add(self, obj):
+        self._objects[id(obj)] = obj
+
+    def discard_tree(self, obj):
+        """Remove an object and the nested objects and lists of it which are in the set."""
+        if self._objects.pop(id(obj), None) is None:
+            #a branch which isn't owned only contains branches which aren't owned either
+            return
+        for _, value in _children(obj):
+            if isinstance(value, _CONTAINER_TYPES):
+                self.discard_tree(value)
+
+
+def _record_errors(errors: list, path: str):
+    """Count the errors of a validate() call with the enabled recorder, once per document (not per recursive call)."""
+    recorder = instrumentation.active()
+    if recorder is not None and not path:
+        recorder.add_errors(errors)
+
+
+def _record_build_errors(error: Exception, nested_path: str):
+    """
+    Count the errors of a value rejected by `set()` with the enabled recorder. Their paths start at the key being set,
+    so they're counted under the full path (e.g. "Dataset.contacts.name" for "contacts.name").
+    """
+    recorder = instrumentation.active()
+    if recorder is not None and hasattr(error, "validation_errors"):
+        parent_keys = [key.strip() for key in nested_path.split(".")[:-1]]
+        prefix = ".".join(parent_keys) + "." if parent_keys else ""
+        recorder.add_errors(ValidationError(prefix + e.path, e.code, e.expected, e.actual) for e in error.validation_errors())
+
+
 class MetadataConfig:
     """
     Stores, manages, and validates metadata for a dataset, with built-in quality assurance (QA) functionality.
@@ -42,10 +171,20 @@ class MetadataConfig:
 
     Attributes
     ----------
-    _metadata : dict
+    _metadata : dict or CompactRecord
         Dictionary containing all defined fields for the dataset metadata, initialized with mostly None or empty values.
+        It starts as the (shared) default metadata and is copied on write: `set()` only copies the branches on the path it writes.
+        With `compact=True` it is a `CompactRecord` generated from the schema instead of nested dictionaries.
+    _owned_branches : _IdentitySet
+        The dictionaries (or records) and lists inside `_metadata` which belong to this instance and can be modified in place.
     _schema : dict
         The JSON schema (as a dictionary) used for validating the metadata.
+    _compiled : CompiledSchema
+        The schema compiled once into validators, used by `set()` and `validate()`.
+    _dirty_paths : set of tuple
+        Paths (as tuples of keys) written by `set()` since the last call to `validate()`.
+    _error_index : ErrorIndex or None
+        Field path -> list of validation errors of the instance metadata, from the last call to `validate()`.
     errors : list of str
         List of validation errors generated by the last call to `validate()`. Only present after validation.
 
@@ -61,6 +200,8 @@ class MetadataConfig:
         Loads and imports metadata from a JSON or YAML file.
     export_to_json(title, file_path)
         Exports the current metadata to a JSON file.
+    to_dict()
+        Returns the metadata as plain nested dictionaries.
     load_json(file_path)
         Loads and parses a JSON file from disk, returning a dictionary.
     check_type(value, schema)
@@ -71,8 +212,12 @@ class MetadataConfig:
         Prints validation errors in a human-readable format.
     get_errors()
         Returns the list of errors from the last validation, or an empty list if none exist.
+    get_error_index()
+        Returns the errors from the last validation grouped by field path.
     preview()
         Prints the metadata in a human-readable format (JSON or YAML).
+    aload(config_path), aload_json(file_path), avalidate(...), aexport_to_json(title, file_path)
+        Awaitable versions of load_metadata_from_file, load_json, validate and export_to_json for asyncio code.
 
 
     Examples
@@ -82,30 +227,60 @@ class MetadataConfig:
     >>> cfg.validate()
     >>> cfg.print_QA_errors()
     """
-    def __init__(self,schema:Union[str, dict], default_metadata):
+    def __init__(self,schema:Union[str, dict, CompiledSchema], default_metadata, compact:bool=False):
         """
         Initializes a MetadataConfig instance with default metadata fields and loads the schema for validation.
 
         Parameters
         ----------
-        schema : Union[str, dict]
+        schema : Union[str, dict, CompiledSchema]
             File path to a JSON schema, or a dictionary representing the schema.
             If the schema was previously defined, the file can be retrieved from the data folder.
+            Schema files are parsed and compiled once per process and shared through `SCHEMA_REGISTRY`.
+            They may reference other files, e.g. the shared enums of Enums.json (see `schema_loader`); the references
+            of a dictionary are resolved relative to the working directory (resolve it with
+            `schema_loader.resolve_schema` to choose the folder).
+            An already compiled schema can be passed to share it between many instances.
+        default_metadata : dict
+            Default metadata fields (e.g. COMBINED_DEFAULT). It is shared, not copied, and is never modified by the instance.
+        compact : bool, optional
+            If True, the metadata is stored in compact records generated from the schema (slotted objects instead of
+            dictionaries), which use much less memory when many configs are kept at once. `to_dict()`, `export_to_json()`
+            and `preview()` output the same metadata either way.
 
         Raises
         ------
         TypeError
             If the loaded schema object is not a dictionary.
+        FileNotFoundError, KeyError, ValueError
+            If a reference of the schema can't be resolved.
         """
-        
-        self._metadata = default_metadata.copy()
-        #If it's a file path, load it. Otherwise, assume it's already a dict.
-        self._schema = self.load_json(schema) if isinstance(schema, str) else schema
-        #Defensive: check types after assignment
-        if not isinstance(self._schema , dict):
-            raise TypeError("Schema must be a dict or a JSON file that parses to a dict.")
+        #nothing is copied until the first set(), see _writable_branch
+        self._metadata = default_metadata
+        self._owned_branches = _IdentitySet()
+        self._dirty_paths = set()
+        self._error_index = None
+        #If it's a file path, get it from the schema cache (it's only read again when the file changes)
+        if isinstance(schema, str):
+            schema = SCHEMA_REGISTRY.get(schema)
+        if isinstance(schema, CompiledSchema):
+            self._schema = schema.schema
+            self._compiled = schema
+        else:
+            #Otherwise, assume it's already a dict.
+            self._schema = schema
+            #Defensive: check types after assignment
+            if not isinstance(self._schema , dict):
+                raise TypeError("Schema must be a dict or a JSON file that parses to a dict.")
+            #compile the schema once so validation doesn't walk the schema dict on every call
+            self._compiled = CompiledSchema(self._schema)
+            self._schema = self._compiled.schema
+        if compact:
+            #the converted defaults are shared between instances like the dictionary ones
+            self._metadata = self._compiled.default_record(default_metadata)
             
-    def import_from_dict(self, new_metadata: dict):
+    @instrumented("build")
+    def import_from_dict(self, new_metadata: dict, mode: str = "full", max_errors: Optional[int] = None):
         """
         Import metadata from a pre-existing dictionary, updating only recognized fields.
 
@@ -113,15 +288,23 @@ class MetadataConfig:
         ----------
         new_metadata : dict
             External dictionary to be imported.
+        mode : str, optional
+            "full" (default) reports every invalid field of the first invalid top-level object,
+            "fail_fast" stops at the first invalid field.
+        max_errors : int, optional
+            Stop checking fields once this many errors were found.
 
         Raises
         ------
         KeyError
             If a key in the external dictionary is not part of the metadata dictionary.
+        ValueError
+            If validation fails for a value, or the mode is unknown.
         """
+        limit = error_limit(mode, max_errors)
         for key, value in new_metadata.items():
             if key in self._metadata.keys():
-                self.set(key, value)
+                self._set(key, value, limit)
             else:
                 raise KeyError(f"Invalid config key: '{key}'.\n"
                     f"Allowed keys are: {list(self._metadata.keys())}"
@@ -131,6 +314,9 @@ class MetadataConfig:
         """
         Retrieve the value of the corresponding key within the metadata.
         Supports nested keys using dot notation (e.g., "Edition.edition").
+        Objects and lists are returned as the stored references, so changes made to them in place are kept (they're
+        not validated, but `validate(incremental=True)` checks them again). The parts still shared with the default
+        metadata are copied into this instance the first time they're returned, so the defaults are never changed.
         Parameters
         ----------
         key : str
@@ -144,20 +330,23 @@ class MetadataConfig:
         KeyError
             If the input key is not a field in the metadata.
         """
-        keys = key.split(".")
+        keys = _split_path(key)
         value = self._metadata
 
         for k in keys:
-            if isinstance(value, dict) and k in value:
+            if isinstance(value, MAPPING_TYPES) and k in value:
                 value = value[k]
             else:
                 raise KeyError(f"'{key}' is not a valid config option")
 
+        if isinstance(value, _CONTAINER_TYPES):
+            value = self._own_value(keys, value)
         return value
 
 
     #what if they want to set a dict as a value?
-    def set(self, nested_path: str, value):
+    @instrumented("build")
+    def set(self, nested_path: str, value, mode: str = "full", max_errors: Optional[int] = None):
         """
         Set or update the value for a specific field in the metadata, supporting nested paths.
 
@@ -167,6 +356,10 @@ class MetadataConfig:
             Metadata field path to update, using dot notation for nested fields (e.g., "contacts.email").
         value : object
             New value for the field.
+        mode : str, optional
+            "full" (default) reports every invalid field of an object value, "fail_fast" stops at the first one.
+        max_errors : int, optional
+            Stop checking the fields of an object value once this many errors were found.
 
         Returns
         -------
@@ -176,53 +369,156 @@ class MetadataConfig:
         Raises
         ------
         ValueError
-            If validation fails for the provided value.
+            If validation fails for the provided value, or the mode is unknown.
         KeyError
             If a key in the path is not valid according to the schema.
         """
-        #If users accidentally include spaces in the path (e.g., "contacts. email"), it could cause hard-to-debug issues.
-        keys=[key.strip() for key in nested_path.split(".")]
-        current_metadata=self._metadata
-        current_schema=self._schema
+        return self._set(nested_path, value, error_limit(mode, max_errors))
+
+    def _set(self, nested_path: str, value, limit: Optional[int]):
+        """`set()` with the error limit already resolved by `error_limit`."""
         try:
-            # Start at the root schema level, which has "properties"
-            # current_schema = current_schema.get("properties", {})
-            for i, key in enumerate(keys):
-                # print(f"Processing key: {key}, current_metadata keys: {current_metadata.keys()}")
-                if key not in current_metadata:
-                        current_metadata[key]={}
-                # Final key: validate and set
-                if i==len(keys)-1:
-                    #current_schema["properties"] will take the validation into the next nested field
-                    #without ["properties"] we get key error
-                    validated_value=self.initial_validate_and_build(key, value, current_schema["properties"])
-                    current_metadata[key] = validated_value
-                    # print(f"Assigned value for {key}: {current_metadata[key]}")             
-                # Intermediate key: go deeper 
-                else:
-                    # Intermediate key: go deeper
-                    if "properties" not in current_schema or  key not in current_schema["properties"]:
-                        raise KeyError(f"'{key}' is not a valid field in the schema.")
-                    # Ensure the current key has a 'properties' attribute before proceeding
-                    if "properties" not in current_schema["properties"][key]:
-                        raise KeyError(f"'{key}' does not have nested properties in the schema.")
-                    current_metadata=current_metadata[key]
-                    #properties for other fields inside the current field
-                    current_schema=current_schema["properties"][key]
-            return validated_value
-        # except ValueError as ve:
-        #     raise ValueError(str(ve))
-
-        # except KeyError as ke:
-        #     raise KeyError(str(ke))
+            #the path is resolved (and cached) once against the compiled schema
+            resolved=self._compiled.resolve(nested_path)
+            validated_value=resolved.build(value, limit)
         except ValueError as ve:
+            _record_build_errors(ve, nested_path)
             raise ve
 
         except KeyError as ke:
             raise KeyError(f"Key error for path '{nested_path}': {str(ke)}")
 
+        self._write_value(resolved.keys, validated_value)
+        return validated_value
 
-    def initial_validate_and_build(self,key: str, value, schema,full_path=None):
+    def accessor(self, nested_path: str) -> "MetadataAccessor":
+        """
+        Return a getter/setter bound to a metadata field, with the path and its schema validator resolved once.
+        Useful when the same fields are read or written many times.
+
+        Parameters
+        ----------
+        nested_path : str
+            Metadata field path, using dot notation for nested fields (e.g., "Dataset.publisher.name").
+
+        Returns
+        -------
+        MetadataAccessor
+            Accessor of the field.
+
+        Raises
+        ------
+        KeyError
+            If a key in the path is not valid according to the schema.
+
+        Examples
+        --------
+        >>> publisher_name = cfg.accessor("Dataset.publisher.name")
+        >>> publisher_name.set("Office for National Statistics")
+        >>> publisher_name.get()
+        """
+        try:
+            resolved=self._compiled.resolve(nested_path)
+        except KeyError as ke:
+            raise KeyError(f"Key error for path '{nested_path}': {str(ke)}")
+        return MetadataAccessor(self, resolved)
+
+    def _write_value(self, keys: tuple, validated_value):
+        """
+        Write an already validated value at a path, in a branch owned by this instance.
+
+        Parameters
+        ----------
+        keys : tuple of str
+            Keys of the path, from the root.
+        validated_value : object
+            Value returned by the field validator.
+        """
+        current_metadata=self._writable_branch(keys[:-1])
+        #the replaced value is no longer part of this instance's metadata
+        self._owned_branches.discard_tree(current_metadata.get(keys[-1]))
+        current_metadata[keys[-1]] = validated_value
+        #validated objects are new dictionaries built by the validators (converted when stored in a record)
+        if isinstance(validated_value, dict):
+            self._owned_branches.add(current_metadata[keys[-1]])
+        #remembered so validate(incremental=True) only re-checks what changed
+        self._dirty_paths.add(keys)
+
+    def _own_value(self, keys: tuple, value):
+        """
+        Make an object or list of the metadata (and everything in it) owned by this instance, copying the parts shared
+        with the default metadata, so it can be returned by reference and changed in place.
+
+        Parameters
+        ----------
+        keys : tuple of str
+            Keys of the value, from the root.
+        value : dict, CompactRecord or list
+            The value at this path.
+
+        Returns
+        -------
+        dict, CompactRecord or list
+            The value, owned by this instance.
+        """
+        owned=self._owned_branches
+        if value not in owned:
+            parent=self._writable_branch(keys[:-1])
+            value=value.copy()
+            parent[keys[-1]]=value
+            owned.add(value)
+        self._own_children(value)
+        #it can be changed in place from now on
+        self._dirty_paths.add(keys)
+        return value
+
+    def _own_children(self, container):
+        """Copy the objects and lists inside an owned container which aren't owned yet (see `_own_value`)."""
+        owned=self._owned_branches
+        for key, child in _children(container):
+            if isinstance(child, _CONTAINER_TYPES):
+                if child not in owned:
+                    #replacing a value doesn't change the size, so the iteration goes on
+                    child=child.copy()
+                    container[key]=child
+                    owned.add(child)
+                self._own_children(child)
+
+    def _writable_branch(self, keys: tuple) -> dict:
+        """
+        Return the metadata dictionary (or record) at a path, copying it (and its parents) first if it's shared with the default metadata.
+
+        Parameters
+        ----------
+        keys : tuple of str
+            Keys of the nested dictionaries, from the root.
+
+        Returns
+        -------
+        dict or CompactRecord
+            A dictionary owned by this instance, safe to modify in place.
+        """
+        owned=self._owned_branches
+        if self._metadata not in owned:
+            self._metadata=self._metadata.copy()
+            owned.add(self._metadata)
+        branch=self._metadata
+        for key in keys:
+            child=branch.get(key)
+            if child not in owned:
+                #missing (or non-object) branches are created, shared ones are shallow copied
+                if isinstance(child, MAPPING_TYPES):
+                    child=child.copy()
+                else:
+                    child=branch.new_branch(key) if isinstance(branch, CompactRecord) else {}
+                branch[key]=child
+                owned.add(child)
+            branch=child
+        return branch
+
+
+    @instrumented("build", count_errors=True)
+    def initial_validate_and_build(self,key: str, value, schema,full_path=None, mode: str = "full", max_errors: Optional[int] = None):
         """
         Recursively validate a value against the schema (supports enums, dates, and nested objects).
 
@@ -234,6 +530,10 @@ class MetadataConfig:
             Value to validate. Values for nested fields should be dictionaries.
         schema : dict
             Schema definition for validation.
+        mode : str, optional
+            "full" (default) reports every invalid nested field, "fail_fast" stops at the first one.
+        max_errors : int, optional
+            Stop checking nested fields once this many errors were found.
 
         Returns
         -------
@@ -249,6 +549,12 @@ class MetadataConfig:
 
         """
         
+        limit=error_limit(mode, max_errors)
+        #schemas compiled in __init__ are validated by their compiled validators
+        compiled_owner=self._compiled.owner_of(schema)
+        if compiled_owner is not None:
+            return compiled_owner.build_child(key, value, full_path, limit)
+
         if key not in schema:
             raise KeyError(f"{key} is not a valid key in the schema.")
         
@@ -273,17 +579,15 @@ class MetadataConfig:
 
         #DATETIME field
         elif key_schema.get("type")=="datetime":
+            date_validator=date_validator_for(key_schema)
             if isinstance(value, datetime.datetime):
                 # Convert datetime to string for the the final json file
-                value = value.strftime("%d/%m/%Y")  
-            if not isinstance(value, str):
-                raise ValueError(f"Validation error for path '{current_path}': {value} for {key} is not a string. Please use string format") 
-            try:
-                #Only validate, don't convert
-                #checks if the string value matches the date format "dd/mm/yyyy"
-                datetime.datetime.strptime(value, "%d/%m/%Y")
-            except ValueError:
-                raise ValueError(f"Validation error for path '{current_path}': Value '{value}' is the wrong datetime format for '{key}'. Try 'dd/mm/yyyy'.")
+                value = date_validator.format(value)
+            #Only validate, don't convert
+            #checks if the string value matches the date format "dd/mm/yyyy" (or the field's "dateFormat")
+            date_error=date_validator.error(value, key)
+            if date_error is not None:
+                raise ValueError(f"Validation error for path '{current_path}': {date_error}")
             return value
 
         #NESTED OBJECT
@@ -299,17 +603,23 @@ class MetadataConfig:
                 # print(f"nested_object->  subkey:{subkey}, sub-value:{subval}")
                 if subkey not in key_schema["properties"]:
                     errors.append(KeyError(f"'{subkey}' is not a valid key in the schema for '{key}'."))
+                    if limit is not None and len(errors)>=limit:
+                        break
                     #If the subkey is invalid, you still proceed to validate it, which may raise a KeyError again. You should continue after appending the error
                     continue
                 try:
                     # Recursively set each property in the nested object
-                    nested_result=self.initial_validate_and_build(subkey,subval,key_schema["properties"],current_path)
+                    remaining=limit-len(errors) if limit is not None else None
+                    nested_result=self.initial_validate_and_build(subkey,subval,key_schema["properties"],current_path,max_errors=remaining)
                     validated_results[subkey]=nested_result
                 #early exit
                 #If a subfield validator returns None, you should abort the entire nested set to avoid partial writes.
                 except (ValueError, KeyError) as e:
                     # Don't re-wrap the error, just let it bubble up
                     errors.append(e)
+                #stop once the error limit is reached
+                if limit is not None and len(errors)>=limit:
+                    break
             
             if errors:        
                 error_messages = "\n  - ".join(str(e) for e in errors)
@@ -345,6 +655,7 @@ class MetadataConfig:
             return value
         
 
+    @instrumented("load")
     def load_metadata_from_file(self, config_path: str):
         """
         Load metadata from a JSON or YAML file and import it into the instance.
@@ -367,32 +678,13 @@ class MetadataConfig:
         ValueError
             If the file format is unsupported or parsing fails.
         """
-        #check file extension
-        format = config_path.split(".")[-1].lower()
-        verified_config_path = Path(config_path)
-        
-        if not verified_config_path.exists():
-            raise FileNotFoundError(f"Configuration file not found: {verified_config_path}")
-        
-        #load the file content based on format
-        try:
-            with open(verified_config_path, 'r') as file:
-                if format == 'json':
-                    loaded_raw_metadata = json.load(file)
-                elif format in ['yaml', 'yml']:
-                    loaded_raw_metadata = yaml.safe_load(file)
-                else:
-                    raise ValueError(f'Unsupported file format: {format}. Only "json" and "yaml" are supported.')
-        except json.JSONDecodeError as e:
-            raise ValueError(f'Error parsing JSON file: {e}')
-        except yaml.YAMLError as e:
-            raise ValueError(f'Error parsing YAML file: {e}')
-    
+        loaded_raw_metadata = read_metadata_file(config_path)
         # it only validates input dictionary and updates the metadata attribute of the instance
         self.import_from_dict(loaded_raw_metadata)
 
         return loaded_raw_metadata
     
+    @instrumented("export")
     def export_to_json(self,title, file_path: str = '/api_formatter/results'):
         """
         Export the dataset metadata to a JSON file.
@@ -401,11 +693,34 @@ class MetadataConfig:
         ----------
         file_path : str, optional
             The directory path for where the JSON file will be stored (default: '/api_formatter/results').
+
+        Raises
+        ------
+        ValueError
+            If the title could name a file outside the folder (see `export_file_name`).
         """
         #changed title instance with the title method instance avoding any conflict with the new metadata fields
-        with open(f"{file_path}/{title}_metadata.json", 'w') as fp:
-            json.dump(self._metadata, fp)
+        name = export_file_name(title)
+        data = dumps_json_default(self.to_dict())
+        with open(f"{file_path}/{name}", 'w', encoding='utf-8') as fp:
+            fp.write(data)
+        recorder = instrumentation.active()
+        if recorder is not None:
+            recorder.add_size("export", len(data.encode()))
+
 
+    def to_dict(self) -> dict:
+        """
+        Return the metadata as plain nested dictionaries (the shape written by `export_to_json()`).
+
+        Returns
+        -------
+        dict
+            The metadata. For dictionary storage this is the metadata itself (not a copy), so it should not be modified.
+        """
+        if isinstance(self._metadata, CompactRecord):
+            return self._metadata.to_dict()
+        return self._metadata
 
     def load_json(self,file_path:str):
         """
@@ -429,8 +744,7 @@ class MetadataConfig:
             If the file is not valid JSON.
         """
         # Load your schema (as shown in your message)
-        with open(file_path) as f:
-            data = json.load(f)
+        data = read_json(file_path)
         return data
     
 
@@ -444,7 +758,7 @@ class MetadataConfig:
             - 'array'          : Must be a Python list, with recursive validation for 'items'.
             - 'object'         : Must be a Python dict, with recursive validation for 'properties'.
             - 'pathlib.Path'   : Must be a Python str or pathlib.Path.
-            - 'datetime'       : Must be a string in "%d/%m/%Y" format.
+            - 'datetime'       : Must be a string in "%d/%m/%Y" format (or the formats in the schema's 'dateFormat').
             - 'enum'           : If present, value must be in schema["enum"].
 
         If the schema includes an 'enum', the value must also be present in the allowed list.
@@ -487,17 +801,10 @@ class MetadataConfig:
                 return False
         #not sure if we get datetime python format or string in the drafted metdata so we check both scenarios
         elif data_type=="datetime":
-            if not isinstance(value, str):
-                    #only accept strings that match the format.
-                    #convert datetime.datetime to a string before calling this function, which we did in initial_validate_and_build
-                    return False
-            elif isinstance(value,str):
-                try: 
-                    datetime.datetime.strptime(value,"%d/%m/%Y")
-                except ValueError:
-                    print(f'{value} is the wrong datetime format. Try "dd/mm/yyyy".')
-                    return False
-            else:
+            #only accept strings that match the format.
+            #convert datetime.datetime to a string before calling this function, which we did in initial_validate_and_build
+            #the reason a date is wrong is reported by validate(), not printed here
+            if not date_validator_for(schema).check(value):
                 return False
         #UNKNOWN TYPE: safer to return False than True
         #If the "type" is not one of those you explicitly handle (like "string", "integer", "array", etc.), the code reaches the final fallback line
@@ -511,7 +818,9 @@ class MetadataConfig:
         return True
     
     #we will have recursive calls in this method so should define instance in case of recurisve calls otherwise the class instance will be used
-    def validate(self,metadata:Optional[dict] = None, schema:Optional[dict] = None, path=""):
+    @instrumented("validate")
+    def validate(self,metadata:Optional[dict] = None, schema:Optional[dict] = None, path="", incremental:bool=False,
+                 mode:str="full", max_errors:Optional[int]=None, structured:bool=False):
         """
         Recursively validate the metadata dictionary against the schema, collecting all errors.
 
@@ -523,16 +832,54 @@ class MetadataConfig:
             Schema to validate against (default: instance schema).
         path : str, optional
             Nested property path for error reporting (internal use).
+        incremental : bool, optional
+            If True, only the fields written by `set()`/`import_from_dict()` since the last validation
+            (and the required fields of the objects containing them) are checked again, and merged into the previous results.
+            Only applies to the instance metadata and schema; the first validation is always a full one.
+        mode : str, optional
+            "full" (default) collects every error, "fail_fast" stops at the first one (e.g. to only know if the metadata is valid).
+        max_errors : int, optional
+            Stop validating once this many errors were found.
+            A limited validation is never incremental, and the next incremental validation is a full one.
+        structured : bool, optional
+            If True, return `ValidationError` objects (path, code, expected, actual) instead of messages,
+            so no message is formatted unless it's needed (`str(error)` gives the message).
 
         Returns
         -------
-        list of str
-            List of validation error messages.
+        list of str or list of ValidationError
+            List of validation error messages (or errors, if structured).
+
+        Raises
+        ------
+        ValueError
+            If the mode is unknown or max_errors is lower than 1.
         """
+        limit=error_limit(mode, max_errors)
+        #the instance metadata is validated into a per-path error index
+        if metadata is None and schema is None and isinstance(self._compiled.root, ObjectValidator):
+            #an index cut short by an error limit can't be updated incrementally
+            if incremental and limit is None and self._error_index is not None and self._error_index.max_errors is None:
+                self._revalidate_dirty_paths()
+            else:
+                self._error_index=self._compiled.root.error_index(self._metadata, path, limit)
+            self._dirty_paths.clear()
+            errors=flatten_error_index(self._error_index)
+            _record_errors(errors, path)
+            self.errors=errors if structured else [error.format() for error in errors]
+            return self.errors
         if metadata is None:
             metadata=self._metadata
         if schema is None:
             schema=self._schema 
+        #the instance schema (or any node of it) is validated by the compiled validators,
+        #other schemas fall back to walking the dict recursively
+        compiled_node=self._compiled.node_for(schema)
+        if isinstance(compiled_node, ObjectValidator):
+            errors=compiled_node.validate(metadata, path, limit)
+            _record_errors(errors, path)
+            self.errors=errors if structured else [error.format() for error in errors]
+            return self.errors
         #If you use a local variable like errors = [] inside validate and pass it along or return it, 
         # each call (including recursive calls) works on its own error list and aviod being overwritten unlike when it's an instance vraiable
         errors=[]
@@ -542,16 +889,19 @@ class MetadataConfig:
         # Now check nested required fields for objects (fields with "properties").
         for req_key in required:
             if req_key not in metadata:
-                errors.append(f"Missing required field: {path}{req_key}")
+                errors.append(ValidationError(f"{path}{req_key}", "required"))
 
         #check all the schema's keys and values in the properties field recursively
         for key, val_schema in props.items():
+            #stop once the error limit is reached
+            if limit is not None and len(errors)>=limit:
+                break
             if key not in metadata:
                 continue  # If a property key (key) is not present in the metadata then next iteration              
             val = metadata[key]
             # iterating through nested objects if there's nested properties object in the current propreties
             if "properties" in val_schema:
-                errors += self.validate(val, val_schema, path + key + ".")
+                errors += self.validate(val, val_schema, path + key + ".", max_errors=limit-len(errors) if limit is not None else None, structured=True)
             #If it's a leaf (last layer), it type-checks the value.
             elif "type" in val_schema:
                 # Type check
@@ -560,24 +910,61 @@ class MetadataConfig:
                     # print(val_schema)
                     #check the datasettype errors
                     if "enum" in val_schema:
-                        errors.append(
-                            f"Incorrect dataset type for {path}{key}: allowed types are {val_schema['enum']}, but got {repr(val)}"
-                        )
+                        errors.append(ValidationError(f"{path}{key}", "enum", val_schema['enum'], val))
                     elif "items" in val_schema:
-                        errors.append(
-                            f"Incorrect item type for {path}{key}: allowed types are {val_schema['items']["type"]}, but got {repr(val)}"
-                        )
+                        errors.append(ValidationError(f"{path}{key}", "item_type", val_schema['items']['type'], val))
                     
                     #other errors
                     else:
-                        errors.append(
-                            f"Incorrect type for {path}{key}: expected {val_schema['type']}, but got {type(val).__name__}"
-                        )  
+                        errors.append(ValidationError(f"{path}{key}", "type", val_schema['type'], val))
+        if limit is not None:
+            errors=errors[:limit]
+        _record_errors(errors, path)
+        #messages are only formatted for the outermost call
+        if not structured:
+            errors=[error.format() for error in errors]
         # Optionally keep for later
         self.errors=errors
         return errors      
     
 
+    def _revalidate_dirty_paths(self):
+        """
+        Update the error index for the paths written since the last validation.
+
+        The errors of each written field (and of the fields below it) are replaced, and the required fields of the
+        objects along its path are checked again, as set() may have created those objects.
+        """
+        index=self._error_index
+        revalidated=[]
+        #shortest paths first, so fields inside an object which was replaced as a whole are only checked once
+        for keys in sorted(self._dirty_paths, key=len):
+            if any(keys[:len(done)]==done for done in revalidated):
+                continue
+            revalidated.append(keys)
+            field_path=".".join(keys)
+            for indexed_path in [p for p in index if p==field_path or p.startswith(field_path + ".")]:
+                del index[indexed_path]
+
+            node=self._compiled.root
+            metadata=self._metadata
+            prefix=""
+            for key in keys[:-1]:
+                #the objects on the path exist now, so their own errors are gone
+                index.pop(prefix + key, None)
+                self._collect_missing_required(node, metadata, prefix)
+                node=node.properties[key]
+                metadata=metadata[key]
+                prefix=f"{prefix}{key}."
+            self._collect_missing_required(node, metadata, prefix)
+            node.collect_property_errors(keys[-1], metadata[keys[-1]], prefix, index)
+
+    def _collect_missing_required(self, node: ObjectValidator, metadata: dict, prefix: str):
+        """Add the missing required fields of an object to the error index."""
+        for req_key in node.required:
+            if req_key not in metadata:
+                self._error_index[f"{prefix}{req_key}"]=[ValidationError(f"{prefix}{req_key}", "required")]
+
     def print_QA_errors(self):
         """
         Print the results of the most recent quality assurance (QA) validation in a human-readable format.
@@ -603,11 +990,29 @@ class MetadataConfig:
 
         Returns
         -------
-        list of str
-            List of validation error messages, or an empty list if none exist.
+        list of str or list of ValidationError
+            List of validation error messages (errors if the validation was structured), or an empty list if none exist.
         """
         return getattr(self,'errors',[])
 
+    def get_error_index(self, structured: bool = False):
+        """
+        Retrieve the validation errors from the most recent validation of the instance metadata, grouped by field path.
+
+        Parameters
+        ----------
+        structured : bool, optional
+            If True, the errors are `ValidationError` objects instead of messages.
+
+        Returns
+        -------
+        dict
+            Field path (e.g. "Dataset.qmi.href") -> list of error messages (or errors), or an empty dict if none exist.
+        """
+        if structured:
+            return {path: list(errors) for path, errors in (self._error_index or {}).items()}
+        return {path: [error.format() for error in errors] for path, errors in (self._error_index or {}).items()}
+
     def preview(self, format):
         """
         Print out the metadata to the console as in yaml or json format.
@@ -625,7 +1030,106 @@ class MetadataConfig:
             raise ValueError("Preview format should be 'yaml' or 'json'")
 
         elif format == "json":
-            print(json.dumps(self._metadata, indent=4))
+            print(dumps_json_default(self.to_dict(), indent=4))
         elif format == "yaml":
-            print(yaml.dump(self._metadata, indent=4))
+            print(dumps_yaml_default(self.to_dict(), indent=4))
         return None
+
+    #Async API: the blocking work runs in the bounded pools of src.executors so it doesn't stall the event loop.
+    #An instance shouldn't be used by other code while one of these is awaited.
+    async def aload(self, config_path: str) -> dict:
+        """
+        Awaitable `load_metadata_from_file()`: the file is read in the I/O pool and imported in the CPU pool.
+
+        Returns
+        -------
+        dict
+            The loaded metadata dictionary.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the specified file does not exist.
+        ValueError
+            If the file format is unsupported, parsing fails, or a value is invalid.
+        KeyError
+            If a key of the file is not part of the metadata.
+        """
+        loaded_raw_metadata = await run_io(read_metadata_file, config_path)
+        await run_cpu(self.import_from_dict, loaded_raw_metadata)
+        return loaded_raw_metadata
+
+    async def aload_json(self, file_path: str):
+        """Awaitable `load_json()`, reading the file in the I/O pool."""
+        return await run_io(self.load_json, file_path)
+
+    async def avalidate(self, **kwargs):
+        """
+        Awaitable `validate()`, run in the CPU pool. Keyword arguments (e.g. mode, structured) are passed to `validate()`.
+
+        Returns
+        -------
+        list of str or list of ValidationError
+            The result of `validate()`.
+        """
+        return await run_cpu(self.validate, **kwargs)
+
+    async def aexport_to_json(self, title, file_path: str = '/api_formatter/results'):
+        """Awaitable `export_to_json()`: the metadata is serialised and written in the I/O pool."""
+        await run_io(self.export_to_json, title, file_path)
+
+
+class MetadataAccessor:
+    """
+    Getter/setter of a single metadata field of a `MetadataConfig`, returned by `MetadataConfig.accessor()`.
+
+    The path is split and resolved against the schema once, so `get()` and `set()` only walk the metadata.
+
+    Attributes
+    ----------
+    path : str
+        The dotted path of the field.
+    """
+    __slots__ = ("_config", "_resolved", "path")
+
+    def __init__(self, config: MetadataConfig, resolved):
+        self._config = config
+        self._resolved = resolved
+        self.path = resolved.path
+
+    def get(self):
+        """
+        Retrieve the value of the field (see `MetadataConfig.get`).
+
+        Raises
+        ------
+        KeyError
+            If the field is not in the metadata.
+        """
+        value = self._config._metadata
+        for k in self._resolved.keys:
+            if isinstance(value, MAPPING_TYPES) and k in value:
+                value = value[k]
+            else:
+                raise KeyError(f"'{self.path}' is not a valid config option")
+        if isinstance(value, _CONTAINER_TYPES):
+            value = self._config._own_value(self._resolved.keys, value)
+        return value
+
+    def set(self, value):
+        """
+        Validate and set the value of the field (see `MetadataConfig.set`).
+
+        Returns
+        -------
+        object
+            Validated value if successful.
+
+        Raises
+        ------
+        ValueError
+            If validation fails for the provided value.
+        """
+        validated_value = self._resolved.build(value)
+        self._config._write_value(self._resolved.keys, validated_value)
+        return validated_value
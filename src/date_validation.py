@@ -0,0 +1,167 @@
+import datetime
+import functools
+import re
+from typing import Iterable, Optional, Sequence, Union
+
+
+DATE_FORMAT = "%d/%m/%Y"
+
+#Patterns of the directives which can be checked without strptime, as strptime itself matches them
+_DIRECTIVE_PATTERNS = {
+    "d": r"(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])",
+    "m": r"(?P<m>1[0-2]|0[1-9]|[1-9])",
+    "Y": r"(?P<Y>\d\d\d\d)",
+}
+
+
+def _compile_format(date_format: str):
+    """
+    Compile a date format into a regular expression, or return None if it uses directives other than %d, %m and %Y
+    (or uses one twice), in which case strptime is used for it.
+
+    The text between directives must match the same strings as in strptime, which matches any whitespace with
+    `\\s+` and letters case-insensitively: formats with whitespace, letters or a stray "%" there use strptime too.
+    """
+    pattern = []
+    seen = set()
+    parts = re.split(r"(%.)", date_format)
+    for part in parts:
+        if part.startswith("%") and len(part) == 2:
+            directive = part[1]
+            if directive not in _DIRECTIVE_PATTERNS or directive in seen:
+                return None
+            seen.add(directive)
+            pattern.append(_DIRECTIVE_PATTERNS[directive])
+        elif any(char.isspace() or char.lower() != char.upper() or char == "%" for char in part):
+            return None
+        else:
+            pattern.append(re.escape(part))
+    if seen != set(_DIRECTIVE_PATTERNS):
+        return None
+    return re.compile("".join(pattern) + r"\Z")
+
+
+#formats -> validator, see DateValidator.for_formats
+_SHARED_VALIDATORS = {}
+
+
+class DateValidator:
+    """
+    Checks date strings against one or more formats, with a fast path and memoisation.
+
+    Formats made of %d, %m and %Y (with separators other than whitespace and letters) are checked with a precompiled
+    regular expression and `datetime.date` (which rejects impossible dates such as 31/02/2024) instead of
+    `datetime.datetime.strptime`; other formats use strptime. The results for recently seen strings are cached, as catalogues
+    repeat the same release dates many times.
+
+    Schema fields of type "datetime" use the default "dd/mm/yyyy" format, or the format(s) given
+    in their "dateFormat" key (a format string or a list of them).
+
+    Attributes
+    ----------
+    formats : tuple of str
+        Accepted formats, in order of preference (the first one is used to format datetime objects).
+
+    Examples
+    --------
+    >>> validator = DateValidator.for_formats(["%d/%m/%Y"])
+    >>> validator.is_valid("31/02/2024")
+    False
+    >>> validator.error("2024-01-31", "release_date")
+    "Value '2024-01-31' is the wrong datetime format for 'release_date'. Try 'dd/mm/yyyy'."
+    """
+    #number of date strings whose result is cached per validator
+    CACHE_SIZE = 4096
+
+    def __init__(self, formats: Sequence[str] = (DATE_FORMAT,)):
+        if isinstance(formats, str):
+            formats = (formats,)
+        if not formats:
+            raise ValueError("At least one date format is required.")
+        self.formats = tuple(formats)
+        self._patterns = [(date_format, _compile_format(date_format)) for date_format in self.formats]
+        self.is_valid = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._is_valid)
+
+    @classmethod
+    def for_formats(cls, formats: Union[str, Sequence[str]] = DATE_FORMAT) -> "DateValidator":
+        """Return the shared validator of a format (or list of formats), so fields with the same formats share a cache."""
+        key = (formats,) if isinstance(formats, str) else tuple(formats)
+        validator = _SHARED_VALIDATORS.get(key)
+        if validator is None:
+            validator = _SHARED_VALIDATORS[key] = cls(key)
+        return validator
+
+    def _is_valid(self, value: str) -> bool:
+        """Return True if the string matches one of the formats and is a real date."""
+        for date_format, pattern in self._patterns:
+            if pattern is None:
+                try:
+                    datetime.datetime.strptime(value, date_format)
+                    return True
+                except ValueError:
+                    continue
+            match = pattern.match(value)
+            if match is None:
+                continue
+            try:
+                datetime.date(int(match["Y"]), int(match["m"]), int(match["d"]))
+                return True
+            except ValueError:
+                continue
+        return False
+
+    def check(self, value) -> bool:
+        """Return True if the value is a string in one of the formats (non strings are never valid)."""
+        return isinstance(value, str) and self.is_valid(value)
+
+    def check_many(self, values: Iterable) -> list:
+        """
+        Check many values at once.
+
+        Parameters
+        ----------
+        values : iterable
+            The values to check.
+
+        Returns
+        -------
+        list of bool
+            For each value, whether it is a valid date string.
+        """
+        is_valid = self.is_valid
+        return [isinstance(value, str) and is_valid(value) for value in values]
+
+    def hint(self) -> str:
+        """Return the accepted formats as shown in error messages (e.g. 'dd/mm/yyyy')."""
+        readable = [date_format.replace("%d", "dd").replace("%m", "mm").replace("%Y", "yyyy") for date_format in self.formats]
+        return " or ".join(f"'{date_format}'" for date_format in readable)
+
+    def error(self, value, key: str) -> Optional[str]:
+        """
+        Return the error message for a value, or None if it is a valid date string.
+
+        Parameters
+        ----------
+        value : object
+            The value to check.
+        key : str
+            Field name used in the message.
+        """
+        if not isinstance(value, str):
+            return f"{value} for {key} is not a string. Please use string format"
+        if not self.is_valid(value):
+            return f"Value '{value}' is the wrong datetime format for '{key}'. Try {self.hint()}."
+        return None
+
+    def format(self, value: datetime.datetime) -> str:
+        """Format a datetime object with the preferred format."""
+        return value.strftime(self.formats[0])
+
+
+def date_validator_for(schema: dict) -> DateValidator:
+    """Return the shared date validator of a "datetime" schema node (from its optional "dateFormat" key)."""
+    return DateValidator.for_formats(schema.get("dateFormat", DATE_FORMAT))
+
+
+#Validator of the default "dd/mm/yyyy" format
+DEFAULT_DATE_VALIDATOR = DateValidator.for_formats(DATE_FORMAT)
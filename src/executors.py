@@ -0,0 +1,88 @@
+"""
+Bounded executors used by the async API (`MetadataConfig.aload()`, `avalidate()`, ..., and `src.async_api`)
+to keep blocking file I/O and CPU-bound validation off the asyncio event loop.
+
+Two thread pools are created on first use and shared by the whole process:
+    - the I/O pool, for reading and writing files (threads mostly wait on the disk);
+    - the CPU pool, for importing and validating metadata (bounded to the number of CPUs, so a burst
+      of requests queues up instead of starting one thread per request).
+
+`configure_executors()` changes their sizes, `shutdown_executors()` stops them (e.g. when the service exits).
+"""
+import functools
+import os
+import threading
+from typing import Optional
+
+
+IO_WORKERS = 8
+CPU_WORKERS = os.cpu_count() or 1
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def configure_executors(io_workers: Optional[int] = None, cpu_workers: Optional[int] = None):
+    """
+    Set the number of threads of the I/O and CPU pools. Pools already running are shut down (after their current work)
+    and recreated with the new size on next use.
+
+    Raises
+    ------
+    ValueError
+        If a number of workers is lower than 1.
+    """
+    global IO_WORKERS, CPU_WORKERS
+    for workers in (io_workers, cpu_workers):
+        if workers is not None and workers < 1:
+            raise ValueError("The number of workers should be at least 1.")
+    if io_workers is not None:
+        IO_WORKERS = io_workers
+    if cpu_workers is not None:
+        CPU_WORKERS = cpu_workers
+    shutdown_executors(wait=False)
+
+
+def _executor(kind: str):
+    executor = _executors.get(kind)
+    if executor is None:
+        #imported on first use, so importing the package (e.g. for the command line) doesn't pay for it
+        from concurrent.futures import ThreadPoolExecutor
+        with _lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                workers = IO_WORKERS if kind == "io" else CPU_WORKERS
+                executor = _executors[kind] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"metadata-{kind}")
+    return executor
+
+
+def io_executor():
+    """Return the shared pool for blocking file I/O."""
+    return _executor("io")
+
+
+def cpu_executor():
+    """Return the shared pool for CPU-bound work (importing and validating metadata)."""
+    return _executor("cpu")
+
+
+async def run_io(func, *args, **kwargs):
+    """Run a blocking I/O function in the I/O pool and await its result."""
+    #already imported by the running event loop, not at module level so synchronous users don't import it
+    import asyncio
+    return await asyncio.get_running_loop().run_in_executor(io_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_cpu(func, *args, **kwargs):
+    """Run a CPU-bound function in the CPU pool and await its result."""
+    import asyncio
+    return await asyncio.get_running_loop().run_in_executor(cpu_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executors(wait: bool = True):
+    """Shut the shared pools down. They are created again if used afterwards."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
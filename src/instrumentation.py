@@ -0,0 +1,320 @@
+"""
+Opt-in instrumentation of the hot paths of loading, validating and exporting metadata.
+
+When enabled, a `Recorder` collects:
+    - the wall time and number of calls of each phase: "parse" (reading a file), "load" (`load_metadata_from_file`),
+      "build" (`set`, `import_from_dict`, `initial_validate_and_build`), "validate" and "export";
+    - the size of the documents read ("parse") and written ("export");
+    - the number of validation errors per schema path and error code, from `validate()` and from rejected values.
+
+A phase called inside itself (e.g. the recursive `validate()`) is timed once, by its outermost call.
+When disabled (the default), an instrumented function only pays for one extra function call and a global lookup.
+
+The summary is sent to sinks when the recorder is flushed: `InMemorySink` keeps it, `JSONLogSink` appends it to a
+JSON Lines log and `PrometheusSink` writes it as a Prometheus text file (e.g. for the node exporter's textfile collector).
+
+Examples
+--------
+>>> from src.instrumentation import InMemorySink, profile
+>>> with profile(InMemorySink()) as recorder:
+...     validate_my_batch()
+>>> recorder.summary()["phases"]["validate"]
+"""
+import functools
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from src.serializers import dumps_json
+
+
+PHASES = ["parse", "load", "build", "validate", "export"]
+
+#the enabled recorder, None when instrumentation is off
+_recorder = None
+
+
+class Recorder:
+    """
+    Thread-safe collector of phase timings, document sizes and validation errors (see the module docstring).
+
+    Attributes
+    ----------
+    sinks : list
+        Objects with an `emit(summary)` method, given the summary by `flush()`.
+    """
+    def __init__(self, sinks: Iterable = ()):
+        self.sinks = list(sinks)
+        self._lock = threading.Lock()
+        #phases running in the current thread, so nested calls of a phase aren't timed twice
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            #phase -> [calls, seconds, max seconds]
+            self._phases = {}
+            #phase -> [documents, bytes, max bytes]
+            self._sizes = {}
+            #(path, code) -> count
+            self._errors = Counter()
+            self._started = time.time()
+
+    def _running(self) -> set:
+        running = getattr(self._local, "phases", None)
+        if running is None:
+            running = self._local.phases = set()
+        return running
+
+    def add_time(self, phase: str, seconds: float):
+        """Record a call of a phase which took `seconds`."""
+        with self._lock:
+            entry = self._phases.setdefault(phase, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def add_size(self, phase: str, size: int):
+        """Record a document of `size` bytes read or written by a phase."""
+        with self._lock:
+            entry = self._sizes.setdefault(phase, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += size
+            entry[2] = max(entry[2], size)
+
+    def add_errors(self, errors: Iterable):
+        """Count validation errors (`ValidationError` objects) by path and code."""
+        counts = Counter((error.path, error.code) for error in errors)
+        if counts:
+            with self._lock:
+                self._errors.update(counts)
+
+    def summary(self) -> dict:
+        """
+        Return what was recorded so far.
+
+        Returns
+        -------
+        dict
+            "started": when recording started (ISO 8601), "duration": seconds since then,
+            "phases": phase -> {"calls", "seconds", "max_seconds"},
+            "documents": phase -> {"documents", "bytes", "max_bytes"},
+            "errors": {"total", "by_path": path -> count, "by_path_and_code": list of {"path", "code", "count"}}.
+        """
+        with self._lock:
+            phases = {phase: {"calls": calls, "seconds": seconds, "max_seconds": longest}
+                      for phase, (calls, seconds, longest) in self._phases.items()}
+            documents = {phase: {"documents": count, "bytes": size, "max_bytes": largest}
+                         for phase, (count, size, largest) in self._sizes.items()}
+            errors = self._errors.most_common()
+            started = self._started
+        by_path = Counter()
+        for (path, _), count in errors:
+            by_path[path] += count
+        return {
+            "started": datetime.fromtimestamp(started, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "duration": time.time() - started,
+            "phases": phases,
+            "documents": documents,
+            "errors": {
+                "total": sum(by_path.values()),
+                "by_path": dict(by_path.most_common()),
+                "by_path_and_code": [{"path": path, "code": code, "count": count} for (path, code), count in errors],
+            },
+        }
+
+    def flush(self) -> dict:
+        """Send the summary to every sink and return it."""
+        summary = self.summary()
+        for sink in self.sinks:
+            sink.emit(summary)
+        return summary
+
+
+def active() -> Optional[Recorder]:
+    """Return the enabled recorder, or None if instrumentation is off."""
+    return _recorder
+
+
+def enable(sinks: Iterable = ()) -> Recorder:
+    """
+    Turn instrumentation on for the whole process, with a new recorder.
+
+    Parameters
+    ----------
+    sinks : iterable, optional
+        Sinks the summary is sent to by `Recorder.flush()` and `disable()`.
+
+    Returns
+    -------
+    Recorder
+        The recorder.
+    """
+    global _recorder
+    _recorder = Recorder(sinks)
+    return _recorder
+
+
+def disable() -> Optional[Recorder]:
+    """Turn instrumentation off, flushing the recorder to its sinks. Return the recorder (None if it was off)."""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.flush()
+    return recorder
+
+
+@contextmanager
+def profile(*sinks):
+    """
+    Instrument a block of code, e.g. a batch run: the recorder is flushed to the sinks at the end.
+
+    Examples
+    --------
+    >>> with profile(JSONLogSink("metrics.jsonl"), PrometheusSink("metadata.prom")) as recorder:
+    ...     validate_many(paths, workers=1)
+    """
+    recorder = enable(sinks)
+    try:
+        yield recorder
+    finally:
+        #only turned off if no one enabled another recorder meanwhile
+        if _recorder is recorder:
+            disable()
+        else:
+            recorder.flush()
+
+
+def instrumented(phase: str, count_errors: bool = False):
+    """
+    Decorator timing a function as a phase when instrumentation is on.
+
+    Parameters
+    ----------
+    phase : str
+        Name of the phase (see PHASES).
+    count_errors : bool, optional
+        Also count the validation errors of the exceptions raised by the function
+        (those with a `validation_errors()` method, e.g. `FieldValueError`).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            running = recorder._running()
+            if phase in running:
+                return func(*args, **kwargs)
+            running.add(phase)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if count_errors and hasattr(e, "validation_errors"):
+                    recorder.add_errors(e.validation_errors())
+                raise
+            finally:
+                recorder.add_time(phase, time.perf_counter() - start)
+                running.discard(phase)
+        return wrapper
+    return decorator
+
+
+class InMemorySink:
+    """Keeps every summary emitted, e.g. to inspect them in a notebook or test."""
+    def __init__(self):
+        self.summaries = []
+
+    def emit(self, summary: dict):
+        self.summaries.append(summary)
+
+    @property
+    def last(self) -> Optional[dict]:
+        """The last summary emitted, or None."""
+        return self.summaries[-1] if self.summaries else None
+
+
+class JSONLogSink:
+    """Appends each summary as one JSON line to a log file."""
+    def __init__(self, file_path: Union[str, Path]):
+        self.file_path = Path(file_path)
+
+    def emit(self, summary: dict):
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(dumps_json(summary) + "\n")
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def summary_metrics(summary: dict) -> list:
+    """Return the metrics of a recorder summary, as (name, type, description, samples) tuples for `render_prometheus`."""
+    return [
+        ("phase_calls_total", "counter", "Calls of each phase.",
+         [({"phase": phase}, values["calls"]) for phase, values in summary["phases"].items()]),
+        ("phase_seconds_total", "counter", "Wall time spent in each phase.",
+         [({"phase": phase}, values["seconds"]) for phase, values in summary["phases"].items()]),
+        ("phase_max_seconds", "gauge", "Longest call of each phase.",
+         [({"phase": phase}, values["max_seconds"]) for phase, values in summary["phases"].items()]),
+        ("documents_total", "counter", "Documents read or written by each phase.",
+         [({"phase": phase}, values["documents"]) for phase, values in summary["documents"].items()]),
+        ("document_bytes_total", "counter", "Bytes read or written by each phase.",
+         [({"phase": phase}, values["bytes"]) for phase, values in summary["documents"].items()]),
+        ("validation_errors_total", "counter", "Validation errors by schema path and error code.",
+         [({"path": error["path"], "code": error["code"]}, error["count"]) for error in summary["errors"]["by_path_and_code"]]),
+    ]
+
+
+def render_prometheus(metrics: Iterable, prefix: str = "metadata") -> str:
+    """
+    Render metrics in the Prometheus text format.
+
+    Parameters
+    ----------
+    metrics : iterable of tuple
+        (name, type, description, samples) of each metric, samples being (labels dict, value) pairs.
+    prefix : str, optional
+        Prefix of the metric names (default: "metadata").
+    """
+    lines = []
+    for name, metric_type, description, samples in metrics:
+        name = f"{prefix}_{name}"
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in samples:
+            rendered = ",".join(f'{key}="{_label(label)}"' for key, label in labels.items())
+            lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusSink:
+    """
+    Writes the last summary to a file in the Prometheus text format, replacing it atomically.
+
+    Parameters
+    ----------
+    file_path : str or pathlib.Path
+        Path of the file (e.g. in the node exporter's textfile collector folder, with a .prom extension).
+    prefix : str, optional
+        Prefix of the metric names (default: "metadata").
+    """
+    def __init__(self, file_path: Union[str, Path], prefix: str = "metadata"):
+        self.file_path = Path(file_path)
+        self.prefix = prefix
+
+    def render(self, summary: dict) -> str:
+        """Return the summary in the Prometheus text format."""
+        return render_prometheus(summary_metrics(summary), self.prefix)
+
+    def emit(self, summary: dict):
+        #imported here, as src.bulk_export imports the instrumented modules
+        from src.bulk_export import write_atomic
+        write_atomic(self.file_path, self.render(summary).encode())
@@ -1,2 +1,190 @@
-import pandas as pd
-import numpy as np
\ No newline at end of file
+"""
+Command line interface: validate, export, preview metadata files and generate their CSVW metadata.
+
+    python -m src.main validate "data/Metadata Samples/*.json" --workers 4
+    python -m src.main export metadata/*.yaml --output results --bundle tar
+    python -m src.main preview data/cpi_metadata.json --format yaml
+    python -m src.main csvw metadata/*.json --output results/csvw --accrual-periodicity Monthly
+    python -m src.main serve --port 8765 --workers 4
+
+Every command accepts many files and glob patterns, so a pipeline can process a whole folder in one invocation.
+`serve` keeps the schema loaded in a long-running server instead, for pipelines sending documents one step at a time
+(see src/server.py).
+Only the standard library is imported at start-up: the package (and PyYAML, pandas, ...) is imported by the
+command that needs it, so `--help` or a bad argument answers immediately (see benchmarks/bench_cli_startup.py).
+
+Exit status: 0 on success, 1 if a document is invalid or can't be loaded, 2 for a usage error.
+"""
+import argparse
+import glob
+import os
+import sys
+
+SCHEMA_PATH = r"data/Schema/CombinedSchema.json"
+
+
+def expand_paths(patterns: list) -> list:
+    """
+    Expand file paths and glob patterns (with ** for sub-folders) into a list of files, in order and without duplicates.
+
+    Raises
+    ------
+    FileNotFoundError
+        If a pattern matches no file.
+    """
+    paths = {}
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern] if os.path.isfile(pattern) else []
+        if not matches:
+            raise FileNotFoundError(f"No file matches '{pattern}'.")
+        paths.update(dict.fromkeys(matches))
+    return list(paths)
+
+
+def _load_configs(paths: list, schema: str) -> tuple:
+    """Load each file into a MetadataConfig. Return the configs and the paths which failed, with their error."""
+    from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+
+    configs, failures = [], []
+    for path in paths:
+        cfg = MetadataConfig(schema, COMBINED_DEFAULT)
+        try:
+            cfg.load_metadata_from_file(path)
+        except (ValueError, KeyError, OSError) as e:
+            failures.append((path, e))
+        else:
+            configs.append((path, cfg))
+    return configs, failures
+
+
+def _report_failures(failures: list):
+    for path, error in failures:
+        print(f"{path}: could not be loaded: {error}", file=sys.stderr)
+
+
+def command_validate(args) -> int:
+    from src.batch_validation import validate_many
+
+    reports = validate_many(expand_paths(args.files), schema=args.schema, workers=args.workers, mode=args.mode,
+                            max_errors=args.max_errors)
+    if args.format == "json":
+        from src.serializers import dumps_json
+        print(dumps_json(reports, indent=2))
+    else:
+        for report in reports:
+            if report["valid"]:
+                print(f"{report['source']}: valid")
+            elif report["load_error"]:
+                print(f"{report['source']}: could not be loaded: {report['load_error']}")
+            else:
+                print(f"{report['source']}: {len(report['errors'])} error(s)")
+                for error in report["errors"]:
+                    print(f"  - {error}")
+    return 0 if all(report["valid"] for report in reports) else 1
+
+
+def command_export(args) -> int:
+    from src.bulk_export import export_many
+
+    configs, failures = _load_configs(expand_paths(args.files), args.schema)
+    _report_failures(failures)
+    result = export_many((cfg for _, cfg in configs), args.output, title_path=args.title_path, workers=args.workers,
+                         bundle=args.bundle, skip_unchanged=not args.force)
+    print(f"{len(result['written'])} file(s) written, {len(result['skipped'])} unchanged, to {args.output}")
+    return 1 if failures else 0
+
+
+def command_preview(args) -> int:
+    configs, failures = _load_configs(expand_paths(args.files), args.schema)
+    _report_failures(failures)
+    for path, cfg in configs:
+        if len(configs) > 1:
+            print(f"# {path}")
+        cfg.preview(args.format)
+    return 1 if failures else 0
+
+
+def command_csvw(args) -> int:
+    from src.CSVW.metadata_to_csvw import CSVWMapping, export_csvw_many
+
+    configs, failures = _load_configs(expand_paths(args.files), args.schema)
+    _report_failures(failures)
+    mapping = CSVWMapping(args.schema, accrualPeriodicity=args.accrual_periodicity)
+    written = export_csvw_many((cfg for _, cfg in configs), args.output, mapping)
+    print(f"{len(written)} CSVW file(s) written to {args.output}")
+    return 1 if failures else 0
+
+
+def command_serve(args) -> int:
+    from src.server import serve
+
+    serve(args.schema, args.host, args.port, args.socket, args.workers, args.max_queue, args.instrument, args.log_requests,
+          args.export_root, args.allow_paths)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.main", description="Validate, export and preview dataset metadata.")
+    parser.add_argument("--schema", default=SCHEMA_PATH, help=f"JSON schema of the metadata (default: {SCHEMA_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate = commands.add_parser("validate", help="validate metadata files against the schema")
+    validate.add_argument("files", nargs="+", help="JSON/YAML metadata files or glob patterns")
+    validate.add_argument("--workers", type=int, default=1, help="number of processes (default: 1)")
+    validate.add_argument("--mode", choices=["full", "fail_fast"], default="full", help="stop at the first error with fail_fast")
+    validate.add_argument("--max-errors", type=int, help="stop after this many errors per file")
+    validate.add_argument("--format", choices=["text", "json"], default="text", help="output format (default: text)")
+    validate.set_defaults(run=command_validate)
+
+    export = commands.add_parser("export", help="export metadata files as API-ready JSON")
+    export.add_argument("files", nargs="+", help="JSON/YAML metadata files or glob patterns")
+    export.add_argument("--output", default="results", help="output folder (default: results)")
+    export.add_argument("--title-path", default="Dataset.id", help="field naming each exported file (default: Dataset.id)")
+    export.add_argument("--workers", type=int, help="number of writer threads")
+    export.add_argument("--bundle", choices=["tar", "zip", "ndjson"], help="write a single bundle instead of one file per document")
+    export.add_argument("--force", action="store_true", help="rewrite files even if their content didn't change")
+    export.set_defaults(run=command_export)
+
+    preview = commands.add_parser("preview", help="print metadata files")
+    preview.add_argument("files", nargs="+", help="JSON/YAML metadata files or glob patterns")
+    preview.add_argument("--format", choices=["json", "yaml"], default="json", help="output format (default: json)")
+    preview.set_defaults(run=command_preview)
+
+    csvw = commands.add_parser("csvw", help="generate the CSVW metadata of metadata files")
+    csvw.add_argument("files", nargs="+", help="JSON/YAML metadata files or glob patterns")
+    csvw.add_argument("--output", default="results", help="output folder (default: results)")
+    csvw.add_argument("--accrual-periodicity", default="", help="update frequency of the datasets (e.g. Monthly)")
+    csvw.set_defaults(run=command_csvw)
+
+    serve = commands.add_parser("serve", help="run a validation server keeping the schema loaded")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    serve.add_argument("--socket", help="listen on this unix socket instead of host:port")
+    serve.add_argument("--workers", type=int, help="number of worker processes (default: number of CPUs)")
+    serve.add_argument("--max-queue", type=int, default=64, help="queued requests above which new ones get a 503 (default: 64)")
+    serve.add_argument("--export-root", default="results", help="folder exports are written under (default: results)")
+    serve.add_argument("--allow-paths", action="store_true", help="accept paths of files on this machine in place of documents")
+    serve.add_argument("--instrument", action="store_true", help="also report phase timings in /metrics")
+    serve.add_argument("--log-requests", action="store_true", help="log every request to stderr")
+    serve.set_defaults(run=command_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    except ValueError as e:
+        #e.g. two records exported to the same CSVW file
+        print(f"{parser.prog}: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import json
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+from src.config_objects import MetadataConfig, COMBINED_DEFAULT
+from src.schema_cache import SCHEMA_REGISTRY
+from src.serializers import dumps_json, load_all_yaml, loads_json, yaml_error
+from src.schema_validators import CompiledSchema
+
+
+JSON_LINES_FORMATS = ["jsonl", "ndjson"]
+YAML_FORMATS = ["yaml", "yml"]
+#what iter_metadata_records does with a record which can't be parsed or imported
+ERROR_MODES = ["raise", "skip", "collect"]
+
+
+class RecordError:
+    """
+    A record of a stream which couldn't be parsed or imported, yielded by `iter_metadata_records(on_error="collect")`
+    in place of its config.
+
+    Attributes
+    ----------
+    record : int
+        Position of the record in the stream, from 1 (blank lines and empty YAML documents are not counted).
+    error : Exception
+        The error raised for the record (ValueError, KeyError or TypeError).
+    """
+    __slots__ = ("record", "error")
+
+    def __init__(self, record: int, error: Exception):
+        self.record = record
+        self.error = error
+
+    def __repr__(self):
+        return f"RecordError(record={self.record}, error={self.error!r})"
+
+
+def _iter_raw_records(file_path: Path, format: str) -> Iterator[Union[dict, ValueError]]:
+    """
+    Yield the raw metadata dictionaries of a JSON Lines file or a multi-document YAML stream, one at a time.
+    A JSON line which can't be parsed is yielded as a ValueError, as the next lines can still be read; a YAML
+    stream can't be read past a syntax error, so it's raised.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        if format in JSON_LINES_FORMATS:
+            for line_number, line in enumerate(file, start=1):
+                #blank lines (e.g. a trailing newline) are not records
+                if not line.strip():
+                    continue
+                try:
+                    record = loads_json(line)
+                except json.JSONDecodeError as e:
+                    record = ValueError(f'Error parsing JSON Lines file at line {line_number}: {e}')
+                yield record
+        else:
+            try:
+                #safe_load_all parses the stream lazily, one document at a time
+                for document in load_all_yaml(file):
+                    #empty documents (e.g. a trailing "---") are not records
+                    if document is not None:
+                        yield document
+            except yaml_error() as e:
+                raise ValueError(f'Error parsing YAML file: {e}')
+
+
+def iter_metadata_records(file_path: str, schema: Union[str, dict, CompiledSchema] = r"data/Schema/CombinedSchema.json",
+                          validate: bool = True, on_error: str = "raise") -> Iterator[Union[MetadataConfig, RecordError]]:
+    """
+    Read metadata records one by one from a JSON Lines (.jsonl/.ndjson) file or a multi-document YAML stream.
+
+    Only one record is held in memory at a time, so memory use does not depend on the size of the catalogue.
+    The schema is compiled once (schema files are cached by `SCHEMA_REGISTRY`) and shared by every yielded `MetadataConfig`.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the .jsonl, .ndjson, .yaml or .yml file.
+    schema : str, dict or CompiledSchema, optional
+        Schema used to import and validate the records (default: the combined schema).
+    validate : bool, optional
+        If True (default), `validate()` is run on every record so its `errors` are available.
+    on_error : str, optional
+        What to do with a record which can't be parsed (a JSON line) or imported:
+            - "raise" (default): raise its error, which ends the stream.
+            - "skip": leave it out and go on with the next record.
+            - "collect": yield a `RecordError` in its place and go on with the next record.
+
+    Yields
+    ------
+    MetadataConfig or RecordError
+        One config per record, in file order (RecordError for the records which failed, with "collect").
+
+    Raises
+    ------
+    FileNotFoundError
+        If the specified file does not exist.
+    ValueError
+        If the file format or `on_error` is unsupported, the YAML stream can't be parsed, or (with "raise") a
+        record can't be parsed or imported.
+    KeyError
+        With "raise", if a record has a key which is not part of the metadata.
+    TypeError
+        With "raise", if a record is not an object.
+    """
+    format = str(file_path).split(".")[-1].lower()
+    verified_file_path = Path(file_path)
+    if format not in JSON_LINES_FORMATS + YAML_FORMATS:
+        raise ValueError(f'Unsupported file format: {format}. Only "jsonl", "ndjson" and "yaml" are supported.')
+    if on_error not in ERROR_MODES:
+        raise ValueError(f"Unknown on_error: {on_error}. Supported values are: {ERROR_MODES}")
+    if not verified_file_path.exists():
+        raise FileNotFoundError(f"Metadata file not found: {verified_file_path}")
+
+    if isinstance(schema, str):
+        schema = SCHEMA_REGISTRY.get(schema)
+    if not isinstance(schema, CompiledSchema):
+        schema = CompiledSchema(schema)
+
+    for record_number, raw_record in enumerate(_iter_raw_records(verified_file_path, format), start=1):
+        cfg = MetadataConfig(schema, COMBINED_DEFAULT)
+        try:
+            if isinstance(raw_record, ValueError):
+                raise raw_record
+            if not isinstance(raw_record, dict):
+                raise TypeError(f"The record should be an object, got {type(raw_record).__name__}.")
+            cfg.import_from_dict(raw_record)
+        except (ValueError, KeyError, TypeError) as e:
+            #the same base type, with the position of the record in the message (the original error is its cause)
+            error_type = next(base for base in (ValueError, KeyError, TypeError) if isinstance(e, base))
+            error = error_type(f"Record {record_number} in {verified_file_path}: {e}")
+            error.__cause__ = e
+            if on_error == "raise":
+                raise error
+            if on_error == "collect":
+                yield RecordError(record_number, error)
+            continue
+        if validate:
+            cfg.validate()
+        yield cfg
+
+
+class MetadataStreamWriter:
+    """
+    Writes metadata records to a JSON Lines file one record per line, without keeping them in memory.
+
+    Examples
+    --------
+    >>> with MetadataStreamWriter("results/catalogue.jsonl") as writer:
+    ...     for cfg in iter_metadata_records("catalogue.jsonl"):
+    ...         writer.write(cfg)
+    """
+    def __init__(self, file_path: str, append: bool = False):
+        """
+        Parameters
+        ----------
+        file_path : str
+            Path of the JSON Lines file to write.
+        append : bool, optional
+            If True, records are added to the end of an existing file instead of overwriting it.
+        """
+        self.file_path = file_path
+        self.records_written = 0
+        self._file = open(file_path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record: Union[MetadataConfig, dict]):
+        """
+        Write a single record.
+
+        Parameters
+        ----------
+        record : MetadataConfig or dict
+            The config (its metadata is written) or a metadata dictionary.
+        """
+        metadata = record.to_dict() if isinstance(record, MetadataConfig) else record
+        self._file.write(dumps_json(metadata))
+        self._file.write("\n")
+        self.records_written += 1
+
+    def write_many(self, records: Iterable[Union[MetadataConfig, dict]]) -> int:
+        """Write every record of an iterable (consumed lazily), returning the number of records written."""
+        for record in records:
+            self.write(record)
+        return self.records_written
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,130 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Union
+
+from src.schema_loader import load_schema_file
+from src.schema_validators import CompiledSchema
+
+
+def _file_version(file_path: str) -> tuple:
+    """Modification time and size of a file."""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class SchemaRegistry:
+    """
+    Process-wide cache of parsed and compiled JSON schemas, keyed by resolved file path.
+
+    Each entry remembers the modification time and size of the files it was loaded from: the schema file and the
+    files it references (see `schema_loader`). A lookup only calls `os.stat` on them: if one changed since the schema
+    was cached, the schema is loaded and compiled again.
+    The least recently used schemas are dropped once more than `maxsize` are cached.
+
+    Attributes
+    ----------
+    maxsize : int
+        Maximum number of schemas kept in the cache.
+    hits : int
+        Number of lookups answered from the cache.
+    misses : int
+        Number of lookups which had to load the schema from disk (including reloads of changed files).
+    invalidations : int
+        Number of cached schemas reloaded because their file changed.
+
+    Examples
+    --------
+    >>> compiled = SCHEMA_REGISTRY.get(r"data/Schema/CombinedSchema.json")
+    >>> SCHEMA_REGISTRY.stats()
+    """
+    def __init__(self, maxsize: int = 32):
+        if maxsize < 1:
+            raise ValueError("maxsize should be at least 1.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: Union[str, Path]) -> CompiledSchema:
+        """
+        Return the compiled schema of a JSON schema file, loading it only if it isn't cached or has changed.
+
+        Parameters
+        ----------
+        file_path : str or pathlib.Path
+            Path to the JSON schema file.
+
+        Returns
+        -------
+        CompiledSchema
+            The compiled schema (shared, so it should not be modified).
+
+        Raises
+        ------
+        FileNotFoundError
+            If the specified file, or a file it references, does not exist.
+        json.JSONDecodeError
+            If a file is not valid JSON.
+        KeyError, ValueError
+            If a reference can't be resolved (see `load_schema_file`).
+        TypeError
+            If the file doesn't parse to a dict.
+        """
+        resolved_path = str(Path(file_path).resolve())
+        version = _file_version(resolved_path)
+        with self._lock:
+            entry = self._entries.get(resolved_path)
+            if entry is not None:
+                #the schema file, then the files it references
+                if entry[0][0][1] == version and all(_file_version(path) == known for path, known in entry[0][1:]):
+                    self.hits += 1
+                    self._entries.move_to_end(resolved_path)
+                    return entry[1]
+                self.invalidations += 1
+            self.misses += 1
+
+        #load outside the lock, a concurrent load of the same file just does the work twice
+        schema, sources = load_schema_file(resolved_path)
+        compiled = CompiledSchema(schema)
+        versions = ((resolved_path, version),) + tuple((path, _file_version(path)) for path in sources[1:])
+
+        with self._lock:
+            self._entries[resolved_path] = (versions, compiled)
+            self._entries.move_to_end(resolved_path)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        """Drop every cached schema and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+
+        Returns
+        -------
+        dict
+            Number of hits, misses and invalidations, and the current and maximum number of cached schemas.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+#Shared by every MetadataConfig created from a schema file path
+SCHEMA_REGISTRY = SchemaRegistry()
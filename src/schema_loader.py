@@ -0,0 +1,155 @@
+"""
+Load JSON schemas composed of several files. References are resolved once, when the schema is loaded, into a
+single self-contained schema that `CompiledSchema` then indexes (path -> validator, enums as frozensets).
+
+A reference is an object {"$ref": "<file>#<JSON pointer>"}, replaced by the value it points to:
+    - "#/definitions/Contact": a node of the same file;
+    - "EditionMetadata_Schema.json": a whole file, relative to the folder of the file referencing it;
+    - "Enums.json#/QualityDesignation": a node of another file, e.g. a shared enum:
+      "quality_designation": {"type": "string", "enum": {"$ref": "Enums.json#/QualityDesignation"}}
+Keys next to "$ref" are kept and override those of the referenced object. The "definitions" and "$defs" of a
+file are dropped from the loaded schema once its references are resolved.
+
+Each file is read once per load, and every reference gets its own copy of the node it points to (compiled schemas
+map nodes to validators by identity). `SCHEMA_REGISTRY` loads schema files with `load_schema_file` and reloads
+them when any of the files they're composed of changes.
+"""
+from pathlib import Path
+from typing import Tuple, Union
+
+from src.serializers import read_json
+
+
+#keys of reusable schemas, dropped from the loaded schema
+DEFINITIONS_KEYS = ("definitions", "$defs")
+
+
+def _follow_pointer(document, pointer: str, ref: str):
+    """Follow a JSON pointer (RFC 6901) through a document."""
+    node = document
+    for token in pointer.split("/")[1:] if pointer else []:
+        token = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(node, dict) and token in node:
+            node = node[token]
+        elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+            node = node[int(token)]
+        else:
+            raise KeyError(f"Can't resolve the reference '{ref}': '{token}' is not in the document.")
+    return node
+
+
+class _Resolver:
+    """Resolves the references of the files of one load, reading each file once."""
+    def __init__(self):
+        #resolved file path -> parsed document, in the order the files were read
+        self.documents = {}
+
+    def document(self, file_path: str):
+        if file_path not in self.documents:
+            self.documents[file_path] = read_json(file_path)
+        return self.documents[file_path]
+
+    def resolve(self, node, file_path: str, stack: tuple):
+        """
+        Return a copy of a node with its references resolved.
+
+        Parameters
+        ----------
+        node
+            A node of the document read from file_path.
+        file_path : str
+            Resolved path of the file the node comes from, which relative references start from.
+        stack : tuple
+            (file path, pointer) of the references being resolved, to detect circular references.
+        """
+        if isinstance(node, list):
+            return [self.resolve(item, file_path, stack) for item in node]
+        if not isinstance(node, dict):
+            return node
+        if "$ref" not in node:
+            return {key: self.resolve(value, file_path, stack) for key, value in node.items()}
+
+        ref = node["$ref"]
+        if not isinstance(ref, str):
+            raise ValueError(f"References should be strings, got {ref!r} in {file_path}.")
+        target_file, _, pointer = ref.partition("#")
+        target_path = str((Path(file_path).parent / target_file).resolve()) if target_file else file_path
+        key = (target_path, pointer)
+        if key in stack:
+            raise ValueError(f"Circular reference '{ref}' in {file_path}.")
+        target = self.resolve(_follow_pointer(self.document(target_path), pointer, ref), target_path, stack + (key,))
+        if not pointer and isinstance(target, dict):
+            #a whole file: its definitions were only there to be referenced
+            for definitions_key in DEFINITIONS_KEYS:
+                target.pop(definitions_key, None)
+        siblings = {name: value for name, value in node.items() if name != "$ref"}
+        if not siblings:
+            return target
+        if not isinstance(target, dict):
+            raise ValueError(f"The reference '{ref}' in {file_path} points to a {type(target).__name__}, "
+                             f"so it can't have other keys.")
+        target.update(self.resolve(siblings, file_path, stack))
+        return target
+
+
+def load_schema_file(file_path: Union[str, Path]) -> Tuple[dict, list]:
+    """
+    Load a JSON schema file, resolving its references (see the module docstring).
+
+    Parameters
+    ----------
+    file_path : str or pathlib.Path
+        Path to the JSON schema file.
+
+    Returns
+    -------
+    tuple
+        The self-contained schema, and the resolved paths of the files it was read from (file_path first).
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file, or a file it references, does not exist.
+    json.JSONDecodeError
+        If a file is not valid JSON.
+    KeyError
+        If a reference points to a node which doesn't exist.
+    ValueError
+        If references are circular, or a reference with other keys doesn't point to an object.
+    TypeError
+        If the file doesn't parse to a dict.
+    """
+    root = str(Path(file_path).resolve())
+    resolver = _Resolver()
+    schema = resolver.resolve({"$ref": ""}, root, ())
+    if not isinstance(schema, dict):
+        raise TypeError("Schema must be a dict or a JSON file that parses to a dict.")
+    return schema, list(resolver.documents)
+
+
+def resolve_schema(schema: dict, base_path: Union[str, Path] = ".") -> dict:
+    """
+    Resolve the references of a schema dictionary (e.g. built in code, or read by other means than `load_schema_file`).
+
+    Parameters
+    ----------
+    schema : dict
+        The schema. It is not modified.
+    base_path : str or pathlib.Path, optional
+        Folder that references to files are relative to (default: the working directory).
+
+    Returns
+    -------
+    dict
+        A self-contained copy of the schema, without its "definitions" and "$defs".
+
+    Examples
+    --------
+    >>> resolve_schema({"type": "object", "properties": {"format": {"type": "string",
+    ...     "enum": {"$ref": "Enums.json#/DistributionFormat"}}}}, "data/Schema")
+    """
+    #the schema is resolved as if it was a file of that folder
+    document_path = str(Path(base_path).resolve() / "<schema>")
+    resolver = _Resolver()
+    resolver.documents[document_path] = schema
+    return resolver.resolve({"$ref": ""}, document_path, ())
@@ -0,0 +1,631 @@
+import datetime
+import functools
+from pathlib import Path
+from typing import Optional, Union
+
+from src.compact_records import MAPPING_TYPES, build_record_type
+from src.date_validation import date_validator_for
+from src.schema_loader import resolve_schema
+from src.validation_errors import FieldValueError, NestedValidationError, UnknownKeyError, ValidationError
+
+
+#"fail_fast" stops at the first error, "full" collects every error (or the first max_errors)
+VALIDATION_MODES = ["full", "fail_fast"]
+
+#Python types used for the plain "type" checks in initial_validate_and_build
+TYPE_MAP = {
+    "string": str,
+    "integer": int,
+    "float": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict
+}
+
+
+def error_limit(mode: str = "full", max_errors: Optional[int] = None) -> Optional[int]:
+    """
+    Return the number of errors after which validation stops, or None to collect every error.
+
+    Parameters
+    ----------
+    mode : str, optional
+        "full" (default) or "fail_fast" (stop at the first error, same as max_errors=1).
+    max_errors : int, optional
+        Stop once this many errors were found.
+
+    Raises
+    ------
+    ValueError
+        If the mode is unknown or max_errors is lower than 1.
+    """
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f"Unsupported validation mode: {mode}. Supported modes are: {VALIDATION_MODES}")
+    if max_errors is not None and max_errors < 1:
+        raise ValueError("max_errors should be at least 1.")
+    if mode == "fail_fast":
+        return 1
+    return max_errors
+
+
+class ErrorLimitReached(Exception):
+    """Raised by `ErrorIndex.add` to stop the validation walk once the error limit is reached."""
+
+
+class ErrorIndex(dict):
+    """
+    Field path (e.g. "Dataset.qmi.href") -> list of `ValidationError`, filled by `ObjectValidator.collect_errors`.
+
+    Attributes
+    ----------
+    max_errors : int or None
+        Number of errors after which `add` stops the validation, or None for no limit.
+    count : int
+        Number of errors added.
+    """
+    def __init__(self, max_errors: Optional[int] = None):
+        super().__init__()
+        self.max_errors = max_errors
+        self.count = 0
+
+    def add(self, error: ValidationError):
+        """
+        Add an error, under its field path.
+
+        Raises
+        ------
+        ErrorLimitReached
+            If this error reaches max_errors.
+        """
+        self.setdefault(error.path, []).append(error)
+        self.count += 1
+        if self.max_errors is not None and self.count >= self.max_errors:
+            raise ErrorLimitReached()
+
+
+class FieldValidator:
+    """
+    Validator compiled once from a single (leaf) schema node.
+
+    Everything that `MetadataConfig` used to look up in the schema dict on every call
+    (the type, the python type, the enum, the array item schema) is resolved here once,
+    so validating a value is a couple of attribute reads instead of a dict walk.
+
+    Attributes
+    ----------
+    key : str or None
+        Name of the field in its parent object (None for the root schema).
+    schema : dict
+        The raw schema node this validator was compiled from.
+    type_name : str or None
+        Value of the schema "type" field.
+    enum : frozenset or None
+        Allowed values when the schema defines an "enum".
+    enum_values : list or None
+        Allowed values in schema order, kept for error messages.
+    items : FieldValidator or None
+        Validator for array items when the schema defines "items".
+    date_validator : DateValidator or None
+        Validator of the accepted date format(s) for "datetime" fields.
+    check : callable
+        check(value) -> bool: whether a value matches the type and enum of the node (same rules as
+        `MetadataConfig.check_type`). It's a single function specialised for the node, see `_make_check`.
+    """
+    __slots__ = ("key", "schema", "type_name", "py_type", "enum", "enum_values", "items", "date_validator", "_type_check",
+                 "check")
+
+    def __init__(self, key: Optional[str], schema: dict):
+        self.key = key
+        self.schema = schema
+        self.type_name = schema.get("type")
+        self.py_type = TYPE_MAP.get(self.type_name)
+        self.enum_values = schema.get("enum")
+        if self.enum_values is not None and not isinstance(self.enum_values, list):
+            #e.g. an unresolved {"$ref": ...}, whose keys would be taken as the allowed values
+            raise ValueError(f"The enum of '{key}' should be a list, got {self.enum_values!r}.")
+        self.enum = frozenset(self.enum_values) if self.enum_values is not None else None
+        self.items = compile_node(None, schema["items"]) if "items" in schema else None
+        self.date_validator = date_validator_for(schema) if self.type_name == "datetime" else None
+        self._type_check = _TYPE_CHECKS.get(self.type_name, _reject)
+        self.check = _make_check(self)
+
+    def in_enum(self, value) -> bool:
+        """Return True if the value is one of the allowed enum values."""
+        try:
+            return value in self.enum
+        except TypeError:
+            #unhashable values (lists, dicts) can't be enum members
+            return False
+
+    def build(self, value, path: str, max_errors: Optional[int] = None):
+        """
+        Validate (and possibly transform) a value being set on this field
+        (same rules as `MetadataConfig.initial_validate_and_build`).
+
+        Parameters
+        ----------
+        value : object
+            Value to validate.
+        path : str
+            Path used in error messages.
+        max_errors : int, optional
+            For objects, stop checking fields once this many errors were found.
+
+        Returns
+        -------
+        Any
+            Validated value.
+
+        Raises
+        ------
+        ValueError
+            If the value fails enum, datetime or type validation.
+        """
+        key = self.key
+        #ENUM field
+        if self.enum is not None:
+            if not self.in_enum(value):
+                raise FieldValueError(ValidationError(path, "enum", self.enum_values, value))
+            return value
+
+        #DATETIME field
+        if self.type_name == "datetime":
+            if isinstance(value, datetime.datetime):
+                # Convert datetime to string for the the final json file
+                value = self.date_validator.format(value)
+            if not self.date_validator.check(value):
+                raise FieldValueError(ValidationError(path, "date_format", self.date_validator.formats, value))
+            return value
+
+        if self.type_name is not None:
+            if self.py_type is None:
+                #unknown types are a schema problem, not a value problem
+                raise KeyError(self.type_name)
+            if not isinstance(value, self.py_type):
+                raise FieldValueError(ValidationError(path, "type", self.type_name, value))
+        #Default: assign as is
+        return value
+
+    def error_for(self, value, path: str) -> ValidationError:
+        """Return the `validate()` error for a value that failed `check()` (path is the prefix of the field path)."""
+        if self.enum is not None:
+            return ValidationError(f"{path}{self.key}", "enum", self.enum_values, value)
+        if self.items is not None:
+            return ValidationError(f"{path}{self.key}", "item_type", self.items.type_name, value)
+        return ValidationError(f"{path}{self.key}", "type", self.type_name, value)
+
+
+class ObjectValidator(FieldValidator):
+    """
+    Validator compiled from a schema node with nested "properties".
+
+    Attributes
+    ----------
+    properties : dict
+        Field name -> compiled validator of each nested property.
+    required : tuple of str
+        Required keys of the object.
+    """
+    __slots__ = ("properties", "required", "properties_schema")
+
+    def __init__(self, key: Optional[str], schema: dict):
+        super().__init__(key, schema)
+        self.properties_schema = schema["properties"]
+        self.properties = {name: compile_node(name, sub_schema) for name, sub_schema in self.properties_schema.items()}
+        self.required = tuple(schema.get("required", []))
+
+    def child(self, key: str) -> "ObjectValidator":
+        """
+        Return the validator of a nested object, used when walking a dotted path in `set()`.
+
+        Raises
+        ------
+        KeyError
+            If the key is not a property, or the property has no nested properties.
+        """
+        node = self.properties.get(key)
+        if node is None:
+            raise KeyError(f"'{key}' is not a valid field in the schema.")
+        if not isinstance(node, ObjectValidator):
+            raise KeyError(f"'{key}' does not have nested properties in the schema.")
+        return node
+
+    def build_child(self, key: str, value, full_path: Optional[str] = None, max_errors: Optional[int] = None):
+        """
+        Validate a value for one of the properties of this object (max_errors as in `build`).
+
+        Raises
+        ------
+        KeyError
+            If the key is not a property of this object.
+        ValueError
+            If the value fails validation.
+        """
+        node = self.properties.get(key)
+        if node is None:
+            raise KeyError(f"{key} is not a valid key in the schema.")
+        current_path = f"{full_path}.{key}" if full_path else key
+        return node.build(value, current_path, max_errors)
+
+    def build(self, value, path: str, max_errors: Optional[int] = None):
+        if self.enum is not None or self.type_name == "datetime":
+            return super().build(value, path)
+        if not isinstance(value, dict):
+            raise FieldValueError(ValidationError(path, "object", "object", type(value).__name__))
+        validated_results = {}
+        errors = []
+        error_count = 0
+        properties = self.properties
+        for subkey, subval in value.items():
+            if subkey not in properties:
+                errors.append(UnknownKeyError(ValidationError(f"{path}.{subkey}", "unknown_key", None, subkey)))
+                error_count += 1
+            else:
+                try:
+                    remaining = max_errors - error_count if max_errors is not None else None
+                    validated_results[subkey] = properties[subkey].build(subval, f"{path}.{subkey}", remaining)
+                except (ValueError, KeyError) as e:
+                    errors.append(e)
+                    error_count += getattr(e, "count", 1)
+            if max_errors is not None and error_count >= max_errors:
+                break
+        if errors:
+            raise NestedValidationError(errors)
+        return validated_results
+
+    def validate(self, metadata: dict, path: str = "", max_errors: Optional[int] = None) -> list:
+        """
+        Validate a metadata dictionary against this object, collecting all errors
+        (same rules and messages as `MetadataConfig.validate`).
+
+        Parameters
+        ----------
+        metadata : dict
+            Metadata to validate.
+        path : str, optional
+            Prefix for error messages, ending with "." for nested objects.
+        max_errors : int, optional
+            Stop validating once this many errors were found.
+
+        Returns
+        -------
+        list of ValidationError
+            The errors (`str()` or `format()` gives their message).
+        """
+        return flatten_error_index(self.error_index(metadata, path, max_errors))
+
+    def error_index(self, metadata: dict, path: str = "", max_errors: Optional[int] = None) -> ErrorIndex:
+        """
+        Validate a metadata dictionary against this object and return its errors indexed by field path.
+
+        Parameters
+        ----------
+        metadata : dict
+            Metadata to validate.
+        path : str, optional
+            Prefix of the field paths, ending with "." for nested objects.
+        max_errors : int, optional
+            Stop validating once this many errors were found.
+
+        Returns
+        -------
+        ErrorIndex
+            Field path -> list of errors, in the order the fields were validated.
+        """
+        error_index = ErrorIndex(max_errors)
+        try:
+            self.collect_errors(metadata, path, error_index)
+        except ErrorLimitReached:
+            pass
+        return error_index
+
+    def collect_errors(self, metadata: dict, path: str, error_index: dict):
+        """
+        Validate a metadata dictionary against this object, adding the errors to an index keyed by field path.
+
+        Parameters
+        ----------
+        metadata : dict
+            Metadata to validate.
+        path : str
+            Prefix of the field paths, ending with "." for nested objects.
+        error_index : ErrorIndex
+            Field path (e.g. "Dataset.qmi.href") -> list of errors, updated in place.
+
+        Raises
+        ------
+        ErrorLimitReached
+            If the error limit of the index is reached.
+        """
+        for req_key in self.required:
+            if req_key not in metadata:
+                error_index.add(ValidationError(f"{path}{req_key}", "required"))
+
+        for key, node in self.properties.items():
+            if key in metadata:
+                self.collect_property_errors(key, metadata[key], path, error_index)
+
+    def collect_property_errors(self, key: str, value, path: str, error_index: dict):
+        """
+        Validate the value of a single property (and everything below it), adding the errors to an index keyed by field path.
+
+        Parameters
+        ----------
+        key : str
+            Name of the property.
+        value : object
+            Value of the property.
+        path : str
+            Path prefix of this object, ending with "." for nested objects.
+        error_index : ErrorIndex
+            Field path -> list of errors, updated in place.
+
+        Raises
+        ------
+        ErrorLimitReached
+            If the error limit of the index is reached.
+        """
+        node = self.properties[key]
+        if isinstance(node, ObjectValidator):
+            if isinstance(value, MAPPING_TYPES):
+                node.collect_errors(value, f"{path}{key}.", error_index)
+            else:
+                error_index.add(ValidationError(f"{path}{key}", "object", "object", type(value).__name__))
+        elif node.type_name is not None and not node.check(value):
+            error_index.add(node.error_for(value, path))
+
+
+def flatten_error_index(error_index: dict) -> list:
+    """Return the errors of an error index as a flat list, in the order the fields were validated."""
+    return [error for errors in error_index.values() for error in errors]
+
+
+def _check_string(node, value):
+    return isinstance(value, str)
+
+
+def _check_integer(node, value):
+    return isinstance(value, int)
+
+
+def _check_array(node, value):
+    if not isinstance(value, list):
+        return False
+    #Recursively check each item against its schema
+    items = node.items
+    if items is None:
+        #an array without "items" behaves like an empty item schema, which rejects every item
+        return not value
+    return all(items.check(item) for item in value)
+
+
+def _check_path(node, value):
+    return isinstance(value, (str, Path))
+
+
+def _check_datetime(node, value):
+    #only accept strings that match the format
+    return node.date_validator.check(value)
+
+
+def _reject(node, value):
+    #UNKNOWN TYPE: safer to return False than True
+    return False
+
+
+_TYPE_CHECKS = {
+    "string": _check_string,
+    "integer": _check_integer,
+    "array": _check_array,
+    "pathlib.Path": _check_path,
+    "datetime": _check_datetime,
+}
+
+
+def _make_check(node: FieldValidator):
+    """
+    Return the check of a node as one function, so checking the common string and integer fields in `validate`
+    is a single call instead of a dispatch through `_TYPE_CHECKS`.
+    """
+    enum = node.enum
+    if node.type_name in ("string", "integer"):
+        py_type = node.py_type
+        if enum is None:
+            return lambda value: isinstance(value, py_type)
+        #strings and integers are hashable, so membership can't raise
+        return lambda value: isinstance(value, py_type) and value in enum
+    type_check = node._type_check
+    if enum is None:
+        return lambda value: type_check(node, value)
+    return lambda value: type_check(node, value) and node.in_enum(value)
+
+
+def compile_node(key: Optional[str], schema: dict) -> FieldValidator:
+    """
+    Compile a schema node (and everything below it) into a validator tree.
+
+    Parameters
+    ----------
+    key : str or None
+        Name of the field in its parent object.
+    schema : dict
+        Schema definition for the field.
+
+    Returns
+    -------
+    FieldValidator
+        An `ObjectValidator` for nodes with "properties", otherwise a `FieldValidator`.
+    """
+    if "properties" in schema:
+        return ObjectValidator(key, schema)
+    return FieldValidator(key, schema)
+
+
+class ResolvedPath:
+    """
+    A dotted metadata path resolved once against a compiled schema.
+
+    Attributes
+    ----------
+    path : str
+        The dotted path as given (e.g. "Dataset.publisher.name").
+    keys : tuple of str
+        Keys of the path, with surrounding spaces removed.
+    parent : ObjectValidator
+        Validator of the object containing the field.
+    node : FieldValidator
+        Validator of the field itself.
+    """
+    __slots__ = ("path", "keys", "parent", "node")
+
+    def __init__(self, path: str, keys: tuple, parent: ObjectValidator, node: FieldValidator):
+        self.path = path
+        self.keys = keys
+        self.parent = parent
+        self.node = node
+
+    def build(self, value, max_errors: Optional[int] = None):
+        """Validate a value being set on the field (errors report the field name, as `MetadataConfig.set` does)."""
+        return self.node.build(value, self.keys[-1], max_errors)
+
+
+def _has_references(node) -> bool:
+    """Return True if a schema node, or one of its descendants, has a "$ref"."""
+    if isinstance(node, dict):
+        return "$ref" in node or any(_has_references(value) for value in node.values())
+    if isinstance(node, list):
+        return any(_has_references(item) for item in node)
+    return False
+
+
+class CompiledSchema:
+    """
+    A JSON schema compiled once into a tree of validators.
+
+    Besides the root validator, it keeps an index from the identity of every schema dict in the
+    tree to its validator, so methods of `MetadataConfig` which receive raw schema dicts
+    (`initial_validate_and_build`, `validate`) can dispatch to the compiled validator without
+    walking the schema again. The schema should not be modified after compiling.
+
+    A schema with references (e.g. a dictionary read from a schema file) is resolved before it is compiled, see
+    `schema_loader.resolve_schema`.
+
+    Attributes
+    ----------
+    schema : dict
+        The raw schema, with its references resolved.
+    root : FieldValidator
+        Validator of the whole schema.
+    resolve : callable
+        `_resolve` wrapped in an LRU cache of the most recently resolved paths.
+    """
+    #number of resolved dotted paths kept per schema
+    PATH_CACHE_SIZE = 1024
+    #number of default metadata records kept per schema
+    DEFAULT_RECORDS_SIZE = 32
+
+    def __init__(self, schema: dict, base_path: Union[str, Path] = "."):
+        """
+        Parameters
+        ----------
+        schema : dict
+            The schema.
+        base_path : str or pathlib.Path, optional
+            Folder that its references to files are relative to (default: the working directory).
+
+        Raises
+        ------
+        FileNotFoundError, KeyError, ValueError
+            If a reference can't be resolved (see `schema_loader.resolve_schema`), or an enum is not a list.
+        """
+        self.schema = resolve_schema(schema, base_path) if _has_references(schema) else schema
+        self.root = compile_node(None, self.schema)
+        self._nodes = {}
+        self._owners = {}
+        self._register(self.root)
+        #invalid paths raise, and lru_cache doesn't cache exceptions, so they are reported every time
+        self.resolve = functools.lru_cache(maxsize=self.PATH_CACHE_SIZE)(self._resolve)
+        self._record_type = None
+        self._default_records = {}
+
+    def record_type(self) -> type:
+        """
+        Return the compact record class generated from the schema (see `compact_records`), building it on first use.
+
+        Raises
+        ------
+        TypeError
+            If the schema has no "properties".
+        """
+        if self._record_type is None:
+            if not isinstance(self.root, ObjectValidator):
+                raise TypeError("Only schemas with 'properties' can be stored as compact records.")
+            self._record_type = build_record_type(self.root)
+        return self._record_type
+
+    def default_record(self, default_metadata: dict):
+        """
+        Return the default metadata converted to a compact record.
+
+        The record is built once per default metadata object (the last DEFAULT_RECORDS_SIZE ones are kept) and
+        shared, so it must not be modified (MetadataConfig copies it on write). The default metadata must not be
+        modified in place afterwards either, as the record would not follow the change.
+        """
+        #keyed by identity, with a reference to the defaults kept so their id can't be reused by another object
+        key = id(default_metadata)
+        entry = self._default_records.pop(key, None)
+        if entry is None:
+            entry = (default_metadata, self.record_type().from_dict(default_metadata))
+            if len(self._default_records) >= self.DEFAULT_RECORDS_SIZE:
+                del self._default_records[next(iter(self._default_records))]
+        #most recently used last
+        self._default_records[key] = entry
+        return entry[1]
+
+    def _resolve(self, path: str) -> ResolvedPath:
+        """
+        Resolve a dotted path to the validators of the field and of the object containing it.
+
+        Parameters
+        ----------
+        path : str
+            Dotted path of a field (e.g. "Dataset.publisher.name").
+
+        Returns
+        -------
+        ResolvedPath
+            The resolved path.
+
+        Raises
+        ------
+        KeyError
+            If a key of the path is not valid according to the schema.
+        """
+        #If users accidentally include spaces in the path (e.g., "contacts. email"), it could cause hard-to-debug issues.
+        keys = tuple(key.strip() for key in path.split("."))
+        parent = self.root
+        if not isinstance(parent, ObjectValidator):
+            raise KeyError(f"'{keys[0]}' is not a valid field in the schema.")
+        for key in keys[:-1]:
+            parent = parent.child(key)
+        node = parent.properties.get(keys[-1])
+        if node is None:
+            raise KeyError(f"{keys[-1]} is not a valid key in the schema.")
+        return ResolvedPath(path, keys, parent, node)
+
+    def _register(self, node: FieldValidator):
+        self._nodes[id(node.schema)] = node
+        if node.items is not None:
+            self._register(node.items)
+        if isinstance(node, ObjectValidator):
+            self._owners[id(node.properties_schema)] = node
+            for child in node.properties.values():
+                self._register(child)
+
+    def node_for(self, schema: dict) -> Optional[FieldValidator]:
+        """Return the compiled validator of a schema node, or None if it's not part of this schema."""
+        return self._nodes.get(id(schema))
+
+    def owner_of(self, properties: dict) -> Optional[ObjectValidator]:
+        """Return the compiled object validator owning a "properties" dict, or None if it's not part of this schema."""
+        return self._owners.get(id(properties))
@@ -0,0 +1,187 @@
+"""
+JSON and YAML reading/writing used by every load and export path of the package.
+
+The fastest available backend is picked:
+    - JSON: orjson when it's installed, otherwise the standard library json module.
+    - YAML: the libyaml based CSafeLoader/CSafeDumper when PyYAML was built with it, otherwise SafeLoader/SafeDumper.
+      PyYAML is only imported when YAML is first read or written, as it's slow to import and most runs only use JSON.
+
+Both JSON backends write the same text with `dumps_json`: no spaces after separators (or 2-space indentation) and
+non-ASCII characters as they are (UTF-8). It's the fast form used internally (caches, manifests, streams, logs and
+server responses). Files and output read by users (`export_to_json`, `preview()`, CSVW `toJSON`, `export_many`) are
+written by `dumps_json_default` and `dumps_yaml_default` instead, in the format of `json.dumps`/`yaml.dump` with their
+default options, so they keep the same bytes as before the serializer layer. `set_json_backend("json")` forces the
+standard library.
+"""
+import functools
+import json
+from typing import Iterator, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+JSON_BACKENDS = ["orjson", "json"] if orjson is not None else ["json"]
+JSON_BACKEND = JSON_BACKENDS[0]
+
+
+def set_json_backend(backend: str):
+    """
+    Select the JSON backend used by `loads_json`, `read_json` and `dumps_json`.
+
+    Parameters
+    ----------
+    backend : str
+        "orjson" or "json".
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown or not installed.
+    """
+    global JSON_BACKEND
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unavailable JSON backend: {backend}. Available backends are: {JSON_BACKENDS}")
+    JSON_BACKEND = backend
+
+
+def loads_json(data):
+    """
+    Parse a JSON document.
+
+    Parameters
+    ----------
+    data : str or bytes
+        The JSON text.
+
+    Raises
+    ------
+    json.JSONDecodeError
+        If the text is not valid JSON (orjson's error is a subclass of it).
+    """
+    if JSON_BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_json(file_path: str):
+    """
+    Load and parse a JSON file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the specified file does not exist.
+    json.JSONDecodeError
+        If the file is not valid JSON.
+    """
+    if JSON_BACKEND == "orjson":
+        #orjson parses bytes directly, which skips decoding the file to str
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dumps_json(obj, indent: Optional[int] = None) -> str:
+    """
+    Serialise an object to a JSON string, without spaces after separators and with non-ASCII characters unescaped,
+    whatever the backend.
+
+    Parameters
+    ----------
+    obj : object
+        Plain JSON-compatible data (dicts, lists, strings, numbers, booleans, None).
+    indent : int, optional
+        Pretty-print with this indentation. orjson only supports 2, other values use the standard library.
+
+    Returns
+    -------
+    str
+        The JSON text, to be written as UTF-8.
+    """
+    if JSON_BACKEND == "orjson" and indent in (None, 2):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+        except TypeError:
+            #orjson is stricter (e.g. non-string keys), let the standard library handle those
+            pass
+    #the separators orjson uses: "," and ":" on one line, ": " when indented (items end with a newline)
+    return json.dumps(obj, indent=indent, separators=(",", ": " if indent else ":"), ensure_ascii=False)
+
+
+def dumps_json_default(obj, **kwargs) -> str:
+    """
+    Serialise an object like `json.dumps` with its default options: ", " and ": " separators and non-ASCII characters
+    escaped (so the text is ASCII). Used for the files and output read by users, which keep this format.
+
+    Parameters
+    ----------
+    obj : object
+        Plain JSON-compatible data.
+    **kwargs
+        Passed to `json.dumps` (e.g. indent, separators).
+    """
+    return json.dumps(obj, **kwargs)
+
+
+def canonical_json(obj) -> bytes:
+    """
+    Serialise an object to canonical JSON bytes (sorted keys, no whitespace), so equal data gives equal bytes
+    whatever the key order or formatting of the file it came from. Used to hash documents.
+    """
+    if JSON_BACKEND == "orjson":
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+@functools.lru_cache(maxsize=None)
+def yaml_backend() -> tuple:
+    """Return (yaml module, loader, dumper), importing PyYAML on first use."""
+    import yaml
+    return yaml, getattr(yaml, "CSafeLoader", yaml.SafeLoader), getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def yaml_error() -> type:
+    """Return yaml.YAMLError, e.g. for an except clause (only evaluated when an exception is raised)."""
+    return yaml_backend()[0].YAMLError
+
+
+def __getattr__(name: str):
+    #YAML_LOADER and YAML_DUMPER are resolved on first access, so importing this module doesn't import PyYAML
+    if name == "YAML_LOADER":
+        return yaml_backend()[1]
+    if name == "YAML_DUMPER":
+        return yaml_backend()[2]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def load_yaml(stream):
+    """Parse a single YAML document from a string or file with the safe (C if available) loader."""
+    yaml, loader, _ = yaml_backend()
+    return yaml.load(stream, Loader=loader)
+
+
+def load_all_yaml(stream) -> Iterator:
+    """Lazily parse every document of a multi-document YAML stream with the safe (C if available) loader."""
+    yaml, loader, _ = yaml_backend()
+    return yaml.load_all(stream, Loader=loader)
+
+
+def dumps_yaml_default(obj, **kwargs) -> str:
+    """
+    Serialise an object like `yaml.dump` with the default (full, pure Python) dumper, which also writes non-plain
+    types such as tuples. Used for the output read by users, which keeps this format. Keyword arguments go to `yaml.dump`.
+    """
+    return yaml_backend()[0].dump(obj, **kwargs)
+
+
+def dumps_yaml(obj, **kwargs) -> str:
+    """Serialise plain data to a YAML string with the safe (C if available) dumper. Keyword arguments go to `yaml.dump`."""
+    yaml, _, dumper = yaml_backend()
+    return yaml.dump(obj, Dumper=dumper, **kwargs)
@@ -0,0 +1,547 @@
+"""
+Long-running validation service: the schema is loaded and compiled once, then metadata documents are validated and
+exported on request over HTTP (on localhost or a unix socket), without starting Python and loading the schema each time.
+
+Endpoints (request and response bodies are JSON):
+    POST /validate   A document, or a list of documents -> its report, or a list of reports (see `validate_many`).
+                     Query: mode=fail_fast, max_errors=N, structured=1.
+    POST /export     Same body -> {"written", "skipped", "reports"}: valid documents are written like `export_many`,
+                     invalid ones are only reported. Query: output=<folder under the export root>, title_path=<field>,
+                     force=1, and as above.
+    GET  /health     Status, uptime, schema, workers and queue of the server.
+    GET  /metrics    Request, document and error counters in the Prometheus text format (?format=json for JSON).
+
+Documents are validated by a pool of workers: worker processes which compile the schema once when they start, or with
+1 worker the shared CPU thread pool (see `src.executors`). Requests are read concurrently and queue for the workers;
+once `max_queue` requests are waiting, new ones are answered 503 so clients back off instead of piling up.
+
+Clients only write under the export root chosen when the server starts: an output folder outside it is refused.
+File paths are only accepted in place of documents when the server is started with `allow_paths`, as they let
+clients read any metadata file the server can.
+
+Run from the repository root:
+    python -m src.main serve --port 8765 --workers 4
+    curl -s --data-binary @"data/Metadata Samples/cpi_metadata.json" http://127.0.0.1:8765/validate
+    python -m src.main serve --socket /tmp/metadata.sock --allow-paths
+    curl -s --unix-socket /tmp/metadata.sock -d '["data/Metadata Samples/cpi_metadata.json"]' http://localhost/validate
+"""
+import functools
+import os
+import signal
+import socketserver
+import stat
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterable, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+from src import batch_validation, instrumentation
+from src.batch_validation import _import_document, _init_worker, _validate_document
+from src.bulk_export import export_many
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.executors import cpu_executor
+from src.instrumentation import render_prometheus, summary_metrics
+from src.schema_cache import SCHEMA_REGISTRY
+from src.schema_validators import CompiledSchema, error_limit
+from src.serializers import dumps_json, loads_json
+
+
+SCHEMA_PATH = r"data/Schema/CombinedSchema.json"
+MAX_QUEUE = 64
+#largest request body accepted, in bytes
+MAX_BODY = 64 * 1024 * 1024
+
+
+class ServerBusy(RuntimeError):
+    """Raised when a request arrives while `max_queue` requests are already waiting for the workers."""
+
+
+def _export_document(item, schema: Optional[CompiledSchema] = None):
+    """
+    Load (if needed), import and validate a document to export, in the current process (see `_validate_document`).
+
+    Parameters
+    ----------
+    item : tuple
+        (source, document, max_errors, title_path).
+
+    Returns
+    -------
+    tuple
+        The report of the document (with `ValidationError` objects) and, if it's valid, its (title, metadata) to export.
+    """
+    source, document, max_errors, title_path = item
+    cfg = MetadataConfig(schema or batch_validation._WORKER_SCHEMA, COMBINED_DEFAULT)
+    report = _import_document(cfg, source, document, max_errors, True)
+    if report is not None:
+        return report, None
+    errors = cfg.validate(max_errors=max_errors, structured=True)
+    report = {"source": source, "valid": not errors, "load_error": None, "errors": errors}
+    return report, None if errors else (cfg.get(title_path), cfg.to_dict())
+
+
+class ValidationServer:
+    """
+    Validates and exports metadata documents against a schema compiled once, with a pool of workers (see the module
+    docstring). `make_http_server` serves it over HTTP, but `validate()` and `export()` can be called directly too.
+
+    Attributes
+    ----------
+    compiled : CompiledSchema
+        The schema documents are validated against.
+    workers : int
+        Number of worker processes (1: the shared CPU thread pool).
+    max_queue : int
+        Maximum number of requests waiting for or using the workers.
+    recorder : Recorder or None
+        With `instrument`, the recorder timing the phases run in the server process (see `src.instrumentation`).
+    export_root : pathlib.Path
+        Folder every export is written under.
+    allow_paths : bool
+        Whether file paths are accepted in place of documents.
+    """
+    def __init__(self, schema: Union[str, dict] = SCHEMA_PATH, workers: Optional[int] = None, max_queue: int = MAX_QUEUE,
+                 instrument: bool = False, export_root: Union[str, Path] = "results", allow_paths: bool = False):
+        """
+        Parameters
+        ----------
+        schema : str or dict, optional
+            File path to a JSON schema, or a dictionary representing the schema (default: the combined schema).
+        workers : int, optional
+            Number of worker processes (default: the number of CPUs). With 1 worker the documents are validated
+            in the shared CPU thread pool instead, which avoids starting processes.
+        max_queue : int, optional
+            Maximum number of requests waiting for or using the workers (default: MAX_QUEUE).
+        instrument : bool, optional
+            Turn instrumentation on for the process, so /metrics also reports the phases run in the server process
+            (all of them with 1 worker, otherwise the export writes).
+        export_root : str or pathlib.Path, optional
+            Folder every export is written under (default: "results"). Export folders are relative to it.
+        allow_paths : bool, optional
+            Accept paths of metadata files readable by the server in place of documents (default: False).
+
+        Raises
+        ------
+        ValueError
+            If workers or max_queue is lower than 1.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers should be at least 1.")
+        if max_queue < 1:
+            raise ValueError("max_queue should be at least 1.")
+        self.schema_source = str(schema) if isinstance(schema, (str, Path)) else "<dict>"
+        self.compiled = SCHEMA_REGISTRY.get(schema) if isinstance(schema, (str, Path)) else CompiledSchema(schema)
+        self.workers = workers
+        self.max_queue = max_queue
+        if workers == 1:
+            self._pool = None
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.compiled.schema,))
+            #the first task starts every worker: now, before the HTTP server has threads, rather than on the first request
+            self._pool.submit(int).result()
+        self.recorder = instrumentation.enable() if instrument else None
+        self.export_root = Path(export_root).resolve()
+        self.allow_paths = allow_paths
+
+        self._lock = threading.Lock()
+        #export_many rewrites the manifest of the output folder, so exports are written one at a time
+        self._export_lock = threading.Lock()
+        self._pending = 0
+        self._started = time.time()
+        #(endpoint, status) -> requests, endpoint -> seconds, (endpoint, valid) -> documents, (path, code) -> errors
+        self._requests = Counter()
+        self._seconds = Counter()
+        self._documents = Counter()
+        self._errors = Counter()
+
+    def _map(self, func, items: list) -> list:
+        """Run func on every item in the workers, in order, unless max_queue requests are already queued."""
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise ServerBusy(f"{self._pending} requests are already queued, try again later.")
+            self._pending += 1
+        try:
+            if self._pool is None:
+                return list(cpu_executor().map(functools.partial(func, schema=self.compiled), items))
+            #small batches are spread over every worker, large ones sent in chunks like validate_many
+            chunksize = max(1, min(16, len(items) // self.workers))
+            return list(self._pool.map(func, items, chunksize=chunksize))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _check_documents(self, documents: Iterable) -> list:
+        """Return the documents as a list, rejecting file paths unless allow_paths."""
+        documents = list(documents)
+        if not self.allow_paths and any(not isinstance(document, dict) for document in documents):
+            raise ValueError("Documents should be JSON objects: this server doesn't read file paths.")
+        return documents
+
+    def export_path(self, file_path: Union[str, Path]) -> Path:
+        """
+        Return the folder an export to `file_path` is written to, relative to the export root.
+
+        Raises
+        ------
+        ValueError
+            If the folder is not under the export root (e.g. an absolute path, "..", or a link leading out of it).
+        """
+        path = (self.export_root / file_path).resolve()
+        if path != self.export_root and self.export_root not in path.parents:
+            raise ValueError(f"The output folder '{file_path}' is not under the export root of the server.")
+        return path
+
+    def _count(self, endpoint: str, reports: list, structured: bool):
+        """Count the documents and errors of the reports, formatting their errors unless structured."""
+        with self._lock:
+            for report in reports:
+                self._documents[endpoint, report["valid"]] += 1
+                self._errors.update((error.path, error.code) for error in report["errors"])
+        if not structured:
+            for report in reports:
+                report["errors"] = [error.format() for error in report["errors"]]
+
+    def validate(self, documents: Iterable[Union[str, Path, dict]], mode: str = "full", max_errors: Optional[int] = None,
+                 structured: bool = False) -> list:
+        """
+        Validate documents in the workers.
+
+        Parameters
+        ----------
+        documents : iterable of str, pathlib.Path or dict
+            Metadata dictionaries, or with allow_paths paths to JSON/YAML metadata files readable by the server.
+        mode, max_errors, structured
+            As in `validate_many`.
+
+        Returns
+        -------
+        list of dict
+            One report per document, in input order, as returned by `validate_many`.
+
+        Raises
+        ------
+        ServerBusy
+            If max_queue requests are already queued.
+        ValueError
+            If the mode is unknown, or a document is a file path without allow_paths.
+        """
+        limit = error_limit(mode, max_errors)
+        documents = self._check_documents(documents)
+        items = [(str(doc) if not isinstance(doc, dict) else position, doc, limit, True) for position, doc in enumerate(documents)]
+        reports = self._map(_validate_document, items)
+        self._count("validate", reports, structured)
+        return reports
+
+    def export(self, documents: Iterable[Union[str, Path, dict]], file_path: str = ".", title_path: str = "Dataset.id",
+               mode: str = "full", max_errors: Optional[int] = None, structured: bool = False, force: bool = False) -> dict:
+        """
+        Validate documents in the workers and export the valid ones with `export_many`.
+
+        Parameters
+        ----------
+        documents : iterable of str, pathlib.Path or dict
+            Metadata dictionaries, or with allow_paths paths to JSON/YAML metadata files readable by the server.
+        file_path : str, optional
+            The folder the files are written to, relative to the export root (default: the export root itself).
+        title_path : str, optional
+            Metadata field naming each exported file (default: "Dataset.id").
+        mode, max_errors, structured
+            As in `validate_many`.
+        force : bool, optional
+            Rewrite files even if their content didn't change since the last export into the folder.
+
+        Returns
+        -------
+        dict
+            "written" and "skipped": lists of the file names written and skipped, "reports": the report of every document.
+
+        Raises
+        ------
+        ServerBusy
+            If max_queue requests are already queued.
+        KeyError
+            If title_path is not a field of the schema.
+        ValueError
+            If the mode is unknown, the folder is not under the export root, a document is a file path without
+            allow_paths, or a title can't name a file (see `export_many`).
+        OSError
+            If the files can't be written.
+        """
+        #resolve() raises KeyError for paths which are not in the schema, before any document is imported
+        self.compiled.resolve(title_path)
+        output_path = self.export_path(file_path)
+        limit = error_limit(mode, max_errors)
+        documents = self._check_documents(documents)
+        items = [(str(doc) if not isinstance(doc, dict) else position, doc, limit, title_path) for position, doc in enumerate(documents)]
+        results = self._map(_export_document, items)
+        exported = [item for _, item in results if item is not None]
+        result = {"written": [], "skipped": []}
+        if exported:
+            with self._export_lock:
+                result = export_many(exported, output_path, skip_unchanged=not force)
+        reports = [report for report, _ in results]
+        self._count("export", reports, structured)
+        return {**result, "reports": reports}
+
+    def record_request(self, endpoint: str, status: int, seconds: float):
+        """Count a request served by the HTTP layer."""
+        with self._lock:
+            self._requests[endpoint, status] += 1
+            self._seconds[endpoint] += seconds
+
+    def health(self) -> dict:
+        """Return the status of the server: uptime, schema, workers, queued requests and schema cache counters."""
+        with self._lock:
+            pending = self._pending
+        return {
+            "status": "ok",
+            "uptime": time.time() - self._started,
+            "schema": self.schema_source,
+            "workers": self.workers,
+            "queued": pending,
+            "max_queue": self.max_queue,
+            "allow_paths": self.allow_paths,
+            "schema_cache": SCHEMA_REGISTRY.stats(),
+        }
+
+    def metrics(self) -> dict:
+        """
+        Return the counters of the server.
+
+        Returns
+        -------
+        dict
+            "uptime", "queued", "requests" (list of {"endpoint", "status", "count"}), "request_seconds" (endpoint -> seconds),
+            "documents" (list of {"endpoint", "valid", "count"}), "errors" (list of {"path", "code", "count"}),
+            and "instrumentation": the recorder summary, or None without `instrument`.
+        """
+        with self._lock:
+            metrics = {
+                "uptime": time.time() - self._started,
+                "queued": self._pending,
+                "requests": [{"endpoint": endpoint, "status": status, "count": count}
+                             for (endpoint, status), count in sorted(self._requests.items())],
+                "request_seconds": dict(self._seconds),
+                "documents": [{"endpoint": endpoint, "valid": valid, "count": count}
+                              for (endpoint, valid), count in sorted(self._documents.items())],
+                "errors": [{"path": path, "code": code, "count": count} for (path, code), count in self._errors.most_common()],
+            }
+        metrics["instrumentation"] = self.recorder.summary() if self.recorder is not None else None
+        return metrics
+
+    def render_metrics(self) -> str:
+        """Return the metrics in the Prometheus text format ("metadata_server_" metrics, and "metadata_" with `instrument`)."""
+        metrics = self.metrics()
+        text = render_prometheus([
+            ("uptime_seconds", "gauge", "Seconds since the server started.", [({}, metrics["uptime"])]),
+            ("workers", "gauge", "Number of workers.", [({}, self.workers)]),
+            ("queued_requests", "gauge", "Requests waiting for or using the workers.", [({}, metrics["queued"])]),
+            ("max_queued_requests", "gauge", "Queued requests above which new ones are rejected.", [({}, self.max_queue)]),
+            ("requests_total", "counter", "Requests by endpoint and status.",
+             [({"endpoint": r["endpoint"], "status": r["status"]}, r["count"]) for r in metrics["requests"]]),
+            ("request_seconds_total", "counter", "Wall time spent serving each endpoint.",
+             [({"endpoint": endpoint}, seconds) for endpoint, seconds in metrics["request_seconds"].items()]),
+            ("documents_total", "counter", "Documents validated by endpoint and validity.",
+             [({"endpoint": d["endpoint"], "valid": str(d["valid"]).lower()}, d["count"]) for d in metrics["documents"]]),
+            ("validation_errors_total", "counter", "Validation errors by schema path and error code.",
+             [({"path": e["path"], "code": e["code"]}, e["count"]) for e in metrics["errors"]]),
+        ], prefix="metadata_server")
+        if metrics["instrumentation"] is not None:
+            text += render_prometheus(summary_metrics(metrics["instrumentation"]))
+        return text
+
+    def close(self):
+        """Stop the worker processes (waiting for their current work) and turn instrumentation off."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        if self.recorder is not None and instrumentation.active() is self.recorder:
+            instrumentation.disable()
+
+
+def _flag(value: Optional[str]) -> bool:
+    return value is not None and value.lower() in ("1", "true", "yes")
+
+
+def _jsonable_report(report: dict) -> dict:
+    """Report with its `ValidationError` objects (if any) as dictionaries."""
+    return dict(report, errors=[error.to_dict() if hasattr(error, "to_dict") else error for error in report["errors"]])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP layer of a ValidationServer, set as `service` by `make_http_server`."""
+    #keep-alive, so a pipeline step can send many requests over one connection
+    protocol_version = "HTTP/1.1"
+    server_version = "MetadataValidation/1.0"
+    service = None
+    log_requests = False
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._respond("health", 200, self.service.health(), start)
+        elif url.path == "/metrics":
+            if parse_qs(url.query).get("format") == ["json"]:
+                self._respond("metrics", 200, self.service.metrics(), start)
+            else:
+                self._respond("metrics", 200, self.service.render_metrics(), start, "text/plain; version=0.0.4")
+        else:
+            self._respond("unknown", 404, {"error": f"Unknown path '{url.path}'."}, start)
+
+    def do_POST(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        endpoint = url.path.strip("/")
+        if endpoint not in ("validate", "export"):
+            self._discard_body()
+            self._respond("unknown", 404, {"error": f"Unknown path '{url.path}'."}, start)
+            return
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            body = self._read_json()
+            documents = body if isinstance(body, list) else [body]
+            options = {
+                "mode": query.get("mode", "full"),
+                "max_errors": int(query["max_errors"]) if "max_errors" in query else None,
+                "structured": _flag(query.get("structured")),
+            }
+            if endpoint == "validate":
+                reports = [_jsonable_report(report) for report in self.service.validate(documents, **options)]
+                result = reports if isinstance(body, list) else reports[0]
+            else:
+                result = self.service.export(documents, query.get("output", "."), query.get("title_path", "Dataset.id"),
+                                             force=_flag(query.get("force")), **options)
+                result["reports"] = [_jsonable_report(report) for report in result["reports"]]
+        except ServerBusy as e:
+            self._respond(endpoint, 503, {"error": str(e)}, start, headers={"Retry-After": "1"})
+        except (KeyError, ValueError) as e:
+            #an unknown title_path, invalid JSON (JSONDecodeError) or an invalid query value
+            self._respond(endpoint, 400, {"error": e.args[0] if e.args else str(e)}, start)
+        except OSError as e:
+            #e.g. the export folder can't be created
+            self._respond(endpoint, 500, {"error": f"{type(e).__name__}: {e}"}, start)
+        except Exception as e:
+            #answered rather than dropping the connection, the server keeps running
+            self.log_error("Error serving %s: %r", self.path, e)
+            self._respond(endpoint, 500, {"error": f"{type(e).__name__}: {e}"}, start)
+        else:
+            self._respond(endpoint, 200, result, start)
+
+    def _read_json(self):
+        """
+        Read and parse the JSON body of the request.
+
+        Raises
+        ------
+        ValueError
+            If the body is missing, too large or not valid JSON.
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            raise ValueError("The request has no body, send a JSON document or a list of documents.")
+        if length > MAX_BODY:
+            #not read, so the connection is closed after the response
+            self.close_connection = True
+            raise ValueError(f"The request body is larger than {MAX_BODY} bytes, send smaller batches.")
+        return loads_json(self.rfile.read(length))
+
+    def _discard_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if 0 < length <= MAX_BODY:
+            self.rfile.read(length)
+        else:
+            self.close_connection = length > 0
+
+    def _respond(self, endpoint: str, status: int, body, start: float, content_type: str = "application/json",
+                 headers: Optional[dict] = None):
+        data = body.encode() if isinstance(body, str) else dumps_json(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.service.record_request(endpoint, status, time.perf_counter() - start)
+
+    def address_string(self) -> str:
+        #unix socket clients have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.log_requests:
+            super().log_message(format, *args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_http_server(service: ValidationServer, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None,
+                     log_requests: bool = False):
+    """
+    Create the HTTP server of a ValidationServer, listening on host:port or on a unix socket. Each connection is
+    served by its own thread; call `serve_forever()` to start it.
+
+    Parameters
+    ----------
+    service : ValidationServer
+        The server handling the requests.
+    host : str, optional
+        Address to listen on (default: "127.0.0.1", only reachable from this machine).
+    port : int, optional
+        Port to listen on (default: 8765, 0 for any free port).
+    socket_path : str, optional
+        Path of a unix socket to listen on instead of host:port. A socket left there by an earlier server is replaced.
+    log_requests : bool, optional
+        Log every request to stderr (default: False).
+
+    Raises
+    ------
+    FileExistsError
+        If socket_path exists and is not a socket.
+    """
+    #responses are written as headers then body, which Nagle's algorithm would hold back until the client's delayed ACK
+    handler = type("Handler", (_Handler,), {"service": service, "log_requests": log_requests,
+                                             "disable_nagle_algorithm": socket_path is None})
+    if socket_path is None:
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        return server
+    if os.path.exists(socket_path):
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            raise FileExistsError(f"'{socket_path}' exists and is not a socket.")
+        os.unlink(socket_path)
+    return _UnixHTTPServer(socket_path, handler)
+
+
+def serve(schema: Union[str, dict] = SCHEMA_PATH, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None,
+          workers: Optional[int] = None, max_queue: int = MAX_QUEUE, instrument: bool = False, log_requests: bool = False,
+          export_root: Union[str, Path] = "results", allow_paths: bool = False):
+    """
+    Run a validation server until it's interrupted (Ctrl+C or SIGTERM). See `ValidationServer` and `make_http_server`
+    for the parameters.
+    """
+    service = ValidationServer(schema, workers, max_queue, instrument, export_root, allow_paths)
+    server = make_http_server(service, host, port, socket_path, log_requests)
+    #SIGTERM (e.g. from a service manager) stops the server like Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    address = socket_path or "http://{}:{}".format(*server.server_address[:2])
+    print(f"Validating against {service.schema_source} with {service.workers} worker(s), listening on {address}, "
+          f"exporting under {service.export_root}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
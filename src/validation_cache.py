@@ -0,0 +1,207 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from src.serializers import canonical_json, dumps_json, loads_json
+
+
+#Bump when a change to the validators changes their results, so older cached results are not used any more
+CACHE_VERSION = 2
+
+
+def schema_key(schema: dict, default_metadata: Optional[dict] = None, max_errors: Optional[int] = None, structured: bool = False) -> str:
+    """
+    Hash a schema (with the default metadata documents are imported onto and the validation options) into a cache key.
+
+    Parameters
+    ----------
+    schema : dict
+        The JSON schema.
+    default_metadata : dict, optional
+        Default metadata fields the documents are validated with (e.g. COMBINED_DEFAULT).
+    max_errors : int, optional
+        Error limit of the validation (results cut short by a limit are cached separately).
+    structured : bool, optional
+        Whether the cached errors are `ValidationError` dictionaries rather than messages.
+
+    Returns
+    -------
+    str
+        Hex sha256 of the canonical JSON of the schema, the defaults, the options and CACHE_VERSION.
+    """
+    return hashlib.sha256(canonical_json([CACHE_VERSION, schema, default_metadata, max_errors, structured])).hexdigest()
+
+
+def document_key(metadata) -> str:
+    """
+    Hash a metadata document into a cache key. Key order and file formatting don't change the key.
+
+    Returns
+    -------
+    str
+        Hex sha256 of the canonical JSON of the document.
+    """
+    return hashlib.sha256(canonical_json(metadata)).hexdigest()
+
+
+class ValidationCache:
+    """
+    On-disk cache of validation results, keyed by (schema hash, metadata hash), so unchanged documents
+    are not validated again by later runs.
+
+    Results are stored in an SQLite database. Once the stored results take more than `max_bytes`,
+    the least recently used ones are evicted.
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        Path to the cache database.
+    max_bytes : int
+        Maximum total size of the stored results (the database file itself is somewhat larger).
+    hits : int
+        Number of lookups answered from the cache since it was opened.
+    misses : int
+        Number of lookups not found in the cache since it was opened.
+    evictions : int
+        Number of results evicted since the cache was opened.
+
+    Examples
+    --------
+    >>> with ValidationCache(".validation_cache.sqlite") as cache:
+    ...     reports = validate_many(glob.glob("data/Metadata Samples/*.json"), cache=cache)
+    ...     cache.stats()
+    """
+    def __init__(self, path: Union[str, Path] = ".validation_cache.sqlite", max_bytes: int = 64 * 1024 * 1024):
+        if max_bytes < 1:
+            raise ValueError("max_bytes should be at least 1.")
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "schema_key TEXT NOT NULL, document_key TEXT NOT NULL, result TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (schema_key, document_key))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._connection.commit()
+        #kept up to date by put/_evict, so checking the size doesn't scan the table
+        self._stored_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if self._stored_bytes > self.max_bytes:
+            #opened with a smaller max_bytes than it was filled with
+            self._evict()
+            self._connection.commit()
+
+    def get(self, schema_key: str, document_key: str) -> Optional[dict]:
+        """
+        Return the cached result of a document, or None if it isn't cached.
+
+        Parameters
+        ----------
+        schema_key : str
+            Key of the schema, from `schema_key()`.
+        document_key : str
+            Key of the document, from `document_key()`.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT result FROM results WHERE schema_key = ? AND document_key = ?", (schema_key, document_key)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute(
+                "UPDATE results SET last_used = ? WHERE schema_key = ? AND document_key = ?", (time.time(), schema_key, document_key)
+            )
+        return loads_json(row[0])
+
+    def put(self, schema_key: str, document_key: str, result: dict):
+        """
+        Store the result of a document, evicting the least recently used results if the cache gets too big.
+
+        Parameters
+        ----------
+        schema_key : str
+            Key of the schema, from `schema_key()`.
+        document_key : str
+            Key of the document, from `document_key()`.
+        result : dict
+            JSON-compatible validation result.
+        """
+        text = dumps_json(result)
+        with self._lock:
+            replaced = self._connection.execute(
+                "SELECT size FROM results WHERE schema_key = ? AND document_key = ?", (schema_key, document_key)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", (schema_key, document_key, text, len(text), time.time())
+            )
+            self._stored_bytes += len(text) - (replaced[0] if replaced else 0)
+            if self._stored_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete the least recently used results until the stored results fit in max_bytes (the lock must be held)."""
+        evicted = []
+        for rowid, size in self._connection.execute("SELECT rowid, size FROM results ORDER BY last_used"):
+            if self._stored_bytes <= self.max_bytes:
+                break
+            evicted.append((rowid,))
+            self._stored_bytes -= size
+        self._connection.executemany("DELETE FROM results WHERE rowid = ?", evicted)
+        self.evictions += len(evicted)
+
+    def commit(self):
+        """Write pending changes (new results and last use times) to disk."""
+        with self._lock:
+            self._connection.commit()
+
+    def clear(self):
+        """Delete every cached result and reset the counters."""
+        with self._lock:
+            self._connection.execute("DELETE FROM results")
+            self._connection.commit()
+            self._stored_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters and size.
+
+        Returns
+        -------
+        dict
+            Number of hits, misses and evictions since the cache was opened, number of cached results,
+            their total size in bytes and the maximum size.
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": self._stored_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def close(self):
+        """Commit pending changes and close the database."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
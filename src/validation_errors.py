@@ -0,0 +1,201 @@
+from collections import Counter
+from typing import Iterable
+
+from src.date_validation import DateValidator
+
+
+#"required": a required field is missing
+#"type": the value has the wrong type (or, for "datetime" fields in validate(), isn't a valid date)
+#"object": an object field holds something else than an object
+#"enum": the value is not one of the allowed values
+#"item_type": an array item has the wrong type or value
+#"date_format": a date isn't a string in the accepted format(s) (when setting a value)
+#"unknown_key": an object value has a key which is not in the schema (when setting a value)
+ERROR_CODES = ["required", "type", "object", "enum", "item_type", "date_format", "unknown_key"]
+
+
+class ValidationError:
+    """
+    A single validation error, kept as data and only formatted into a message on demand.
+
+    Attributes
+    ----------
+    path : str
+        Dotted path of the field (e.g. "Dataset.qmi.href"), as used in the error message.
+    code : str
+        Kind of error, one of ERROR_CODES.
+    expected : object
+        What the schema expects: the type name, the allowed values, the accepted date formats, or None.
+    actual : object
+        The rejected value (the type name of the value for "object" errors, the key for "unknown_key" errors, None for "required").
+
+    Examples
+    --------
+    >>> errors = cfg.validate(structured=True)
+    >>> [(e.path, e.code) for e in errors]
+    >>> errors[0].format()
+    """
+    __slots__ = ("path", "code", "expected", "actual")
+
+    def __init__(self, path: str, code: str, expected=None, actual=None):
+        self.path = path
+        self.code = code
+        self.expected = expected
+        self.actual = actual
+
+    def format(self) -> str:
+        """Return the message `MetadataConfig.validate()` reports for this error."""
+        return _REPORT_MESSAGES[self.code](self)
+
+    def build_message(self) -> str:
+        """Return the message of the error raised by `MetadataConfig.set()` for this error."""
+        return _BUILD_MESSAGES[self.code](self)
+
+    def to_dict(self) -> dict:
+        """Return the error as a dictionary with the keys "path", "code", "expected" and "actual"."""
+        return {"path": self.path, "code": self.code, "expected": self.expected, "actual": self.actual}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ValidationError":
+        """Build an error from the dictionary returned by `to_dict()`."""
+        return cls(data["path"], data["code"], data.get("expected"), data.get("actual"))
+
+    def __str__(self):
+        return self.format()
+
+    def __repr__(self):
+        return f"ValidationError(path={self.path!r}, code={self.code!r}, expected={self.expected!r}, actual={self.actual!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, ValidationError):
+            return NotImplemented
+        return (self.path, self.code, self.expected, self.actual) == (other.path, other.code, other.expected, other.actual)
+
+    __hash__ = None
+
+
+def _key(error: ValidationError) -> str:
+    """Name of the field, the last key of the path."""
+    return error.path.rpartition(".")[2]
+
+
+#messages of validate()
+_REPORT_MESSAGES = {
+    "required": lambda e: f"Missing required field: {e.path}",
+    "type": lambda e: f"Incorrect type for {e.path}: expected {e.expected}, but got {type(e.actual).__name__}",
+    "object": lambda e: f"Incorrect type for {e.path}: expected object, but got {e.actual}",
+    "enum": lambda e: f"Incorrect dataset type for {e.path}: allowed types are {e.expected}, but got {repr(e.actual)}",
+    "item_type": lambda e: f"Incorrect item type for {e.path}: allowed types are {e.expected}, but got {repr(e.actual)}",
+    "date_format": lambda e: f"Incorrect type for {e.path}: expected datetime, but got {type(e.actual).__name__}",
+    "unknown_key": lambda e: f"'{e.actual}' is not a valid key in the schema for '{e.path.rpartition('.')[0].rpartition('.')[2]}'.",
+}
+
+#messages of the errors raised by set()/import_from_dict()/initial_validate_and_build()
+_BUILD_MESSAGES = {
+    "enum": lambda e: f"Validation error for path '{e.path}': Value '{e.actual}' is not valid for '{_key(e)}'. Possible choices are: {e.expected}",
+    "date_format": lambda e: f"Validation error for path '{e.path}': {DateValidator.for_formats(e.expected).error(e.actual, _key(e))}",
+    "type": lambda e: f"Validation error for path '{e.path}': Expected type '{e.expected}' for '{_key(e)}', but got '{type(e.actual).__name__}' with value '{e.actual}'.",
+    "object": lambda e: f"Validation error for path '{e.path}': Value for '{_key(e)}' expects an object/dict.",
+    "unknown_key": _REPORT_MESSAGES["unknown_key"],
+}
+
+
+class FieldValueError(ValueError):
+    """
+    ValueError raised when a value being set is invalid. The message is only formatted when it's displayed,
+    so rejected values which are never reported (e.g. by a pipeline only checking whether a document is valid) don't pay for it.
+
+    Attributes
+    ----------
+    error : ValidationError
+        The error.
+    """
+    def __init__(self, error: ValidationError):
+        #kept in args, so the error can be pickled
+        super().__init__(error)
+        self.error = error
+
+    def __str__(self):
+        return self.error.build_message()
+
+    def validation_errors(self) -> list:
+        """Return the structured errors (a single one)."""
+        return [self.error]
+
+
+class UnknownKeyError(KeyError):
+    """KeyError raised for a key of an object value which is not in the schema (see `FieldValueError`)."""
+    def __init__(self, error: ValidationError):
+        super().__init__(error)
+        self.error = error
+
+    def __str__(self):
+        #same quoting as a KeyError built from the message
+        return repr(self.error.build_message())
+
+    def validation_errors(self) -> list:
+        """Return the structured errors (a single one)."""
+        return [self.error]
+
+
+class NestedValidationError(ValueError):
+    """
+    The errors of the fields of an object, raised together by `ObjectValidator.build`.
+    The message joins the messages of every error (only when it's displayed).
+
+    Attributes
+    ----------
+    errors : list of Exception
+        Errors of the fields (FieldValueError, UnknownKeyError or nested NestedValidationError).
+    count : int
+        Number of field errors, including those of nested objects.
+    """
+    def __init__(self, errors: list):
+        super().__init__(errors)
+        self.errors = errors
+        self.count = sum(getattr(e, "count", 1) for e in errors)
+
+    def __str__(self):
+        return "\n  - ".join(str(e) for e in self.errors)
+
+    def validation_errors(self) -> list:
+        """Return the structured errors of every field, including those of nested objects."""
+        errors = []
+        for e in self.errors:
+            if hasattr(e, "validation_errors"):
+                errors.extend(e.validation_errors())
+        return errors
+
+
+def aggregate_errors(errors: Iterable[ValidationError]) -> dict:
+    """
+    Count errors by code and by path, e.g. over the errors of every document of a batch. No message is formatted.
+
+    Parameters
+    ----------
+    errors : iterable of ValidationError
+        The errors.
+
+    Returns
+    -------
+    dict
+        "total": number of errors, "by_code": code -> count, "by_path": path -> count,
+        "by_path_and_code": (path, code) -> count. Counts are sorted from the most frequent.
+
+    Examples
+    --------
+    >>> reports = validate_many(paths, structured=True)
+    >>> aggregate_errors(e for report in reports for e in report["errors"])["by_code"]
+    """
+    by_path_and_code = Counter((error.path, error.code) for error in errors)
+    by_code = Counter()
+    by_path = Counter()
+    for (path, code), count in by_path_and_code.items():
+        by_code[code] += count
+        by_path[path] += count
+    return {
+        "total": sum(by_path_and_code.values()),
+        "by_code": dict(by_code.most_common()),
+        "by_path": dict(by_path.most_common()),
+        "by_path_and_code": dict(by_path_and_code.most_common()),
+    }
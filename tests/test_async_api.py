@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from src import executors
+from src.async_api import aexport, aiter_validate, avalidate_many
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.executors import configure_executors, shutdown_executors
+from src.schema_cache import SCHEMA_REGISTRY
+from src.serializers import read_json
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+
+
+@pytest.fixture
+def cfg():
+    return MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+
+
+@pytest.fixture
+def documents():
+    valid = read_json(SAMPLE_PATH)
+    invalid = read_json(SAMPLE_PATH)
+    invalid["Dataset"]["title"] = 5
+    return [valid, SAMPLE_PATH, invalid]
+
+
+def test_aload_avalidate_aexport_to_json(cfg, tmp_path):
+    async def run():
+        loaded = await cfg.aload(SAMPLE_PATH)
+        errors = await cfg.avalidate(structured=True)
+        await cfg.aexport_to_json("cpi", str(tmp_path))
+        return loaded, errors
+
+    loaded, errors = asyncio.run(run())
+    assert loaded == read_json(SAMPLE_PATH)
+    assert errors == []
+    assert read_json(tmp_path / "cpi_metadata.json") == cfg.to_dict()
+
+
+def test_aload_errors(cfg, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(cfg.aload(str(tmp_path / "missing.json")))
+
+
+@pytest.mark.parametrize("schema", [SCHEMA_PATH, SCHEMA_REGISTRY.get(SCHEMA_PATH), SCHEMA_REGISTRY.get(SCHEMA_PATH).schema],
+                         ids=["path", "compiled", "dict"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_avalidate_many(documents, schema, workers):
+    reports = asyncio.run(avalidate_many(documents, schema, workers=workers))
+    assert [(report["source"], report["valid"]) for report in reports] == [(0, True), (SAMPLE_PATH, True), (2, False)]
+
+
+def test_aiter_validate_backpressure(documents):
+    pulled = []
+
+    async def source():
+        for position in range(20):
+            pulled.append(position)
+            yield documents[position % 3]
+
+    async def run():
+        consumed = []
+        async for report in aiter_validate(source(), SCHEMA_PATH, workers=1, max_pending=2):
+            #the next documents are only taken once the oldest report is consumed
+            assert len(pulled) <= len(consumed) + 3
+            consumed.append(report["valid"])
+        return consumed
+
+    assert asyncio.run(run()) == [position % 3 != 2 for position in range(20)]
+
+
+def test_aiter_validate_arguments(documents):
+    async def run(**kwargs):
+        return [report async for report in aiter_validate(documents, SCHEMA_PATH, **kwargs)]
+
+    for kwargs in ({"workers": 0}, {"workers": 1, "max_pending": 0}, {"workers": 1, "mode": "lenient"}):
+        with pytest.raises(ValueError):
+            asyncio.run(run(**kwargs))
+
+
+def test_aexport(cfg, tmp_path):
+    cfg.load_metadata_from_file(SAMPLE_PATH)
+    result = asyncio.run(aexport([cfg], str(tmp_path)))
+    assert result["written"] == [f"{cfg.get('Dataset.id')}_metadata.json"]
+
+
+def test_configure_executors(cfg):
+    sizes = executors.IO_WORKERS, executors.CPU_WORKERS
+    configure_executors(io_workers=1, cpu_workers=1)
+    try:
+        assert asyncio.run(cfg.aload(SAMPLE_PATH))
+        with pytest.raises(ValueError):
+            configure_executors(io_workers=0)
+    finally:
+        configure_executors(*sizes)
+        shutdown_executors()
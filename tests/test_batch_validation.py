@@ -0,0 +1,83 @@
+import copy
+
+import pytest
+
+from src import batch_validation
+from src.batch_validation import summarise_reports, validate_many
+from src.schema_cache import SCHEMA_REGISTRY
+from src.serializers import read_json
+from src.validation_cache import ValidationCache
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+
+
+@pytest.fixture
+def documents(tmp_path):
+    invalid = read_json(SAMPLE_PATH)
+    invalid["Dataset"]["title"] = 5
+    invalid["Dataset"]["id"] = 6
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    listed = tmp_path / "list.json"
+    listed.write_text("[1, 2]")
+    return [SAMPLE_PATH, invalid, str(broken), str(tmp_path / "missing.json"), str(listed), {"Nope": {}}]
+
+
+def _check(reports):
+    assert [report["valid"] for report in reports] == [True, False, False, False, False, False]
+    assert reports[1]["load_error"] is None
+    assert reports[1]["errors"] == ["Incorrect type for Dataset.id: expected string, but got int",
+                                    "Incorrect type for Dataset.title: expected string, but got int"]
+    assert reports[2]["load_error"] and reports[3]["load_error"].startswith("FileNotFoundError")
+    assert reports[4]["load_error"].startswith("TypeError") and reports[5]["load_error"].startswith("KeyError")
+    assert all(report["errors"] == [] for report in reports[2:])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rejected_values_are_validation_errors(documents, workers):
+    reports = validate_many(documents, workers=workers)
+    _check(reports)
+    assert summarise_reports(reports) == {"documents": 6, "valid": 1, "load_errors": 4, "errors": 2}
+
+
+def test_structured_errors_and_limit(documents):
+    reports = validate_many(documents[:2], workers=1, structured=True)
+    assert [(error.path, error.code) for error in reports[1]["errors"]] == [("Dataset.id", "type"), ("Dataset.title", "type")]
+    assert len(validate_many(documents[:2], workers=1, max_errors=1)[1]["errors"]) == 1
+
+
+def test_cached_reports(documents, tmp_path):
+    cache = ValidationCache(tmp_path / "cache.sqlite")
+    first = validate_many(documents, workers=1, cache=cache)
+    second = validate_many(documents, workers=1, cache=cache)
+    _check(first)
+    assert second == first
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rejected_values_of_every_section(workers):
+    document = read_json(SAMPLE_PATH)
+    document["Dataset"]["title"] = 5
+    document["Edition"]["quality_designation"] = 5
+    reports = validate_many([document, document], workers=workers, structured=True)
+    assert [error.path for error in reports[0]["errors"]] == ["Dataset.title", "Edition.quality_designation"]
+    limited = validate_many([document, document], workers=workers, max_errors=1, structured=True)
+    assert [error.path for error in limited[0]["errors"]] == ["Dataset.title"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_compiled_schema(workers):
+    document = read_json(SAMPLE_PATH)
+    reports = validate_many([document, document], schema=SCHEMA_REGISTRY.get(SCHEMA_PATH), workers=workers)
+    assert [report["valid"] for report in reports] == [True, True]
+
+
+def test_serial_validation_uses_the_given_schema():
+    document = read_json(SAMPLE_PATH)
+    schema = copy.deepcopy(SCHEMA_REGISTRY.get(SCHEMA_PATH).schema)
+    schema["properties"]["Dataset"]["properties"]["title"]["type"] = "integer"
+    assert not validate_many([document], schema=schema, workers=1)[0]["valid"]
+    assert validate_many([document], workers=1)[0]["valid"]
+    #the schema of the worker processes is not set in the calling process
+    assert batch_validation._WORKER_SCHEMA is None
@@ -0,0 +1,108 @@
+import io
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from src.bulk_export import MANIFEST_NAME, export_many, write_atomic
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig, export_file_name
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+
+
+def _config(dataset_id):
+    cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+    cfg.load_metadata_from_file(SAMPLE_PATH)
+    cfg.set("Dataset.id", dataset_id)
+    return cfg
+
+
+@pytest.fixture
+def configs():
+    return [_config("cpi"), _config("cpih")]
+
+
+def test_write_atomic(tmp_path):
+    file_path = tmp_path / "out.json"
+    write_atomic(file_path, b"first")
+    write_atomic(file_path, b"second")
+    assert file_path.read_bytes() == b"second"
+    #a failed write keeps the previous file and removes the temporary one
+    with pytest.raises(TypeError):
+        write_atomic(file_path, "not bytes")
+    assert file_path.read_bytes() == b"second"
+    assert [path.name for path in tmp_path.iterdir()] == ["out.json"]
+
+
+def test_export_many_writes_one_file_per_config(configs, tmp_path):
+    result = export_many(configs, tmp_path)
+    assert result == {"written": ["cpi_metadata.json", "cpih_metadata.json"], "skipped": []}
+    for cfg in configs:
+        assert json.loads((tmp_path / f"{cfg.get('Dataset.id')}_metadata.json").read_text()) == cfg.to_dict()
+    assert set(json.loads((tmp_path / MANIFEST_NAME).read_text())) == set(result["written"])
+
+
+def test_skip_unchanged(configs, tmp_path):
+    export_many(configs, tmp_path)
+    assert export_many(configs, tmp_path)["skipped"] == ["cpi_metadata.json", "cpih_metadata.json"]
+    configs[0].set("Dataset.title", "Consumer prices")
+    assert export_many(configs, tmp_path) == {"written": ["cpi_metadata.json"], "skipped": ["cpih_metadata.json"]}
+    assert export_many(configs, tmp_path, skip_unchanged=False)["written"] == ["cpi_metadata.json", "cpih_metadata.json"]
+
+
+def test_files_changed_on_disk_are_written_again(configs, tmp_path):
+    export_many(configs, tmp_path)
+    expected = (tmp_path / "cpi_metadata.json").read_bytes()
+    (tmp_path / "cpi_metadata.json").write_text("{}")
+    (tmp_path / "cpih_metadata.json").unlink()
+    assert export_many(configs, tmp_path)["written"] == ["cpi_metadata.json", "cpih_metadata.json"]
+    assert (tmp_path / "cpi_metadata.json").read_bytes() == expected
+
+
+@pytest.mark.parametrize("bundle", ["tar", "zip", "ndjson"])
+def test_bundles(bundle, configs, tmp_path):
+    result = export_many(configs, tmp_path, bundle=bundle, bundle_name="catalogue")
+    (name,) = result["written"]
+    data = (tmp_path / name).read_bytes()
+    if bundle == "tar":
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            members = {member.name: json.load(archive.extractfile(member)) for member in archive.getmembers()}
+    elif bundle == "zip":
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            members = {member: json.loads(archive.read(member)) for member in archive.namelist()}
+    else:
+        assert name == "catalogue.jsonl"
+        members = {f"{record['Dataset']['id']}_metadata.json": record for record in map(json.loads, data.splitlines())}
+    assert list(members) == ["cpi_metadata.json", "cpih_metadata.json"]
+    assert list(members.values()) == [cfg.to_dict() for cfg in configs]
+    #the same content gives the same bundle
+    assert export_many(configs, tmp_path, bundle=bundle, bundle_name="catalogue")["skipped"] == [name]
+
+
+def test_unsupported_bundle(configs, tmp_path):
+    with pytest.raises(ValueError, match="Unsupported bundle format"):
+        export_many(configs, tmp_path, bundle="rar")
+
+
+@pytest.mark.parametrize("title", ["../escaped", "a/b", "a\\b", "a\0b", ".", ".."])
+def test_unsafe_titles(title, configs, tmp_path):
+    with pytest.raises(ValueError, match="path separator"):
+        export_many([(title, configs[0])], tmp_path / "output")
+    assert not (tmp_path / "output" / MANIFEST_NAME).exists()
+    assert not (tmp_path / "escaped_metadata.json").exists()
+
+
+@pytest.mark.parametrize("title, name", [(None, "None_metadata.json"), ("v1..2", "v1..2_metadata.json"),
+                                         ("...", "..._metadata.json"), (2024, "2024_metadata.json")])
+def test_safe_titles(title, name, configs, tmp_path):
+    assert export_file_name(title) == name
+    configs[0].export_to_json(title, str(tmp_path))
+    assert (tmp_path / name).exists()
+
+
+def test_duplicate_titles(configs, tmp_path):
+    with pytest.raises(ValueError, match="Two configs"):
+        export_many([("cpi", configs[0]), ("cpi", configs[1])], tmp_path)
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,96 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from src.main import expand_paths, main
+
+SAMPLES = "data/Metadata Samples"
+VALID_SAMPLE = f"{SAMPLES}/cpi_metadata.json"
+INVALID_SAMPLE = f"{SAMPLES}/custom_example.json"
+
+
+def test_expand_paths(tmp_path):
+    for name in ("b.json", "a.json", "sub/c.json"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text("{}")
+    paths = expand_paths([str(tmp_path / "b.json"), str(tmp_path / "*.json"), str(tmp_path / "**/*.json")])
+    assert paths == [str(tmp_path / name) for name in ("b.json", "a.json", "sub/c.json")]
+
+
+@pytest.mark.parametrize("pattern", ["missing.json", "missing/*.json"])
+def test_expand_paths_without_match(pattern, tmp_path):
+    with pytest.raises(FileNotFoundError, match="No file matches"):
+        expand_paths([str(tmp_path / pattern)])
+
+
+def test_expand_paths_ignores_folders(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        expand_paths([str(tmp_path)])
+
+
+def test_validate_exit_status(capsys):
+    assert main(["validate", VALID_SAMPLE]) == 0
+    assert main(["validate", VALID_SAMPLE, INVALID_SAMPLE]) == 1
+    assert "1 error(s)" in capsys.readouterr().out
+
+
+def test_validate_json_output(capsys):
+    assert main(["validate", "--format", "json", INVALID_SAMPLE]) == 1
+    (report,) = json.loads(capsys.readouterr().out)
+    assert report["source"] == INVALID_SAMPLE
+    assert not report["valid"]
+
+
+def test_unloadable_file_exit_status(tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    assert main(["validate", str(broken)]) == 1
+    assert main(["preview", str(broken)]) == 1
+
+
+@pytest.mark.parametrize("argv", [[], ["validate"], ["validate", "--mode", "lenient", VALID_SAMPLE],
+                                  ["validate", "missing.json"]])
+def test_usage_error_exit_status(argv):
+    with pytest.raises(SystemExit) as exit_info:
+        main(argv)
+    assert exit_info.value.code == 2
+
+
+def test_export_names_files_by_title(tmp_path, capsys):
+    assert main(["export", VALID_SAMPLE, f"{SAMPLES}/retail_sales_metadata.json", "--output", str(tmp_path)]) == 0
+    written = sorted(path.name for path in tmp_path.glob("*_metadata.json"))
+    ids = sorted(json.loads(open(path).read())["Dataset"]["id"]
+                 for path in (VALID_SAMPLE, f"{SAMPLES}/retail_sales_metadata.json"))
+    assert written == [f"{dataset_id}_metadata.json" for dataset_id in ids]
+
+
+def test_export_rejects_duplicate_titles(tmp_path, capsys):
+    #both samples have the same Dataset.id
+    assert main(["export", f"{SAMPLES}/child_mortality_metadata.json", INVALID_SAMPLE, "--output", str(tmp_path)]) == 1
+    assert "Two configs are exported to" in capsys.readouterr().err
+    assert not list(tmp_path.glob("*_metadata.json"))
+
+
+def test_export_rejects_unsafe_titles(tmp_path, capsys):
+    document = json.loads(open(VALID_SAMPLE).read())
+    document["Dataset"]["id"] = "../escaped"
+    source = tmp_path / "source.json"
+    source.write_text(json.dumps(document))
+    output = tmp_path / "output"
+    assert main(["export", str(source), "--output", str(output)]) == 1
+    assert "path separator" in capsys.readouterr().err
+    assert not (tmp_path / "escaped_metadata.json").exists()
+
+
+def test_help_only_imports_the_standard_library():
+    code = ("import sys\n"
+            "from src.main import main\n"
+            "try:\n"
+            "    main(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(sorted(name for name in ('pandas', 'yaml', 'orjson', 'src.config_objects') if name in sys.modules))\n")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == "[]"
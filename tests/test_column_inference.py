@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.CSVW.column_inference import column_name, infer_datatype, infer_datatypes
+
+
+@pytest.mark.parametrize("title, name", [("Time Period (Years)", "time_period_years"), ("  Area code ", "area_code"),
+                                         ("v4_0", "v4_0"), ("%", "column"), (2024, "2024")])
+def test_column_name(title, name):
+    assert column_name(title) == name
+
+
+@pytest.mark.parametrize("values, datatype", [
+    ([True, False], "boolean"),
+    ([1, 2], "integer"),
+    ([1.0, None], "integer"),
+    ([1.5, None], "decimal"),
+    ([None, None], "string"),
+    (["2024-01-05", "2024-01-12"], "date"),
+    (["05/01/2024", "12/01/2024"], {"base": "date", "format": "dd/MM/yyyy"}),
+    (["2024-01-05T10:00:00", "2024-01-12T10:00:00"], "dateTime"),
+    (["2024-01-05", "05/01/2024"], "string"),
+    (["a", "b"], "string"),
+    (pd.to_datetime(["2024-01-05", "2024-01-12"]), "dateTime"),
+])
+def test_infer_datatype(values, datatype):
+    column = pd.Series(values)
+    assert infer_datatype(column) == datatype
+    assert infer_datatypes(column.to_frame()) == [datatype]
+
+
+def test_infer_datatypes_by_position():
+    #repeated headers, and float columns checked together
+    frame = pd.DataFrame([[1.0, 1.5, "a", np.nan], [2.0, np.nan, "b", np.nan]], columns=["x", "x", "y", "z"])
+    assert infer_datatypes(frame) == ["integer", "decimal", "string", "string"]
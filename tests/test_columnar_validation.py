@@ -0,0 +1,57 @@
+import copy
+
+import pytest
+
+from src.columnar_validation import ColumnarValidator
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.schema_cache import SCHEMA_REGISTRY
+from src.serializers import read_json
+
+pytest.importorskip("pandas")
+
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+SAMPLES = ["cpi_metadata.json", "custom_example.json", "retail_sales_metadata.json", "child_mortality_metadata.json"]
+
+
+def _records():
+    samples = [read_json(f"data/Metadata Samples/{name}") for name in SAMPLES]
+    odd = [copy.deepcopy(samples[0]) for _ in range(5)]
+    del odd[0]["Dataset"]
+    odd[1]["Dataset"] = "not an object"
+    odd[2]["Dataset"]["title"] = None
+    del odd[3]["Edition"]["quality_designation"]
+    odd[4]["Edition"]["quality_designation"] = "unknown"
+    return samples + odd + [{}]
+
+
+def test_columnar_errors_match_validate():
+    records = _records()
+    expected = [MetadataConfig(SCHEMA_PATH, record).validate() for record in records]
+    assert ColumnarValidator(SCHEMA_PATH).validate(records) == expected
+    assert any(expected) and not all(expected)
+
+
+def test_flatten_keeps_missing_and_none_apart():
+    records = _records()
+    values, present = ColumnarValidator(SCHEMA_PATH).flatten(records)
+    assert list(values.columns) == list(present.columns)
+    assert len(values) == len(records)
+    row = len(SAMPLES) + 2
+    assert present.at[row, "Dataset.title"] and values.at[row, "Dataset.title"] is None
+    assert not present.at[len(SAMPLES), "Dataset.title"]
+    assert values.at[len(SAMPLES) + 1, "Dataset"] == "str"
+    assert not present.at[len(SAMPLES) + 1, "Dataset.title"]
+
+
+def test_compact_records_and_configs():
+    records = _records()[:len(SAMPLES)]
+    record_type = SCHEMA_REGISTRY.get(SCHEMA_PATH).record_type()
+    configs = []
+    for record in records:
+        cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+        cfg.import_from_dict(record)
+        configs.append(cfg)
+    validator = ColumnarValidator(SCHEMA_PATH)
+    expected = validator.validate(records)
+    assert validator.validate(record_type.from_dict(record) for record in records) == expected
+    assert validator.validate(configs) == [cfg.validate() for cfg in configs]
@@ -0,0 +1,84 @@
+import decimal
+import pickle
+
+import pytest
+
+from src.compact_records import CompactRecord
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.schema_cache import SCHEMA_REGISTRY
+from src.serializers import read_json
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+
+
+@pytest.fixture
+def record_type():
+    return SCHEMA_REGISTRY.get(SCHEMA_PATH).record_type()
+
+
+def test_round_trip(record_type):
+    metadata = read_json(SAMPLE_PATH)
+    assert record_type.from_dict(metadata).to_dict() == metadata
+
+
+def test_keys_keep_insertion_order(record_type):
+    dataset_type = record_type._nested["Dataset"]
+    fields = dataset_type._fields
+    record = dataset_type()
+    record[fields[2]] = 2
+    record[fields[0]] = 0
+    record[fields[1]] = 1
+    assert list(record) == [fields[2], fields[0], fields[1]]
+    del record[fields[0]]
+    copy = record.copy()
+    copy[fields[0]] = 0
+    assert list(record.to_dict()) == [fields[2], fields[1]]
+    assert list(copy.to_dict()) == [fields[2], fields[1], fields[0]]
+
+
+def test_input_order_is_kept(record_type):
+    metadata = read_json(SAMPLE_PATH)
+    reordered = {key: dict(reversed(value.items())) if isinstance(value, dict) else value
+                 for key, value in reversed(metadata.items())}
+    result = record_type.from_dict(reordered).to_dict()
+    assert list(result) == list(reordered)
+    assert all(list(result[key]) == list(value) for key, value in reordered.items() if isinstance(value, dict))
+
+
+def test_records_pickle(record_type):
+    record = record_type.from_dict(dict(reversed(read_json(SAMPLE_PATH).items())))
+    restored = pickle.loads(pickle.dumps(record))
+    assert type(restored) is record_type
+    assert isinstance(restored["Dataset"], CompactRecord)
+    assert list(restored.to_dict().items()) == list(record.to_dict().items())
+
+
+def test_compact_config_keeps_input_order():
+    reordered = dict(reversed(read_json(SAMPLE_PATH).items()))
+    configs = [MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT, compact=compact) for compact in (False, True)]
+    for cfg in configs:
+        cfg.import_from_dict(reordered)
+    assert list(configs[1].to_dict().items()) == list(configs[0].to_dict().items())
+    assert pickle.loads(pickle.dumps(configs[1]._metadata)).to_dict() == configs[1].to_dict()
+
+
+def test_default_record_is_kept_per_defaults_object():
+    compiled = SCHEMA_REGISTRY.get(SCHEMA_PATH)
+    default = {"Dataset": {"title": "first"}}
+    first = compiled.default_record(default)
+    assert compiled.default_record(default) is first
+    other = compiled.default_record({"Dataset": {"title": "second"}})
+    assert other is not first and other.to_dict() == {"Dataset": {"title": "second"}}
+    for position in range(compiled.DEFAULT_RECORDS_SIZE + 1):
+        compiled.default_record({"Dataset": {"title": str(position)}})
+    assert len(compiled._default_records) == compiled.DEFAULT_RECORDS_SIZE
+    assert compiled.default_record(default) is not first
+
+
+def test_defaults_which_are_not_json_serialisable():
+    default = {"Dataset": {"title": "first", "topics": ("a", "b")}, "Edition": {"edition": decimal.Decimal("2024")}}
+    first = MetadataConfig(SCHEMA_PATH, default, compact=True)
+    second = MetadataConfig(SCHEMA_PATH, default, compact=True)
+    assert first._metadata is second._metadata
+    assert first.get("Dataset.title") == "first"
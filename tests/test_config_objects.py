@@ -0,0 +1,141 @@
+import timeit
+
+import pytest
+
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig, _split_path
+from src.serializers import read_json
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+
+
+@pytest.fixture(params=[False, True], ids=["dict", "compact"])
+def cfg(request):
+    cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT, compact=request.param)
+    cfg.load_metadata_from_file(SAMPLE_PATH)
+    return cfg
+
+
+def _full_errors(cfg):
+    fresh = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+    fresh.import_from_dict(cfg.to_dict())
+    return sorted(fresh.validate())
+
+
+def test_incremental_validation_matches_full_validation(cfg):
+    assert cfg.validate(incremental=True) == cfg.validate()
+    steps = [
+        ("Dataset.title", "Consumer prices"),
+        ("Edition.quality_designation", "official"),
+        ("Dataset.publisher.name", "Office for National Statistics"),
+    ]
+    for path, value in steps:
+        cfg.set(path, value)
+        assert sorted(cfg.validate(incremental=True)) == _full_errors(cfg)
+
+
+def test_incremental_validation_after_import(cfg):
+    cfg.validate()
+    document = read_json(SAMPLE_PATH)
+    document["Edition"]["usage_notes"] = {"title": ["1"], "note": [12]}
+    cfg.import_from_dict(document)
+    errors = cfg.validate(incremental=True)
+    assert errors and sorted(errors) == _full_errors(cfg)
+    document["Edition"]["usage_notes"] = {"title": ["1"], "note": ["a note"]}
+    cfg.import_from_dict(document)
+    assert cfg.validate(incremental=True) == _full_errors(cfg) == []
+
+
+def test_limited_validation_is_not_reused(cfg):
+    cfg.import_from_dict({"Edition": {"usage_notes": {"title": [1], "note": [2]}}})
+    assert len(cfg.validate(max_errors=1)) == 1
+    assert sorted(cfg.validate(incremental=True)) == _full_errors(cfg)
+
+
+def test_accessor_matches_get_and_set(cfg):
+    title = cfg.accessor("Dataset.title")
+    assert title.get() == cfg.get("Dataset.title")
+    title.set("Consumer prices")
+    assert cfg.get("Dataset.title") == "Consumer prices"
+    with pytest.raises(ValueError):
+        title.set(5)
+    with pytest.raises(KeyError):
+        cfg.accessor("Dataset.nothing")
+
+
+def test_resolved_paths_are_cached(cfg):
+    #get() only walks the metadata, so it only needs the split path
+    cfg.get("Dataset.title")
+    hits = _split_path.cache_info().hits
+    cfg.get("Dataset.title")
+    assert _split_path.cache_info().hits == hits + 1
+    #set() and accessor() resolve the path against the schema
+    resolve = cfg._compiled.resolve
+    resolve("Dataset.title")
+    hits = resolve.cache_info().hits
+    cfg.set("Dataset.title", "Consumer prices")
+    cfg.accessor("Dataset.title")
+    assert resolve.cache_info().hits == hits + 2
+    with pytest.raises(KeyError):
+        cfg.get("Dataset.nothing")
+
+
+def test_path_access_benchmark(cfg):
+    #a cheap version of benchmarks/bench_path_access.py: the cached paths should beat resolving them every call
+    path = "Dataset.publisher.name"
+    compiled = cfg._compiled
+    accessor = cfg.accessor(path)
+
+    def set_uncached():
+        resolved = compiled._resolve(path)
+        cfg._write_value(resolved.keys, resolved.build("ONS"))
+
+    def best(call):
+        return min(timeit.repeat(call, number=2000, repeat=5))
+
+    uncached = best(set_uncached)
+    assert best(lambda: cfg.set(path, "ONS")) < uncached
+    assert best(lambda: accessor.set("ONS")) < uncached
+    assert accessor.get() == cfg.get(path) == "ONS"
+
+
+def test_get_returns_references(cfg):
+    contacts = cfg.get("Dataset.contacts")
+    contacts["name"] = "changed"
+    cfg.get("Edition.usage_notes")["note"].append("changed")
+    cfg.accessor("Edition.usage_notes").get()["title"].append("changed")
+    assert cfg.get("Dataset.contacts") is contacts
+    assert cfg.get("Dataset.contacts.name") == "changed"
+    assert "changed" in cfg.get("Edition.usage_notes")["title"] and "changed" in cfg.get("Edition.usage_notes")["note"]
+    #changes made in place are validated again
+    contacts["email"] = 5
+    assert "Dataset.contacts.email" in str(cfg.validate(incremental=True))
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["dict", "compact"])
+def test_get_does_not_change_the_defaults(compact):
+    cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT, compact=compact)
+    cfg.get("Dataset")["contacts"]["name"] = "changed"
+    cfg.get("Dataset.topics").append("changed")
+    cfg.get("Edition")["usage_notes"]["title"].append("changed")
+    assert cfg.get("Dataset.contacts.name") == "changed"
+    assert COMBINED_DEFAULT["Dataset"]["contacts"]["name"] is None
+    assert COMBINED_DEFAULT["Dataset"]["topics"] == COMBINED_DEFAULT["Edition"]["usage_notes"]["title"] == []
+    fresh = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT, compact=compact)
+    assert (fresh.get("Dataset.contacts.name"), fresh.get("Dataset.topics")) == (None, [])
+    assert fresh.get("Edition.usage_notes")["title"] == []
+
+def test_writes_are_isolated_from_the_defaults(cfg):
+    default = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT, compact=True)
+    for value in ({"name": "a", "email": "a@ons.gov.uk", "telephone": "1"}, {"name": "b", "email": "b@ons.gov.uk", "telephone": "2"}):
+        #replacing an owned object and writing in the new one, many times, so freed identities could be reused
+        for _ in range(50):
+            cfg.set("Dataset.contacts", value)
+            cfg.set("Dataset.contacts.email", "someone@ons.gov.uk")
+        assert cfg.get("Dataset.contacts") == {**value, "email": "someone@ons.gov.uk"}
+    default.set("Dataset.contacts.name", "c")
+    assert COMBINED_DEFAULT["Dataset"]["contacts"]["name"] is None
+    assert MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT).get("Dataset.contacts.name") is None
+    assert MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT, compact=True).get("Dataset.contacts.name") is None
+    #only the branches in the metadata are kept
+    assert len(cfg._owned_branches) <= 8
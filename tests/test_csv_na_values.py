@@ -0,0 +1,29 @@
+import pytest
+
+from src.CSVW.CSVW_metadata import CSVW
+from src.CSVW.csv_profiler import profile_csv
+
+CSV_TEXT = "code,value\nNA,1\nnull,\nN/A,3\n"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    file_path = tmp_path / "values.csv"
+    file_path.write_text(CSV_TEXT)
+    return str(file_path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_profile_only_empty_cells_are_missing(csv_path, workers):
+    code, value = profile_csv(csv_path, workers=workers, chunk_bytes=8).columns
+    assert (code.count, code.nulls) == (3, 0)
+    assert code.datatype == "string"
+    assert (value.count, value.nulls) == (3, 1)
+
+
+def test_readers_agree_on_missing_values(csv_path):
+    csvw = CSVW("values.csv", "Values", "", "")
+    csvw.add_columns_from_csv(csv_path, required=["code"])
+    report = csvw.validate_csv(csv_path)
+    assert csvw.csvw["tableSchema"]["columns"][0]["datatype"] == "string"
+    assert report["valid"], report
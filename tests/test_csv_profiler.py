@@ -0,0 +1,63 @@
+import pytest
+
+from src.CSVW.csv_profiler import profile_csv
+
+CSV_TEXT = ("flag,count,price,day,uk_day,time,name\n"
+            "true,1,1.5,2024-01-02,02/01/2024,2024-01-02T10:00:00,x\n"
+            "false,,2,2024-02-03,03/02/2024,2024-02-03T11:30:00,yy\n"
+            "True,3,-0.5,2024-03-04,04/03/2024,2024-03-04T12:45:00,zzz\n")
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    file_path = tmp_path / "values.csv"
+    file_path.write_text(CSV_TEXT)
+    return str(file_path)
+
+
+@pytest.mark.parametrize("workers, chunk_bytes", [(1, 64), (2, 16)])
+def test_datatypes(csv_path, workers, chunk_bytes):
+    profile = profile_csv(csv_path, chunksize=1, workers=workers, chunk_bytes=chunk_bytes)
+    assert profile.rows == 3
+    assert [column.title for column in profile.columns] == ["flag", "count", "price", "day", "uk_day", "time", "name"]
+    assert [column.datatype for column in profile.columns] == [
+        "boolean", "integer", "decimal", "date", {"base": "date", "format": "dd/MM/yyyy"}, "dateTime", "string"]
+    assert [column.required for column in profile.columns] == [True, False, True, True, True, True, True]
+
+
+def test_ranges(csv_path):
+    columns = {column["name"]: column["datatype"] for column in profile_csv(csv_path).csvw_columns(include_ranges=True)}
+    assert columns["count"] == {"base": "integer", "minimum": 1, "maximum": 3}
+    assert columns["price"] == {"base": "decimal", "minimum": -0.5, "maximum": 2.0}
+    assert columns["name"] == {"base": "string", "minLength": 1, "maxLength": 3}
+    assert columns["day"] == "date"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_values_of_later_chunks_rule_out_datatypes(tmp_path, workers):
+    file_path = tmp_path / "mixed.csv"
+    file_path.write_text("day,number\n2024-01-02,1\n2024-01-03,2\n2024-01-04,3\nsoon,x\n")
+    day, number = profile_csv(str(file_path), chunksize=1, workers=workers, chunk_bytes=8).columns
+    assert (day.datatype, number.datatype) == ("string", "string")
+    assert number.minimum is None
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_repeated_headers_keep_their_title(tmp_path, workers):
+    file_path = tmp_path / "repeated.csv"
+    file_path.write_text("a,a,b\n1,x,2\n3,y,4\n")
+    profile = profile_csv(str(file_path), workers=workers, chunk_bytes=8)
+    assert [column.title for column in profile.columns] == ["a", "a", "b"]
+    assert [column.datatype for column in profile.columns] == ["integer", "string", "integer"]
+    assert [column["titles"] for column in profile.csvw_columns()] == ["a", "a", "b"]
+
+
+def test_byte_order_mark(tmp_path):
+    file_path = tmp_path / "bom.csv"
+    file_path.write_bytes(b"\xef\xbb\xbfcode,value\nx,1\n")
+    assert [column.title for column in profile_csv(str(file_path)).columns] == ["code", "value"]
+
+
+def test_invalid_workers(csv_path):
+    with pytest.raises(ValueError):
+        profile_csv(csv_path, workers=0)
@@ -0,0 +1,58 @@
+import pytest
+
+from src.CSVW.CSVW_metadata import CSVW
+from src.CSVW.csv_validation import validate_csv
+
+CSV_TEXT = "Week,Date,Deaths,Rate\n1,05/01/2024,10,1.5\n2,12/01/2024,12,\n3,19/01/2024,9,2.25\n"
+
+
+@pytest.fixture
+def csvw():
+    csvw = CSVW("deaths.csv", "Deaths", "", "Weekly")
+    csvw.add_columns([
+        {"name": "week", "titles": "Week", "required": True, "datatype": {"base": "integer", "minimum": 1}},
+        {"name": "date", "titles": "Date", "required": True, "datatype": {"base": "date", "format": "dd/MM/yyyy"}},
+        {"name": "deaths", "titles": "Deaths", "required": True, "datatype": "nonNegativeInteger"},
+        {"name": "rate", "titles": "Rate", "datatype": "decimal"},
+    ])
+    return csvw
+
+
+def _write(tmp_path, text, encoding="utf-8"):
+    file_path = tmp_path / "deaths.csv"
+    file_path.write_text(text, encoding=encoding)
+    return str(file_path)
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig"])
+def test_valid_file(csvw, tmp_path, encoding):
+    #utf-8-sig writes a byte order mark before the header
+    report = csvw.validate_csv(_write(tmp_path, CSV_TEXT, encoding), chunksize=2)
+    assert report["valid"], report
+    assert (report["rows"], report["missing_columns"], report["extra_columns"]) == (3, [], [])
+
+
+def test_header_mismatch(csvw, tmp_path):
+    file_path = _write(tmp_path, CSV_TEXT.replace("Rate", "Rate per 100k").replace("Week", "Week number"))
+    report = validate_csv(csvw.csvw, file_path)
+    assert not report["valid"]
+    assert report["missing_columns"] == ["Week", "Rate"]
+    assert report["extra_columns"] == ["Week number", "Rate per 100k"]
+
+
+def test_type_mismatch(csvw, tmp_path):
+    text = CSV_TEXT + "0,2024-01-26,,x\n5,31/02/2024,-1,3\n6,09/02/2024,8.5,\n"
+    report = csvw.validate_csv(_write(tmp_path, text), chunksize=4)
+    assert not report["valid"]
+    assert report["rows"] == 6
+    columns = report["columns"]
+    assert (columns["week"]["datatype"], columns["week"]["rows"]) == (1, [4])
+    assert (columns["date"]["datatype"], columns["date"]["rows"]) == (2, [4, 5])
+    assert (columns["deaths"]["required"], columns["deaths"]["datatype"], columns["deaths"]["rows"]) == (1, 2, [4, 5, 6])
+    assert (columns["rate"]["errors"], columns["rate"]["rows"]) == (1, [4])
+
+
+def test_samples_are_limited(csvw, tmp_path):
+    text = "Week,Date,Deaths,Rate\n" + "".join(f"x,05/01/2024,1,\n" for _ in range(20))
+    report = csvw.validate_csv(_write(tmp_path, text), max_samples=3)
+    assert (report["columns"]["week"]["errors"], report["columns"]["week"]["rows"]) == (20, [1, 2, 3])
@@ -0,0 +1,76 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.CSVW.CSVW_metadata import CSVW
+
+
+@pytest.fixture
+def csvw():
+    return CSVW("weekly-deaths.csv", "Weekly deaths", "Deaths registered weekly", "Weekly", "ons")
+
+
+def test_table_schema(csvw):
+    csvw.tableSchema("week", "Week", "Week number", "integer", "", "http://example.org/{week}", required=True)
+    csvw.tableSchema("deaths", "Deaths", "", "integer", "", "")
+    assert csvw.column_names() == ["week", "deaths"]
+    assert csvw.column("week") is csvw.csvw["tableSchema"]["columns"][0]
+    assert csvw.column("week")["required"]
+    assert csvw.csvw["tableSchema"]["aboutUrl"] == "http://example.org/{week}"
+    with pytest.raises(ValueError, match="required"):
+        csvw.tableSchema("", "Area", "", "string", "", "")
+
+
+def test_duplicate_names_are_rejected(csvw):
+    csvw.tableSchema("week", "Week", "", "integer", "", "")
+    with pytest.raises(ValueError, match="already in the table schema"):
+        csvw.tableSchema("week", "Week number", "", "string", "", "")
+    #nothing is added when one column of a batch is rejected
+    with pytest.raises(ValueError, match="already in the table schema"):
+        csvw.add_columns([{"name": "area", "titles": "Area"}, {"name": "area", "titles": "Area name"}])
+    with pytest.raises(ValueError, match="required"):
+        csvw.add_columns([{"name": "area", "titles": "Area"}, {"name": "sex"}])
+    assert csvw.column_names() == ["week"]
+    assert len(csvw.csvw["tableSchema"]["columns"]) == 1
+
+
+def test_unknown_column(csvw):
+    with pytest.raises(KeyError, match="not a column"):
+        csvw.column("week")
+
+
+def test_add_columns_from_dataframe(csvw):
+    frame = pd.DataFrame({"Time Period": ["2024-01-05", "2024-01-12"], "Deaths (all)": [10, 12], "Rate": [1.5, None]})
+    csvw.add_columns_from_dataframe(frame, descriptions={"Rate": "per 100,000"}, required=["Time Period"],
+                                    valueURLs={"Deaths (all)": "http://example.org"}, aboutUrl="http://example.org/{time_period}")
+    assert csvw.csvw["tableSchema"]["columns"] == [
+        {"name": "time_period", "titles": "Time Period", "description": "", "required": True, "datatype": "date", "valueURL": ""},
+        {"name": "deaths_all", "titles": "Deaths (all)", "description": "", "required": False, "datatype": "integer",
+         "valueURL": "http://example.org"},
+        {"name": "rate", "titles": "Rate", "description": "per 100,000", "required": False, "datatype": "decimal", "valueURL": ""},
+    ]
+    assert csvw.csvw["tableSchema"]["aboutUrl"] == "http://example.org/{time_period}"
+    with pytest.raises(ValueError, match="already in the table schema"):
+        csvw.add_columns_from_dataframe(pd.DataFrame({"time period": [1]}))
+
+
+def test_add_columns_from_csv(csvw, tmp_path):
+    file_path = tmp_path / "deaths.csv"
+    file_path.write_text("Week,Date,Deaths\n1,05/01/2024,10\n2,12/01/2024,NA\n")
+    csvw.add_columns_from_csv(str(file_path))
+    assert [column["datatype"] for column in csvw.csvw["tableSchema"]["columns"]] == [
+        "integer", {"base": "date", "format": "dd/MM/yyyy"}, "string"]
+    header_only = CSVW("deaths.csv", "Deaths", "", "Weekly")
+    header_only.add_columns_from_csv(str(file_path), sample_rows=0)
+    assert [column["datatype"] for column in header_only.csvw["tableSchema"]["columns"]] == ["string"] * 3
+
+
+def test_to_json(csvw):
+    csvw.contactPoint("Mortality team", email="mortality@ons.gov.uk")
+    csvw.tableSchema("week", "Week", "", "integer", "", "")
+    text = csvw.toJSON()
+    assert "\n" not in text and ", " not in text
+    assert json.loads(text) == csvw.csvw
+    with pytest.raises(ValueError):
+        csvw.contactPoint("")
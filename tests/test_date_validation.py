@@ -0,0 +1,62 @@
+import datetime
+
+import pytest
+
+from src.date_validation import DEFAULT_DATE_VALIDATOR, DateValidator, _compile_format
+
+VALUES = [
+    "31/01/2024", "29/02/2024", "31/12/1999", "01/01/0001",
+    #impossible dates
+    "31/02/2024", "29/02/2023", "31/04/2024", "00/01/2024", "01/13/2024", "01/01/0000",
+    #padding variants
+    "1/2/2024", "01/2/2024", "1/02/2024", " 1/02/2024", "001/02/2024", "01/002/2024", "1/2/24", "01/01/20244",
+    "01/01/2024 ", " 01/01/2024", "01-01-2024", "2024/01/31", "", "//",
+    "2024-01-31", "2024-1-5", "31.01.2024", "31 01 2024", "31  01\t2024", "31T01T2024", "31t01t2024", "31%01%2024",
+]
+FORMATS = ["%d/%m/%Y", "%Y-%m-%d", "%d.%m.%Y", "%d %m %Y", "%dT%mT%Y", "%d%%%m%%%Y", "%m/%d/%Y", "%d/%m/%y"]
+
+
+def _strptime_is_valid(value, date_format):
+    try:
+        datetime.datetime.strptime(value, date_format)
+        return True
+    except ValueError:
+        return False
+
+
+@pytest.mark.parametrize("date_format", FORMATS)
+def test_fast_path_agrees_with_strptime(date_format):
+    validator = DateValidator(date_format)
+    assert [validator.is_valid(value) for value in VALUES] == [_strptime_is_valid(value, date_format) for value in VALUES]
+
+
+@pytest.mark.parametrize("date_format, fast", [("%d/%m/%Y", True), ("%Y-%m-%d", True), ("%d.%m.%Y", True),
+                                               ("%d %m %Y", False), ("%dT%mT%Y", False), ("%d%%%m%%%Y", False),
+                                               ("%d/%m/%y", False), ("%d/%m", False), ("%d/%d/%Y", False)])
+def test_formats_the_fast_path_models(date_format, fast):
+    assert (_compile_format(date_format) is not None) == fast
+
+
+def test_several_formats():
+    validator = DateValidator.for_formats(["%d/%m/%Y", "%Y-%m-%d"])
+    assert validator.check_many(["31/01/2024", "2024-01-31", "2024-02-31", 20240131]) == [True, True, False, False]
+    assert validator.hint() == "'dd/mm/yyyy' or 'yyyy-mm-dd'"
+    assert validator.format(datetime.datetime(2024, 1, 31)) == "31/01/2024"
+    with pytest.raises(ValueError):
+        DateValidator([])
+
+
+def test_results_are_cached():
+    validator = DateValidator("%d/%m/%Y")
+    for _ in range(3):
+        validator.check_many(["31/01/2024", "31/02/2024"])
+    info = validator.is_valid.cache_info()
+    assert (info.misses, info.hits) == (2, 4)
+    assert DateValidator.for_formats("%d/%m/%Y") is DateValidator.for_formats(["%d/%m/%Y"]) is DEFAULT_DATE_VALIDATOR
+
+
+def test_error_messages():
+    assert DEFAULT_DATE_VALIDATOR.error("31/01/2024", "release_date") is None
+    assert DEFAULT_DATE_VALIDATOR.error("2024-01-31", "release_date") == (
+        "Value '2024-01-31' is the wrong datetime format for 'release_date'. Try 'dd/mm/yyyy'.")
+    assert "not a string" in DEFAULT_DATE_VALIDATOR.error(20240131, "release_date")
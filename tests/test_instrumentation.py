@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+
+import pytest
+
+from src import instrumentation
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.instrumentation import InMemorySink, JSONLogSink, PrometheusSink, Recorder, instrumented, profile, render_prometheus
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+
+
+@pytest.fixture
+def cfg():
+    return MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+
+
+@pytest.fixture(autouse=True)
+def disabled():
+    instrumentation.disable()
+    yield
+    instrumentation.disable()
+
+
+def test_phases_and_sizes(cfg, tmp_path):
+    sink = InMemorySink()
+    with profile(sink) as recorder:
+        assert instrumentation.active() is recorder
+        cfg.load_metadata_from_file(SAMPLE_PATH)
+        cfg.validate()
+        cfg.export_to_json("cpi", str(tmp_path))
+    assert instrumentation.active() is None
+    summary = sink.last
+    assert set(summary["phases"]) == {"parse", "load", "build", "validate", "export"}
+    #the recursive validate() and the nested build calls are timed once, by their outermost call
+    assert summary["phases"]["validate"]["calls"] == 1
+    assert summary["phases"]["load"]["calls"] == summary["phases"]["parse"]["calls"] == 1
+    assert summary["phases"]["load"]["seconds"] >= summary["phases"]["parse"]["seconds"] > 0
+    assert summary["documents"] == {
+        "parse": {"documents": 1, "bytes": os.path.getsize(SAMPLE_PATH), "max_bytes": os.path.getsize(SAMPLE_PATH)},
+        "export": {"documents": 1, "bytes": os.path.getsize(tmp_path / "cpi_metadata.json"),
+                   "max_bytes": os.path.getsize(tmp_path / "cpi_metadata.json")},
+    }
+    assert summary["errors"]["total"] == 0
+
+
+def test_validation_errors_are_counted(cfg):
+    with profile() as recorder:
+        cfg.validate()
+        cfg.validate()
+    errors = recorder.summary()["errors"]
+    assert errors["total"] == 2 * len(cfg.validate())
+    assert errors["by_path"]["Dataset.title"] == 2
+    assert {"path": "Dataset.title", "code": "type", "count": 2} in errors["by_path_and_code"]
+
+
+def test_rejected_values_are_counted_by_full_path(cfg):
+    with profile() as recorder:
+        with pytest.raises(ValueError):
+            cfg.set("Dataset.contacts", {"name": 5, "email": "cpi@ons.gov.uk", "telephone": "1"})
+        with pytest.raises(ValueError):
+            cfg.set("Edition.quality_designation", "unknown")
+    assert recorder.summary()["errors"]["by_path_and_code"] == [
+        {"path": "Dataset.contacts.name", "code": "type", "count": 1},
+        {"path": "Edition.quality_designation", "code": "enum", "count": 1},
+    ]
+    assert recorder.summary()["phases"]["build"]["calls"] == 2
+
+
+def test_disabled_instrumentation_records_nothing(cfg):
+    recorder = instrumentation.enable()
+    assert instrumentation.disable() is recorder
+    cfg.load_metadata_from_file(SAMPLE_PATH)
+    cfg.validate()
+    assert instrumentation.active() is None
+    assert recorder.summary()["phases"] == recorder.summary()["documents"] == {}
+    assert instrumentation.disable() is None
+
+
+def test_instrumented_decorator():
+    @instrumented("build", count_errors=True)
+    def build(depth):
+        if depth:
+            return build(depth - 1)
+        error = ValueError("invalid")
+        error.validation_errors = lambda: [type("Error", (), {"path": "a.b", "code": "type"})()]
+        raise error
+
+    with profile() as recorder:
+        with pytest.raises(ValueError):
+            build(3)
+    summary = recorder.summary()
+    assert summary["phases"]["build"]["calls"] == 1
+    assert summary["errors"]["by_path"] == {"a.b": 1}
+
+
+def test_nested_profiles():
+    outer_sink, inner_sink = InMemorySink(), InMemorySink()
+    with profile(outer_sink) as outer:
+        with profile(inner_sink) as inner:
+            assert instrumentation.active() is inner
+            inner.add_time("parse", 1.0)
+        assert instrumentation.active() is None
+        outer.add_time("parse", 2.0)
+    assert inner_sink.last["phases"]["parse"]["seconds"] == 1.0
+    assert outer_sink.last["phases"]["parse"]["seconds"] == 2.0
+
+
+def test_recorder_is_thread_safe():
+    recorder = Recorder()
+
+    def record():
+        for _ in range(1000):
+            recorder.add_time("validate", 0.001)
+            recorder.add_size("export", 10)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = recorder.summary()
+    assert summary["phases"]["validate"]["calls"] == 4000
+    assert summary["documents"]["export"] == {"documents": 4000, "bytes": 40000, "max_bytes": 10}
+    recorder.reset()
+    assert recorder.summary()["phases"] == {}
+
+
+def test_json_log_sink(tmp_path):
+    sink = JSONLogSink(tmp_path / "metrics.jsonl")
+    recorder = Recorder([sink])
+    recorder.add_time("parse", 0.5)
+    recorder.flush()
+    recorder.add_time("parse", 0.25)
+    recorder.flush()
+    lines = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert [line["phases"]["parse"]["calls"] for line in lines] == [1, 2]
+    assert lines[1]["phases"]["parse"] == {"calls": 2, "seconds": 0.75, "max_seconds": 0.5}
+
+
+def test_prometheus_sink(tmp_path):
+    sink = PrometheusSink(tmp_path / "metadata.prom", prefix="test")
+    recorder = Recorder([sink])
+    recorder.add_time("validate", 0.5)
+    recorder.add_size("parse", 100)
+    recorder.add_errors([type("Error", (), {"path": 'a."b"', "code": "type"})()])
+    recorder.flush()
+    assert (tmp_path / "metadata.prom").read_text() == (
+        "# HELP test_phase_calls_total Calls of each phase.\n"
+        "# TYPE test_phase_calls_total counter\n"
+        'test_phase_calls_total{phase="validate"} 1\n'
+        "# HELP test_phase_seconds_total Wall time spent in each phase.\n"
+        "# TYPE test_phase_seconds_total counter\n"
+        'test_phase_seconds_total{phase="validate"} 0.5\n'
+        "# HELP test_phase_max_seconds Longest call of each phase.\n"
+        "# TYPE test_phase_max_seconds gauge\n"
+        'test_phase_max_seconds{phase="validate"} 0.5\n'
+        "# HELP test_documents_total Documents read or written by each phase.\n"
+        "# TYPE test_documents_total counter\n"
+        'test_documents_total{phase="parse"} 1\n'
+        "# HELP test_document_bytes_total Bytes read or written by each phase.\n"
+        "# TYPE test_document_bytes_total counter\n"
+        'test_document_bytes_total{phase="parse"} 100\n'
+        "# HELP test_validation_errors_total Validation errors by schema path and error code.\n"
+        "# TYPE test_validation_errors_total counter\n"
+        'test_validation_errors_total{path="a.\\"b\\"",code="type"} 1\n'
+    )
+
+
+def test_render_prometheus_without_labels():
+    text = render_prometheus([("up", "gauge", "Whether the service is up.", [({}, 1)])], prefix="server")
+    assert text == "# HELP server_up Whether the service is up.\n# TYPE server_up gauge\nserver_up 1\n"
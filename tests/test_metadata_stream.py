@@ -0,0 +1,92 @@
+import pytest
+import yaml
+
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.metadata_stream import MetadataStreamWriter, RecordError, iter_metadata_records
+from src.serializers import dumps_json, read_json
+
+SAMPLES = "data/Metadata Samples"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+VALID_SAMPLES = [f"{SAMPLES}/cpi_metadata.json", f"{SAMPLES}/retail_sales_metadata.json"]
+
+
+@pytest.fixture
+def documents():
+    return [read_json(file_path) for file_path in VALID_SAMPLES]
+
+
+@pytest.fixture
+def jsonl_path(documents, tmp_path):
+    file_path = tmp_path / "catalogue.jsonl"
+    with MetadataStreamWriter(str(file_path)) as writer:
+        assert writer.write_many(documents) == 2
+    return file_path
+
+
+@pytest.fixture
+def broken_path(documents, tmp_path):
+    #a line which isn't JSON, a value rejected on import, a key which isn't metadata and a record which isn't an object
+    invalid = read_json(VALID_SAMPLES[0])
+    invalid["Dataset"]["title"] = 5
+    lines = [dumps_json(documents[0]), "{not json", dumps_json(invalid), '{"Nope": {}}', "[1, 2]", "",
+             dumps_json(documents[1])]
+    file_path = tmp_path / "broken.jsonl"
+    file_path.write_text("\n".join(lines) + "\n")
+    return file_path
+
+
+def test_stream_round_trip(documents, jsonl_path):
+    configs = list(iter_metadata_records(str(jsonl_path), validate=False))
+    expected = []
+    for document in documents:
+        cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+        cfg.import_from_dict(document)
+        expected.append(cfg.to_dict())
+    assert [cfg.to_dict() for cfg in configs] == expected
+    assert [cfg.get("Dataset.id") for cfg in configs] == [document["Dataset"]["id"] for document in documents]
+    assert not hasattr(configs[0], "errors")
+    #appending, then reading back what was written
+    with MetadataStreamWriter(str(jsonl_path), append=True) as writer:
+        writer.write(configs[0])
+    assert len(list(iter_metadata_records(str(jsonl_path), validate=False))) == 3
+
+
+def test_yaml_stream(documents, tmp_path):
+    file_path = tmp_path / "catalogue.yaml"
+    file_path.write_text(yaml.safe_dump_all(documents) + "---\n")
+    assert [cfg.get("Dataset.id") for cfg in iter_metadata_records(str(file_path))] == [d["Dataset"]["id"] for d in documents]
+
+
+def test_validate(jsonl_path):
+    for cfg in iter_metadata_records(str(jsonl_path)):
+        assert cfg.errors == cfg.validate()
+
+
+def test_malformed_record_raises(broken_path):
+    records = iter_metadata_records(str(broken_path))
+    assert next(records).get("Dataset.id")
+    with pytest.raises(ValueError, match="Record 2 .* line 2"):
+        next(records)
+
+
+def test_malformed_records_are_skipped(broken_path):
+    ids = [cfg.get("Dataset.id") for cfg in iter_metadata_records(str(broken_path), on_error="skip")]
+    assert ids == [read_json(file_path)["Dataset"]["id"] for file_path in VALID_SAMPLES]
+
+
+def test_malformed_records_are_collected(broken_path):
+    records = list(iter_metadata_records(str(broken_path), on_error="collect"))
+    errors = [record for record in records if isinstance(record, RecordError)]
+    assert [(error.record, type(error.error)) for error in errors] == [
+        (2, ValueError), (3, ValueError), (4, KeyError), (5, TypeError)]
+    assert [error.error.__cause__.validation_errors()[0].path for error in errors[1:2]] == ["Dataset.title"]
+    assert len(records) == 6
+
+
+def test_unsupported_arguments(jsonl_path, tmp_path):
+    with pytest.raises(ValueError, match="on_error"):
+        next(iter_metadata_records(str(jsonl_path), on_error="ignore"))
+    with pytest.raises(ValueError, match="Unsupported file format"):
+        next(iter_metadata_records(str(tmp_path / "catalogue.csv")))
+    with pytest.raises(FileNotFoundError):
+        next(iter_metadata_records(str(tmp_path / "missing.jsonl")))
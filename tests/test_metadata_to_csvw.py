@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from src.CSVW.metadata_to_csvw import CSVWMapping, export_csvw_many, iter_csvw
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.serializers import read_json
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+
+
+@pytest.fixture
+def document():
+    return read_json(SAMPLE_PATH)
+
+
+@pytest.fixture(params=[False, True], ids=["dict", "compact"])
+def cfg(request):
+    cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT, compact=request.param)
+    cfg.load_metadata_from_file(SAMPLE_PATH)
+    return cfg
+
+
+@pytest.fixture
+def mapping():
+    return CSVWMapping(SCHEMA_PATH, accrualPeriodicity="Monthly")
+
+
+def test_to_csvw(cfg, mapping, document):
+    csvw = mapping.to_csvw(cfg, issued="2024-01-01T00:00:00Z").csvw
+    assert csvw["url"] == "consumerpriceinflationdetailedreferencetables.xlsx"
+    assert csvw["dct:title"] == document["Dataset"]["title"]
+    assert csvw["dct:publisher"] == {"@id": document["Dataset"]["publisher"]["href"]}
+    assert csvw["dct:accrualPeriodicity"] == "Monthly"
+    assert csvw["dct:issued"] == "2024-01-01T00:00:00Z"
+    assert csvw["dcat:contactPoint"] == [{"vcard:fn": "Consumer Price Inflation team", "vcard:tel": "+44 1633 456900",
+                                          "vcard:email": "cpi@ons.gov.uk"}]
+
+
+def test_default_metadata_has_no_contact_point(mapping):
+    csvw = mapping.to_csvw(MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)).csvw
+    assert (csvw["url"], csvw["dct:title"], csvw["dcat:contactPoint"]) == ("", "", [])
+
+
+def test_mapped_fields(document):
+    mapping = CSVWMapping(SCHEMA_PATH, fields={"url": "Dataset.id"})
+    assert mapping.to_csvw(document).csvw["url"] == document["Dataset"]["id"]
+    with pytest.raises(KeyError):
+        CSVWMapping(SCHEMA_PATH, fields={"url": "Dataset.nothing"})
+
+
+def test_iter_csvw_is_lazy(document, mapping):
+    def records():
+        yield document
+        raise AssertionError("read past the first record")
+
+    documents = iter_csvw(records(), mapping)
+    first = next(documents)
+    assert first.csvw["dct:title"] == document["Dataset"]["title"]
+
+
+def test_iter_csvw_shares_the_issued_timestamp(document, mapping):
+    issued = {csvw.csvw["dct:issued"] for csvw in iter_csvw([document] * 3, mapping)}
+    assert len(issued) == 1
+
+
+def test_export_csvw_many(document, mapping, tmp_path):
+    other = read_json(SAMPLE_PATH)
+    other["Edition"]["distributions"]["title"] = "cpih"
+    written = export_csvw_many([document, other], str(tmp_path), mapping)
+    assert written == ["consumerpriceinflationdetailedreferencetables.xlsx-metadata.json", "cpih.xlsx-metadata.json"]
+    assert json.loads((tmp_path / written[1]).read_text())["url"] == "cpih.xlsx"
+
+
+@pytest.mark.parametrize("urls", [("data.csv", "data.csv"), ("2023/data.csv", "2024/data.csv"),
+                                  ("https://example.org/a/data.csv", "data.csv")])
+def test_export_csvw_many_rejects_file_name_collisions(document, tmp_path, urls):
+    records = []
+    for url in urls:
+        record = read_json(SAMPLE_PATH)
+        record["Dataset"]["id"] = url
+        records.append(record)
+    with pytest.raises(ValueError, match="both exported to 'data.csv-metadata.json'"):
+        export_csvw_many(records, str(tmp_path / "output"), CSVWMapping(SCHEMA_PATH, fields={"url": "Dataset.id"}))
+    assert not (tmp_path / "output").exists()
+
+
+def test_export_csvw_many_requires_a_url(document, mapping, tmp_path):
+    document["Edition"]["distributions"] = {"title": None, "format": None}
+    with pytest.raises(ValueError, match="No url"):
+        export_csvw_many([document], str(tmp_path), mapping)
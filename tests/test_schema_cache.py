@@ -0,0 +1,102 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from src.schema_cache import SCHEMA_REGISTRY, SchemaRegistry
+
+SCHEMA_FOLDER = "data/Schema"
+
+
+@pytest.fixture
+def schema_folder(tmp_path):
+    for name in ("CombinedSchema.json", "Enums.json"):
+        shutil.copy(f"{SCHEMA_FOLDER}/{name}", tmp_path / name)
+    return tmp_path
+
+
+def _touch(file_path, content=None):
+    """Rewrite a file (optionally with a new content) with a later modification time."""
+    if content is not None:
+        file_path.write_text(content)
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_schemas_are_reused(schema_folder):
+    registry = SchemaRegistry()
+    compiled = registry.get(schema_folder / "CombinedSchema.json")
+    #the same file through another path
+    assert registry.get(str(schema_folder / ".." / schema_folder.name / "CombinedSchema.json")) is compiled
+    assert registry.stats() == {"hits": 1, "misses": 1, "invalidations": 0, "size": 1, "maxsize": 32}
+
+
+@pytest.mark.parametrize("name", ["CombinedSchema.json", "Enums.json"])
+def test_changed_files_are_loaded_again(schema_folder, name):
+    registry = SchemaRegistry()
+    compiled = registry.get(schema_folder / "CombinedSchema.json")
+    _touch(schema_folder / name)
+    reloaded = registry.get(schema_folder / "CombinedSchema.json")
+    assert reloaded is not compiled
+    assert registry.get(schema_folder / "CombinedSchema.json") is reloaded
+    assert registry.stats()["hits"] == 1 and registry.stats()["misses"] == 2 and registry.stats()["invalidations"] == 1
+
+
+def test_referenced_enum_changes_are_seen(schema_folder):
+    registry = SchemaRegistry()
+    enums_path = schema_folder / "Enums.json"
+    enums = json.loads(enums_path.read_text())
+    assert "provisional" not in registry.get(schema_folder / "CombinedSchema.json").resolve("Edition.quality_designation").node.enum
+    enums["QualityDesignation"].append("provisional")
+    _touch(enums_path, json.dumps(enums))
+    assert "provisional" in registry.get(schema_folder / "CombinedSchema.json").resolve("Edition.quality_designation").node.enum
+
+
+def test_size_change_with_the_same_modification_time(schema_folder):
+    registry = SchemaRegistry()
+    schema_path = schema_folder / "CombinedSchema.json"
+    compiled = registry.get(schema_path)
+    stat = os.stat(schema_path)
+    schema_path.write_text(schema_path.read_text() + "\n")
+    os.utime(schema_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert registry.get(schema_path) is not compiled
+    assert registry.invalidations == 1
+
+
+def test_least_recently_used_schemas_are_dropped(tmp_path):
+    registry = SchemaRegistry()
+    paths = []
+    for number in range(33):
+        paths.append(tmp_path / f"schema_{number}.json")
+        paths[-1].write_text(json.dumps({"type": "object", "properties": {f"field_{number}": {"type": "string"}}}))
+    first = registry.get(paths[0])
+    for file_path in paths[1:32]:
+        registry.get(file_path)
+    #the first schema is used again, so the second one is the least recently used
+    assert registry.get(paths[0]) is first
+    registry.get(paths[32])
+    assert registry.stats()["size"] == 32
+    misses = registry.misses
+    registry.get(paths[0])
+    assert registry.misses == misses
+    registry.get(paths[1])
+    assert registry.misses == misses + 1
+    registry.clear()
+    assert registry.stats() == {"hits": 0, "misses": 0, "invalidations": 0, "size": 0, "maxsize": 32}
+
+
+def test_errors(tmp_path, schema_folder):
+    registry = SchemaRegistry()
+    with pytest.raises(FileNotFoundError):
+        registry.get(tmp_path / "missing.json")
+    registry.get(schema_folder / "CombinedSchema.json")
+    (schema_folder / "Enums.json").unlink()
+    with pytest.raises(FileNotFoundError):
+        registry.get(schema_folder / "CombinedSchema.json")
+    with pytest.raises(ValueError):
+        SchemaRegistry(maxsize=0)
+
+
+def test_shared_registry():
+    assert SCHEMA_REGISTRY.get(f"{SCHEMA_FOLDER}/CombinedSchema.json") is SCHEMA_REGISTRY.get(f"{SCHEMA_FOLDER}/CombinedSchema.json")
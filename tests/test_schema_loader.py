@@ -0,0 +1,72 @@
+import pytest
+
+from src.config_objects import MetadataConfig
+from src.schema_loader import load_schema_file, resolve_schema
+from src.schema_validators import CompiledSchema
+
+SCHEMA_FOLDER = "data/Schema"
+
+
+def _edition_schema(enum):
+    return {
+        "type": "object",
+        "properties": {
+            "quality_designation": {"type": "string", "enum": enum},
+        },
+    }
+
+
+def test_combined_schema_enums_are_resolved():
+    schema, sources = load_schema_file(f"{SCHEMA_FOLDER}/CombinedSchema.json")
+    compiled = CompiledSchema(schema)
+    validator = compiled.resolve("Edition.quality_designation").node
+    assert "official" in validator.enum
+    assert "$ref" not in validator.enum
+    assert any(source.endswith("Enums.json") for source in sources)
+
+
+def test_dict_schema_references_are_resolved_when_compiled():
+    schema = _edition_schema({"$ref": "Enums.json#/QualityDesignation"})
+    compiled = CompiledSchema(schema, SCHEMA_FOLDER)
+    validator = compiled.resolve("quality_designation").node
+    assert validator.check("official")
+    assert not validator.check("$ref")
+    #the dictionary itself is not modified
+    assert schema["properties"]["quality_designation"]["enum"] == {"$ref": "Enums.json#/QualityDesignation"}
+
+
+def test_dict_schema_local_references():
+    schema = {
+        "type": "object",
+        "definitions": {"Designation": ["official", "experimental"]},
+        "properties": {"quality_designation": {"type": "string", "enum": {"$ref": "#/definitions/Designation"}}},
+    }
+    cfg = MetadataConfig(schema, {"quality_designation": "official"})
+    cfg.set("quality_designation", "experimental")
+    with pytest.raises(ValueError):
+        cfg.set("quality_designation", "$ref")
+    assert "definitions" not in cfg._schema
+
+
+def test_resolved_dict_schema_is_compiled_as_is():
+    schema = resolve_schema(_edition_schema({"$ref": "Enums.json#/QualityDesignation"}), SCHEMA_FOLDER)
+    assert CompiledSchema(schema).schema is schema
+
+
+def test_unresolvable_reference_raises():
+    with pytest.raises(FileNotFoundError):
+        CompiledSchema(_edition_schema({"$ref": "Enums.json#/QualityDesignation"}))
+    with pytest.raises(KeyError):
+        CompiledSchema(_edition_schema({"$ref": "Enums.json#/Nothing"}), SCHEMA_FOLDER)
+
+
+def test_enum_which_is_not_a_list_raises():
+    with pytest.raises(ValueError, match="should be a list"):
+        CompiledSchema(_edition_schema({"official": True}))
+
+
+def test_edition_media_types_are_unchanged():
+    schema, _ = load_schema_file(f"{SCHEMA_FOLDER}/EditionMetadata_Schema.json")
+    media_types = schema["properties"]["Distribution"]["properties"]["media_type"]["enum"]
+    assert "text/csv" in media_types
+    assert "application/vnd.ms-excel" not in media_types
@@ -0,0 +1,104 @@
+import copy
+
+import pytest
+
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.schema_validators import CompiledSchema, ErrorIndex, ErrorLimitReached, error_limit
+from src.serializers import read_json
+from src.validation_errors import NestedValidationError, ValidationError
+
+VALUES = ["official", "x", "", 3, True, None, 2.5, ["a", "b"], [1], [], {"a": 1}, "01/02/2020", "2020-02-01"]
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "text": {"type": "string"},
+        "number": {"type": "integer"},
+        "designation": {"type": "string", "enum": ["official", "experimental"]},
+        "size": {"type": "integer", "enum": [1, 2, 3]},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "kinds": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}},
+        "path": {"type": "pathlib.Path"},
+        "release_date": {"type": "datetime"},
+        "unknown": {"type": "decimal"},
+    },
+}
+
+
+@pytest.mark.parametrize("field", list(SCHEMA["properties"]))
+def test_compiled_check_matches_check_type(field):
+    cfg = MetadataConfig(SCHEMA, {})
+    node = CompiledSchema(SCHEMA).resolve(field).node
+    schema = SCHEMA["properties"][field]
+    for value in VALUES:
+        assert node.check(value) == cfg.check_type(value, schema), value
+
+
+def test_validate_matches_recursive_validate():
+    cfg = MetadataConfig("data/Schema/CombinedSchema.json", COMBINED_DEFAULT)
+    metadata = read_json("data/Metadata Samples/cpi_metadata.json")
+    metadata["Dataset"]["title"] = 5
+    metadata["Edition"]["quality_designation"] = "unknown"
+    errors = cfg.validate(metadata, structured=True)
+    assert len(errors) >= 2
+    assert errors == cfg.validate(metadata, copy.deepcopy(cfg._schema), structured=True)
+
+
+LIMITED_SCHEMA = {
+    "type": "object",
+    "required": ["name"],
+    "properties": {
+        "name": {"type": "string"},
+        "text": {"type": "string"},
+        "number": {"type": "integer"},
+        "nested": {"type": "object", "properties": {"inner": {"type": "string"}}},
+    },
+}
+#every field but the required one is invalid, 4 errors in the order they're validated
+INVALID = {"text": 1, "number": "x", "nested": {"inner": 2}}
+ERROR_PATHS = ["name", "text", "number", "nested.inner"]
+
+
+@pytest.mark.parametrize("mode, max_errors, expected", [
+    ("full", None, None), ("full", 3, 3), ("fail_fast", None, 1), ("fail_fast", 3, 1)])
+def test_error_limit(mode, max_errors, expected):
+    assert error_limit(mode, max_errors) == expected
+
+
+@pytest.mark.parametrize("mode, max_errors", [("all", None), ("full", 0)])
+def test_invalid_error_limit(mode, max_errors):
+    with pytest.raises(ValueError):
+        error_limit(mode, max_errors)
+
+
+def test_error_index_stops_at_the_limit():
+    error_index = ErrorIndex(2)
+    error_index.add(ValidationError("a", "type", "string", "int"))
+    with pytest.raises(ErrorLimitReached):
+        error_index.add(ValidationError("a", "enum", ["x"], "y"))
+    #the error reaching the limit is kept
+    assert error_index.count == 2 and [error.code for error in error_index["a"]] == ["type", "enum"]
+    unlimited = ErrorIndex()
+    for _ in range(10):
+        unlimited.add(ValidationError("a", "type", "string", "int"))
+    assert unlimited.count == 10
+
+
+@pytest.mark.parametrize("mode, max_errors, count", [("full", None, 4), ("fail_fast", None, 1), ("full", 2, 2), ("full", 10, 4)])
+def test_validation_stops_at_the_limit(mode, max_errors, count):
+    root = CompiledSchema(LIMITED_SCHEMA).root
+    errors = root.validate(INVALID, max_errors=error_limit(mode, max_errors))
+    assert all(isinstance(error, ValidationError) for error in errors)
+    assert [error.path for error in errors] == ERROR_PATHS[:count]
+    assert root.error_index(INVALID, max_errors=error_limit(mode, max_errors)).count == count
+    cfg = MetadataConfig(LIMITED_SCHEMA, {})
+    assert cfg.validate(INVALID, mode=mode, max_errors=max_errors, structured=True) == errors
+    assert cfg.validate(INVALID, mode=mode, max_errors=max_errors) == [error.format() for error in errors]
+
+
+@pytest.mark.parametrize("mode, max_errors, count", [("full", None, 2), ("fail_fast", None, 1), ("full", 1, 1)])
+def test_set_stops_at_the_limit(mode, max_errors, count):
+    cfg = MetadataConfig({"type": "object", "properties": {"section": LIMITED_SCHEMA}}, {"section": {}})
+    with pytest.raises(NestedValidationError) as info:
+        cfg.set("section", {"text": 1, "number": "x", "name": "ok"}, mode=mode, max_errors=max_errors)
+    errors = info.value.validation_errors()
+    assert [(error.path, error.code) for error in errors] == [("section.text", "type"), ("section.number", "type")][:count]
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+import yaml
+
+from src import serializers
+from src.CSVW.CSVW_metadata import CSVW
+from src.config_objects import COMBINED_DEFAULT, MetadataConfig
+from src.instrumentation import JSONLogSink
+from src.metadata_stream import MetadataStreamWriter
+from src.serializers import dumps_json, loads_json, read_json
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+DOCUMENT = {"title": "Office for National Statistics’ £ index", "values": [1, 2.5, None, True], "empty": {}}
+
+
+@pytest.fixture(params=serializers.JSON_BACKENDS)
+def backend(request):
+    serializers.set_json_backend(request.param)
+    yield request.param
+    serializers.set_json_backend(serializers.JSON_BACKENDS[0])
+
+
+def test_backends_write_the_same_text(backend):
+    assert dumps_json(DOCUMENT) == '{"title":"Office for National Statistics’ £ index","values":[1,2.5,null,true],"empty":{}}'
+    assert dumps_json(DOCUMENT, indent=2).startswith('{\n  "title": "Office for National Statistics’ £ index",\n')
+    sample = read_json(SAMPLE_PATH)
+    serializers.set_json_backend("json")
+    expected = dumps_json(sample), dumps_json(sample, indent=2)
+    serializers.set_json_backend(backend)
+    assert (dumps_json(sample), dumps_json(sample, indent=2)) == expected
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        serializers.set_json_backend("simplejson")
+
+
+def test_user_facing_output_keeps_the_default_format(backend, tmp_path, capsys):
+    #the bytes json.dump/json.dumps/yaml.dump wrote with their default options before the serializer layer
+    cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+    cfg.load_metadata_from_file(SAMPLE_PATH)
+    cfg.set("Dataset.title", "Consumer price inflation – £")
+    cfg.export_to_json("cpi", str(tmp_path))
+    data = (tmp_path / "cpi_metadata.json").read_bytes()
+    assert data == json.dumps(cfg.to_dict()).encode()
+    assert b'"title": "Consumer price inflation \\u2013 \\u00a3"' in data
+    assert read_json(tmp_path / "cpi_metadata.json")["Dataset"]["title"] == "Consumer price inflation – £"
+    cfg.preview("json")
+    assert capsys.readouterr().out == json.dumps(cfg.to_dict(), indent=4) + "\n"
+    cfg.preview("yaml")
+    assert capsys.readouterr().out == yaml.dump(cfg.to_dict(), indent=4) + "\n"
+    csvw = CSVW("cpi.csv", "Consumer price inflation – £", "Prices", "monthly")
+    assert csvw.toJSON() == json.dumps(csvw.csvw, separators=(",", ":"))
+
+
+def test_yaml_preview_writes_non_plain_types(capsys):
+    cfg = MetadataConfig(SCHEMA_PATH, COMBINED_DEFAULT)
+    cfg._metadata = {"Dataset": {"topics": ("a", "b")}}
+    cfg.preview("yaml")
+    assert "!!python/tuple" in capsys.readouterr().out
+
+
+def test_stream_round_trip(backend, tmp_path):
+    file_path = tmp_path / "catalogue.jsonl"
+    with MetadataStreamWriter(str(file_path)) as writer:
+        writer.write(DOCUMENT)
+    assert file_path.read_bytes().decode("utf-8") == dumps_json(DOCUMENT) + "\n"
+    assert loads_json(file_path.read_bytes()) == DOCUMENT
+
+
+def test_log_sink_writes_utf8(backend, tmp_path):
+    sink = JSONLogSink(tmp_path / "timings.jsonl")
+    sink.emit(DOCUMENT)
+    sink.emit(DOCUMENT)
+    lines = (tmp_path / "timings.jsonl").read_bytes().decode("utf-8").splitlines()
+    assert [loads_json(line) for line in lines] == [DOCUMENT, DOCUMENT]
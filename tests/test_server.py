@@ -0,0 +1,103 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from src.serializers import read_json
+from src.server import ValidationServer, make_http_server
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+
+
+@pytest.fixture
+def document():
+    return read_json(SAMPLE_PATH)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = ValidationServer(workers=1, export_root=tmp_path / "exports")
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def client(service):
+    server = make_http_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+
+    def request(method, path, body=None):
+        data = json.dumps(body).encode() if body is not None and not isinstance(body, bytes) else body
+        connection.request(method, path, body=data)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    yield request
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_validate(service, document):
+    invalid = read_json(SAMPLE_PATH)
+    invalid["Dataset"]["title"] = 5
+    reports = service.validate([document, invalid], structured=True)
+    assert [report["valid"] for report in reports] == [True, False]
+    assert reports[1]["load_error"] is None
+    assert [(error.path, error.code) for error in reports[1]["errors"]] == [("Dataset.title", "type")]
+
+
+def test_export_reports_rejected_values(service, document):
+    invalid = read_json(SAMPLE_PATH)
+    invalid["Edition"]["quality_designation"] = "unknown"
+    result = service.export([document, invalid], structured=True)
+    assert len(result["written"]) == 1
+    assert result["reports"][1]["load_error"] is None
+    assert [error.code for error in result["reports"][1]["errors"]] == ["enum"]
+
+
+def test_file_paths_are_opt_in(service, tmp_path):
+    with pytest.raises(ValueError, match="file paths"):
+        service.validate([SAMPLE_PATH])
+    with_paths = ValidationServer(workers=1, export_root=tmp_path, allow_paths=True)
+    try:
+        assert with_paths.validate([SAMPLE_PATH])[0]["valid"]
+    finally:
+        with_paths.close()
+
+
+def test_export_stays_under_the_root(service, document, tmp_path):
+    result = service.export([document], "catalogue")
+    assert result["written"] == [f"{document['Dataset']['id']}_metadata.json"]
+    assert (service.export_root / "catalogue" / result["written"][0]).exists()
+    for folder in ("..", "../elsewhere", str(tmp_path), "/proc/zz"):
+        with pytest.raises(ValueError, match="export root"):
+            service.export([document], folder)
+    assert not (tmp_path / "elsewhere").exists()
+
+
+def test_http_endpoints(client, document):
+    assert client("GET", "/health")[1]["status"] == "ok"
+    status, report = client("POST", "/validate", document)
+    assert (status, report["valid"]) == (200, True)
+    status, result = client("POST", "/export?output=catalogue", [document])
+    assert status == 200 and result["written"]
+    assert client("POST", "/validate", b"{not json")[0] == 400
+    assert client("POST", "/validate?mode=lenient", document)[0] == 400
+    assert client("POST", "/validate", [SAMPLE_PATH])[0] == 400
+    assert client("POST", "/export?output=/proc/zz", [document])[0] == 400
+    assert client("POST", "/nothing", document)[0] == 404
+
+
+def test_http_export_os_error(client, service, document):
+    #the output folder is an existing file
+    service.export_root.mkdir(parents=True, exist_ok=True)
+    (service.export_root / "taken").write_text("")
+    status, body = client("POST", "/export?output=taken", [document])
+    assert status == 500
+    assert "error" in body
+    #the connection is still answered afterwards
+    assert client("GET", "/health")[0] == 200
@@ -0,0 +1,111 @@
+import copy
+import itertools
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.batch_validation import validate_many
+from src.schema_loader import load_schema_file
+from src.validation_cache import ValidationCache, document_key, schema_key
+
+SAMPLE_PATH = "data/Metadata Samples/cpi_metadata.json"
+SCHEMA_PATH = "data/Schema/CombinedSchema.json"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ValidationCache(tmp_path / "cache.sqlite")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def document_path(tmp_path):
+    file_path = tmp_path / "cpi.json"
+    file_path.write_text(open(SAMPLE_PATH).read())
+    return file_path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    #a clock which always moves forward, so the order of use is never a tie
+    ticks = itertools.count()
+    monkeypatch.setattr("src.validation_cache.time", SimpleNamespace(time=lambda: next(ticks)))
+
+
+def test_keys():
+    document = json.loads(open(SAMPLE_PATH).read())
+    reordered = dict(reversed(list(document.items())))
+    assert document_key(document) == document_key(reordered)
+    assert schema_key({"type": "object"}) != schema_key({"type": "object"}, max_errors=1)
+    assert schema_key({"type": "object"}) != schema_key({"type": "object"}, structured=True)
+
+
+def test_hits(cache, document_path):
+    first = validate_many([str(document_path)], workers=1, cache=cache)
+    assert cache.stats()["misses"] == 1 and cache.stats()["entries"] == 1
+    assert validate_many([str(document_path)], workers=1, cache=cache) == first
+    assert cache.stats()["hits"] == 1
+
+
+def test_results_persist(tmp_path, document_path):
+    with ValidationCache(tmp_path / "cache.sqlite") as cache:
+        validate_many([str(document_path)], workers=1, cache=cache)
+    with ValidationCache(tmp_path / "cache.sqlite") as cache:
+        validate_many([str(document_path)], workers=1, cache=cache)
+        assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_changed_file_is_validated_again(cache, document_path):
+    assert validate_many([str(document_path)], workers=1, cache=cache)[0]["valid"]
+    document = json.loads(document_path.read_text())
+    document["Dataset"]["title"] = 5
+    document_path.write_text(json.dumps(document))
+    report = validate_many([str(document_path)], workers=1, cache=cache)[0]
+    assert not report["valid"]
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_changed_schema_is_validated_again(cache, document_path):
+    schema, _ = load_schema_file(SCHEMA_PATH)
+    assert validate_many([str(document_path)], schema=schema, workers=1, cache=cache)[0]["valid"]
+    changed = copy.deepcopy(schema)
+    changed["properties"]["Dataset"]["properties"]["title"]["type"] = "integer"
+    assert not validate_many([str(document_path)], schema=changed, workers=1, cache=cache)[0]["valid"]
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert validate_many([str(document_path)], schema=schema, workers=1, cache=cache)[0]["valid"]
+    assert cache.hits == 1
+
+
+def test_bypass(cache, document_path):
+    validate_many([str(document_path)], workers=1, cache=cache)
+    reports = validate_many([str(document_path)], workers=1, cache=cache, bypass_cache=True)
+    assert reports[0]["valid"]
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_results_are_evicted(tmp_path, clock):
+    result = {"valid": True, "load_error": None, "errors": []}
+    size = len(json.dumps(result, separators=(",", ":")))
+    cache = ValidationCache(tmp_path / "cache.sqlite", max_bytes=3 * size)
+    for key in "abc":
+        cache.put("schema", key, result)
+    assert cache.get("schema", "a") == result
+    cache.put("schema", "d", result)
+    assert cache.stats()["evictions"] == 1
+    assert [key for key in "abcd" if cache.get("schema", key) is not None] == ["a", "c", "d"]
+    assert cache.stats()["bytes"] == 3 * size
+    cache.close()
+    #opened again with a smaller budget
+    cache = ValidationCache(tmp_path / "cache.sqlite", max_bytes=size)
+    assert cache.stats()["entries"] == 1 and cache.get("schema", "d") == result
+    cache.clear()
+    assert cache.stats()["entries"] == cache.stats()["bytes"] == 0
+    cache.close()
+
+
+def test_invalid_budget(tmp_path):
+    with pytest.raises(ValueError):
+        ValidationCache(tmp_path / "cache.sqlite", max_bytes=0)